@@ -3,13 +3,21 @@ from __future__ import annotations
 from datetime import datetime
 from pathlib import Path
 
-import joblib
-import pandas as pd
 import streamlit as st
 
-from fraudguard.features import add_basic_features
+from fraudguard.compiled import try_compile
+from fraudguard.persistence import load_model as load_saved_model
+from fraudguard.persistence import model_version, resolve_threshold
+from fraudguard.scoring import ScoreCache, load_velocity_store, score_transaction
 
 MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
+# Past transactions that warm up the account history of velocity models
+HISTORY_PATH = Path(__file__).resolve().parents[1] / "data" / "raw" / "transactions.csv"
+# Medium-risk band starts at this fraction of the model's fraud threshold
+MEDIUM_RISK_RATIO = 0.6
+# Repeated submissions reuse cached scores: LRU bound and TTL in seconds
+SCORE_CACHE_SIZE = 10_000
+SCORE_CACHE_TTL = 3600.0
 
 st.set_page_config(
     page_title="FraudGuard",
@@ -21,10 +29,27 @@ st.set_page_config(
 
 @st.cache_resource
 def load_model():
-    model_path = MODELS_DIR / "fraud_model.joblib"
+    # Prefer the memory-mapped artifact export when both formats are present.
+    model_path = MODELS_DIR / "fraud_model.artifact"
     if not model_path.exists():
-        return None
-    return joblib.load(model_path)
+        model_path = MODELS_DIR / "fraud_model.joblib"
+    if not model_path.exists():
+        return None, None, None, None
+    model, metadata = load_saved_model(model_path)
+    return try_compile(model), resolve_threshold(metadata), model_version(model_path), metadata
+
+
+@st.cache_resource
+def load_velocity(_model, _metadata, version):
+    # One account history shared by all sessions: every checked transaction is recorded in it.
+    history = HISTORY_PATH if HISTORY_PATH.exists() else None
+    return load_velocity_store(_model, _metadata, history)
+
+
+@st.cache_resource
+def load_score_cache():
+    # Shared by all sessions; keys include the model version, so a new model never hits.
+    return ScoreCache(maxsize=SCORE_CACHE_SIZE, ttl=SCORE_CACHE_TTL)
 
 
 def main():
@@ -32,10 +57,11 @@ def main():
     st.markdown("**Детектор мошеннических транзакций**")
     st.markdown("---")
 
-    model = load_model()
+    model, threshold, version, metadata = load_model()
     if model is None:
         st.error("⚠️ Модель не найдена! Запустите `python -m scripts.train` для обучения модели.")
         st.stop()
+    velocity = load_velocity(model, metadata, version)
 
     st.subheader("📝 Параметры транзакции")
 
@@ -75,6 +101,13 @@ def main():
 
     transaction_time = f"{transaction_date} {transaction_time_input}"
 
+    account = None
+    if velocity is not None:
+        account = st.text_input(
+            "👤 Счёт отправителя",
+            help="Модель учитывает историю операций по счёту",
+        )
+
     st.markdown("---")
 
     if st.button("🔍 Проверить транзакцию", type="primary", use_container_width=True):
@@ -85,12 +118,21 @@ def main():
                 "device_type": device_type,
                 "transaction_time": transaction_time,
             }
-
-            df = pd.DataFrame([row])
-            df = add_basic_features(df)
-
-            proba = model.predict_proba(df)[:, 1][0]
-            pred = int(proba >= 0.5)
+            if velocity is not None:
+                row[velocity.account_col] = account or None
+
+            try:
+                proba = score_transaction(
+                    model,
+                    row,
+                    cache=load_score_cache(),
+                    model_version=version,
+                    velocity=velocity,
+                )
+            except ValueError as e:
+                st.error(f"⚠️ Некорректные данные транзакции: {e}")
+                st.stop()
+            pred = int(proba >= threshold)
 
         st.markdown("---")
         st.subheader("📊 Результат анализа")
@@ -109,7 +151,7 @@ def main():
         with col_right:
             if pred == 1:
                 st.error("🚨 **ВЫСОКИЙ РИСК**")
-            elif proba > 0.3:
+            elif proba >= MEDIUM_RISK_RATIO * threshold:
                 st.warning("⚠️ **СРЕДНИЙ РИСК**")
             else:
                 st.success("✅ **НИЗКИЙ РИСК**")
@@ -120,7 +162,7 @@ def main():
     with st.sidebar:
         st.markdown("### ℹ️ О приложении")
         st.markdown(
-            """
+            f"""
             **FraudGuard** использует машинное обучение
             для анализа транзакций и выявления подозрительной активности.
 
@@ -131,11 +173,16 @@ def main():
             - Время проведения
 
             **Пороги риска:**
-            - 🟢 < 30% — низкий риск
-            - 🟡 30-50% — средний риск
-            - 🔴 > 50% — высокий риск
+            - 🟢 < {MEDIUM_RISK_RATIO * threshold:.0%} — низкий риск
+            - 🟡 {MEDIUM_RISK_RATIO * threshold:.0%}-{threshold:.0%} — средний риск
+            - 🔴 ≥ {threshold:.0%} — высокий риск
             """
         )
+        cache_stats = load_score_cache().stats
+        st.caption(
+            f"Кэш оценок: {cache_stats.hits} попаданий, {cache_stats.misses} промахов "
+            f"({cache_stats.hit_rate:.0%})"
+        )
 
 
 if __name__ == "__main__":
@@ -4,7 +4,8 @@ __author__ = "Stepan Sivitskiy"
 from fraudguard.data import load_raw_data, train_valid_test_split
 from fraudguard.evaluate import evaluate_model
 from fraudguard.features import add_basic_features, build_preprocessor
-from fraudguard.models import build_forest_model, build_logreg_model
+from fraudguard.models import build_forest_model, build_hgb_model, build_logreg_model
+from fraudguard.scoring import score_file
 
 __all__ = [
     "load_raw_data",
@@ -13,5 +14,7 @@ __all__ = [
     "build_preprocessor",
     "build_logreg_model",
     "build_forest_model",
+    "build_hgb_model",
     "evaluate_model",
+    "score_file",
 ]
@@ -0,0 +1,533 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy.special import expit
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+from fraudguard import __version__
+from fraudguard.features import TIME_FEATURES, add_basic_features
+from fraudguard.sampling import DownsampledClassifier, correct_probabilities
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+ARRAYS_NAME = "arrays.npz"
+ARTIFACT_SUFFIX = ".artifact"
+# Upper bound on the (rows x trees) node matrix walked at once during prediction.
+CHUNK_CELLS = 2**21
+# HistGradientBoosting category bitsets: 8 x 32 bits, one per possible category code.
+MAX_CATEGORY_CODE = 255
+# _export_hgb reads private HistGradientBoosting internals: sklearn (major, minor) releases
+# it was verified against.
+HGB_MIN_SKLEARN = (1, 9)
+HGB_MAX_SKLEARN = (1, 9)
+
+
+def _missing_to_nan(values: pd.Series) -> np.ndarray:
+    values = values.to_numpy(dtype=object)
+    values[pd.isna(values)] = np.nan
+    return values
+
+
+def _export_preprocessor(preprocessor: Any, arrays: dict[str, np.ndarray]) -> list[dict]:
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise TypeError(f"Unsupported preprocessor: {type(preprocessor).__name__}")
+
+    blocks: list[dict] = []
+    for name, transformer, cols in preprocessor.transformers_:
+        if name == "remainder" or transformer == "drop" or len(cols) == 0:
+            continue
+
+        cols = list(cols)
+        if isinstance(transformer, StandardScaler):
+            n = len(cols)
+            index = len(blocks)
+            arrays[f"scale{index}_mean"] = (
+                transformer.mean_ if transformer.with_mean else np.zeros(n)
+            ).astype(np.float64)
+            arrays[f"scale{index}_scale"] = (
+                transformer.scale_ if transformer.with_std else np.ones(n)
+            ).astype(np.float64)
+            blocks.append({"kind": "scale", "columns": cols})
+        elif isinstance(transformer, OneHotEncoder):
+            if transformer.drop is not None or getattr(transformer, "infrequent_categories_", None):
+                raise ValueError("OneHotEncoder with drop/infrequent categories is not supported")
+            blocks.append(
+                {
+                    "kind": "onehot",
+                    "columns": cols,
+                    "categories": [categories.tolist() for categories in transformer.categories_],
+                }
+            )
+        elif isinstance(transformer, OrdinalEncoder):
+            # Encode every known category once, so grouped infrequent categories and
+            # unknown/missing handling are captured as a plain lookup table.
+            categories = transformer.categories_
+            longest = max(len(c) for c in categories)
+            probe = pd.DataFrame(
+                {
+                    col: np.resize(np.asarray(c, dtype=object), longest)
+                    for col, c in zip(cols, categories, strict=True)
+                }
+            )
+            encoded = transformer.transform(probe)
+            blocks.append(
+                {
+                    "kind": "ordinal",
+                    "columns": cols,
+                    "categories": [c.tolist() for c in categories],
+                    "codes": [encoded[: len(c), i].tolist() for i, c in enumerate(categories)],
+                }
+            )
+        else:
+            raise TypeError(f"Unsupported transformer '{name}': {type(transformer).__name__}")
+
+    return blocks
+
+
+def _export_forest(
+    clf: RandomForestClassifier, arrays: dict[str, np.ndarray], blocks: list[dict]
+) -> dict[str, Any]:
+    positive = list(clf.classes_).index(1)
+    features, thresholds, lefts, rights, missing_left, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    depth = 0
+
+    for estimator in clf.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        node_ids = np.arange(n)
+        leaf = tree.children_left == -1
+        # Leaves point to themselves, so every tree can be walked for the same number of steps.
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(np.where(leaf, 0.0, tree.threshold))
+        lefts.append(np.where(leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(leaf, node_ids, tree.children_right) + offset)
+        missing_left.append(getattr(tree, "missing_go_to_left", np.zeros(n, dtype=np.uint8)))
+        node_values = tree.value[:, 0, :]
+        values.append(node_values[:, positive] / node_values.sum(axis=1))
+        roots.append(offset)
+        offset += n
+        depth = max(depth, tree.max_depth)
+
+    arrays.update(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(np.int32),
+        right=np.concatenate(rights).astype(np.int32),
+        missing_left=np.concatenate(missing_left).astype(np.uint8),
+        value=np.concatenate(values).astype(np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+    )
+    return {"n_features": int(clf.n_features_in_), "depth": int(depth), "float32_inputs": True}
+
+
+def _recode_categories(blocks: list[dict], features: np.ndarray, encoder: OrdinalEncoder) -> None:
+    # Input column of each model feature, and the ordinal code table of that column.
+    source, _ = _feature_layout(blocks, n_features=None)
+    tables = [
+        block["codes"][i] if block["kind"] == "ordinal" else None
+        for block in blocks
+        for i in range(len(block["columns"]))
+    ]
+    for feature, categories in zip(features, encoder.categories_, strict=True):
+        codes = tables[source[feature]]
+        if codes is None:
+            raise ValueError(f"Categorical feature {feature} is not ordinal-encoded")
+        codes = np.asarray(codes, dtype=np.float64)
+        positions = pd.Index(categories).get_indexer(codes)
+        known = (positions >= 0) & ~np.isnan(codes)
+        codes[:] = np.where(known, positions, np.nan)
+        tables[source[feature]][:] = codes.tolist()
+
+
+def _export_hgb(
+    clf: HistGradientBoostingClassifier, arrays: dict[str, np.ndarray], blocks: list[dict]
+) -> dict[str, Any]:
+    major, minor = re.match(r"(\d+)\.(\d+)", sklearn.__version__).groups()
+    if not HGB_MIN_SKLEARN <= (int(major), int(minor)) <= HGB_MAX_SKLEARN:
+        raise ValueError(
+            f"HistGradientBoosting export relies on scikit-learn internals verified for "
+            f"versions {HGB_MIN_SKLEARN} to {HGB_MAX_SKLEARN}, got {sklearn.__version__}: "
+            "save the model with joblib instead"
+        )
+    if clf.n_trees_per_iteration_ != 1:
+        raise ValueError("Only binary HistGradientBoostingClassifier can be exported")
+
+    features, thresholds, lefts, rights, missing_left, values = [], [], [], [], [], []
+    is_categorical, bitset_idx, left_cat_bitsets, roots = [], [], [], []
+    offset = 0
+    bitset_offset = 0
+    depth = 0
+
+    for (predictor,) in clf._predictors:
+        nodes = predictor.nodes
+        node_ids = np.arange(len(nodes))
+        leaf = nodes["is_leaf"].astype(bool)
+        features.append(nodes["feature_idx"])
+        thresholds.append(nodes["num_threshold"])
+        lefts.append(np.where(leaf, node_ids, nodes["left"]) + offset)
+        rights.append(np.where(leaf, node_ids, nodes["right"]) + offset)
+        missing_left.append(nodes["missing_go_to_left"])
+        values.append(nodes["value"])
+        is_categorical.append(nodes["is_categorical"])
+        bitset_idx.append(nodes["bitset_idx"].astype(np.int64) + bitset_offset)
+        left_cat_bitsets.append(predictor.raw_left_cat_bitsets)
+        roots.append(offset)
+        offset += len(nodes)
+        bitset_offset += len(predictor.raw_left_cat_bitsets)
+        depth = max(depth, int(nodes["depth"].max()))
+
+    feature = np.concatenate(features).astype(np.int32)
+    known_cat_bitsets, f_idx_map = clf._bin_mapper.make_known_categories_bitsets()
+    f_idx_map = np.asarray(f_idx_map, dtype=np.int32)
+
+    internal = getattr(clf, "_preprocessor", None)
+    if internal is not None:
+        # With categorical features, HGB re-encodes them with its own OrdinalEncoder and
+        # moves them first: fold both into the artifact's feature indices and code tables.
+        order = np.concatenate(
+            [
+                np.flatnonzero(mask)
+                for name, _, mask in internal.transformers_
+                if name != "remainder"
+            ]
+        )
+        feature = order[feature].astype(np.int32)
+        remapped = np.empty_like(f_idx_map)
+        remapped[order] = f_idx_map
+        f_idx_map = remapped
+        _recode_categories(
+            blocks, np.flatnonzero(clf.is_categorical_), internal.named_transformers_["encoder"]
+        )
+
+    arrays.update(
+        feature=feature,
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(np.int32),
+        right=np.concatenate(rights).astype(np.int32),
+        missing_left=np.concatenate(missing_left).astype(np.uint8),
+        value=np.concatenate(values).astype(np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        is_categorical=np.concatenate(is_categorical).astype(np.uint8),
+        bitset_idx=np.concatenate(bitset_idx).astype(np.int32),
+        left_cat_bitsets=np.concatenate(left_cat_bitsets).astype(np.uint32).reshape(-1, 8),
+        known_cat_bitsets=np.asarray(known_cat_bitsets, dtype=np.uint32).reshape(-1, 8),
+        f_idx_map=f_idx_map,
+    )
+    return {
+        "n_features": int(clf.n_features_in_),
+        "depth": depth,
+        "float32_inputs": False,
+        "baseline": float(np.ravel(clf._baseline_prediction)[0]),
+    }
+
+
+def _export_logreg(
+    clf: LogisticRegression | SGDClassifier, arrays: dict[str, np.ndarray], blocks: list[dict]
+) -> dict[str, Any]:
+    if getattr(clf, "loss", "log_loss") != "log_loss":
+        raise ValueError(f"Only log_loss linear models have probabilities, got {clf.loss}")
+    if clf.coef_.shape[0] != 1:
+        raise ValueError("Only binary LogisticRegression can be exported")
+    arrays["coef"] = clf.coef_[0].astype(np.float64)
+    return {"n_features": int(clf.coef_.shape[1]), "intercept": float(clf.intercept_[0])}
+
+
+MODEL_EXPORTERS = {
+    LogisticRegression: ("logreg", _export_logreg),
+    SGDClassifier: ("logreg", _export_logreg),
+    RandomForestClassifier: ("forest", _export_forest),
+    HistGradientBoostingClassifier: ("hgb", _export_hgb),
+}
+
+
+def export_artifact(
+    model: Pipeline,
+    path: str | Path,
+    metadata: dict[str, Any] | None = None,
+    compress: bool = False,
+) -> Path:
+    if not isinstance(model, Pipeline) or "preprocess" not in model.named_steps:
+        raise TypeError("Expected a Pipeline with 'preprocess' and 'clf' steps")
+
+    clf = model.named_steps["clf"]
+    negative_rate = None
+    if isinstance(clf, DownsampledClassifier):
+        negative_rate = clf.negative_rate_
+        clf = clf.estimator_
+    if type(clf) not in MODEL_EXPORTERS:
+        raise TypeError(f"Cannot export {type(clf).__name__} as an artifact")
+    if list(clf.classes_) != [0, 1]:
+        raise ValueError(f"Expected binary classes [0, 1], got {list(clf.classes_)}")
+
+    arrays: dict[str, np.ndarray] = {}
+    blocks = _export_preprocessor(model.named_steps["preprocess"], arrays)
+    model_type, exporter = MODEL_EXPORTERS[type(clf)]
+    params = exporter(clf, arrays, blocks)
+    if negative_rate is not None:
+        params["negative_rate"] = negative_rate
+
+    metadata = metadata or {}
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "fraudguard_version": __version__,
+        "model_type": model_type,
+        "input_columns": [col for block in blocks for col in block["columns"]],
+        "feature_names": model.named_steps["preprocess"].get_feature_names_out().tolist(),
+        "threshold": metadata.get("threshold"),
+        "blocks": blocks,
+        "params": params,
+        "storage": "npz" if compress else "npy",
+        "arrays": sorted(arrays),
+        "metadata": metadata,
+    }
+    # Fail at export time rather than at load time on inconsistent feature counts.
+    _feature_layout(blocks, params["n_features"])
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in [*path.glob("*.npy"), path / ARRAYS_NAME, path / MANIFEST_NAME]:
+        stale.unlink(missing_ok=True)
+
+    if compress:
+        np.savez_compressed(path / ARRAYS_NAME, **arrays)
+    else:
+        for name, array in arrays.items():
+            np.save(path / f"{name}.npy", np.ascontiguousarray(array))
+    # The manifest goes last: a directory without one is an unfinished export.
+    (path / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+
+    size_mb = sum(f.stat().st_size for f in path.iterdir()) / 1024**2
+    logger.info(
+        "Exported %s artifact to %s (%d arrays, %.1f MB, %s)",
+        model_type,
+        path,
+        len(arrays),
+        size_mb,
+        "compressed" if compress else "memory-mappable",
+    )
+    return path
+
+
+def _feature_layout(blocks: list[dict], n_features: int | None) -> tuple[np.ndarray, np.ndarray]:
+    # Model feature j reads input column source[j]; one-hot features compare it with the
+    # category index category[j], direct features (scaled, ordinal) use it as is (-1).
+    source: list[int] = []
+    category: list[int] = []
+    column = 0
+    for block in blocks:
+        for i in range(len(block["columns"])):
+            if block["kind"] == "onehot":
+                n = len(block["categories"][i])
+                source.extend([column] * n)
+                category.extend(range(n))
+            else:
+                source.append(column)
+                category.append(-1)
+            column += 1
+
+    if n_features is not None and len(source) != n_features:
+        raise ValueError(
+            f"Preprocessor produces {len(source)} features, model expects {n_features}"
+        )
+    return np.asarray(source, dtype=np.intp), np.asarray(category, dtype=np.int64)
+
+
+@dataclass
+class ArtifactModel:
+    manifest: dict[str, Any]
+    arrays: Mapping[str, np.ndarray] = field(repr=False)
+
+    def __post_init__(self) -> None:
+        self.model_type = self.manifest["model_type"]
+        self.params = self.manifest["params"]
+        self._source, self._category = _feature_layout(
+            self.manifest["blocks"], self.params["n_features"]
+        )
+        self._has_onehot = bool((self._category >= 0).any())
+        self._needs_time = not set(TIME_FEATURES).isdisjoint(self.manifest["input_columns"])
+        self._lookups = []
+        for block in self.manifest["blocks"]:
+            if block["kind"] in ("onehot", "ordinal"):
+                self._lookups.append([pd.Index(c, dtype=object) for c in block["categories"]])
+            else:
+                self._lookups.append(None)
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return self.manifest.get("metadata", {})
+
+    def _inputs(self, X: pd.DataFrame) -> np.ndarray:
+        # One column per input column: scaled numbers, category indices (-1 unknown) for
+        # one-hot columns and ordinal codes (NaN unknown) for ordinal ones.
+        if (
+            self._needs_time
+            and "transaction_time" in X.columns
+            and not set(TIME_FEATURES).issubset(X.columns)
+        ):
+            X = add_basic_features(X)
+        missing = set(self.manifest["input_columns"]) - set(X.columns)
+        if missing:
+            raise ValueError(f"Columns are missing from the input: {sorted(missing)}")
+
+        columns: list[np.ndarray] = []
+        for index, (block, lookups) in enumerate(
+            zip(self.manifest["blocks"], self._lookups, strict=True)
+        ):
+            if block["kind"] == "scale":
+                values = X[block["columns"]].to_numpy(dtype=np.float64, na_value=np.nan)
+                mean = self.arrays[f"scale{index}_mean"]
+                scale = self.arrays[f"scale{index}_scale"]
+                columns.extend(((values - mean) / scale).T)
+                continue
+
+            for i, (col, lookup) in enumerate(zip(block["columns"], lookups, strict=True)):
+                positions = lookup.get_indexer(_missing_to_nan(X[col]))
+                if block["kind"] == "onehot":
+                    columns.append(positions.astype(np.float64))
+                else:
+                    codes = np.asarray(block["codes"][i], dtype=np.float64)
+                    columns.append(np.where(positions >= 0, codes[positions], np.nan))
+
+        return np.column_stack(columns) if columns else np.empty((len(X), 0))
+
+    def _feature_values(
+        self, inputs: np.ndarray, rows: np.ndarray, features: np.ndarray
+    ) -> np.ndarray:
+        values = inputs[rows, self._source[features]]
+        if self._has_onehot:
+            category = self._category[features]
+            values = np.where(category >= 0, values == category, values)
+        return values
+
+    def _linear(self, inputs: np.ndarray) -> np.ndarray:
+        coef = self.arrays["coef"]
+        z = np.full(len(inputs), self.params["intercept"])
+        direct = np.flatnonzero(self._category < 0)
+        if len(direct):
+            z += inputs[:, self._source[direct]] @ coef[direct]
+        # One-hot blocks contribute the weight of the observed category only.
+        for column in np.unique(self._source[self._category >= 0]):
+            first = int(np.argmax(self._source == column))
+            positions = inputs[:, column].astype(np.int64)
+            z += np.where(positions >= 0, coef[first + positions], 0.0)
+        return expit(z)
+
+    def _in_bitset(self, name: str, rows: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        words = self.arrays[name][rows, codes >> 5]
+        return ((words >> (codes & 31)) & 1).astype(bool)
+
+    def _trees(self, inputs: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        n_trees = len(a["roots"])
+        nodes = np.tile(a["roots"], len(inputs))
+        rows = np.repeat(np.arange(len(inputs)), n_trees)
+        # (row, tree) pairs still above a leaf; leaves point to themselves.
+        active = np.arange(len(nodes))
+        categorical = "is_categorical" in a
+
+        for _ in range(self.params["depth"]):
+            current = nodes[active]
+            inner = a["left"][current] != current
+            active, current = active[inner], current[inner]
+            if not len(active):
+                break
+
+            features = a["feature"][current]
+            x = self._feature_values(inputs, rows[active], features)
+            if self.params["float32_inputs"]:
+                x = x.astype(np.float32)  # sklearn trees compare float32 inputs
+
+            missing = np.isnan(x)
+            go_left = x <= a["threshold"][current]
+            if categorical:
+                is_cat = a["is_categorical"][current].astype(bool)
+                if is_cat.any():
+                    valid = is_cat & ~missing & (x >= 0) & (x <= MAX_CATEGORY_CODE)
+                    codes = np.where(valid, x, 0).astype(np.int64)
+                    in_left = self._in_bitset("left_cat_bitsets", a["bitset_idx"][current], codes)
+                    known = self._in_bitset("known_cat_bitsets", a["f_idx_map"][features], codes)
+                    # Unknown and negative categories follow the missing-value direction.
+                    missing |= is_cat & ~(valid & (in_left | known))
+                    go_left = np.where(is_cat, valid & in_left, go_left)
+
+            go_left = np.where(missing, a["missing_left"][current].astype(bool), go_left)
+            nodes[active] = np.where(go_left, a["left"][current], a["right"][current])
+
+        leaf_values = a["value"][nodes].reshape(len(inputs), n_trees)
+        if self.model_type == "hgb":
+            return expit(self.params["baseline"] + leaf_values.sum(axis=1))
+        return leaf_values.mean(axis=1)
+
+    def predict_proba(
+        self, X: pd.DataFrame | Mapping[str, Any] | Sequence[Mapping[str, Any]]
+    ) -> np.ndarray:
+        if isinstance(X, Mapping):
+            X = [X]
+        if not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(list(X))
+
+        inputs = self._inputs(X)
+        if self.model_type == "logreg":
+            proba = self._linear(inputs)
+        else:
+            chunk = max(1, CHUNK_CELLS // len(self.arrays["roots"]))
+            proba = np.concatenate(
+                [self._trees(inputs[i : i + chunk]) for i in range(0, len(inputs), chunk)]
+                or [np.empty(0)]
+            )
+        if "negative_rate" in self.params:
+            proba = correct_probabilities(proba, self.params["negative_rate"])
+        return np.column_stack([1.0 - proba, proba])
+
+
+def is_artifact(path: str | Path) -> bool:
+    return (Path(path) / MANIFEST_NAME).is_file()
+
+
+def load_artifact(path: str | Path, mmap: bool = True) -> ArtifactModel:
+    path = Path(path)
+    if not is_artifact(path):
+        raise FileNotFoundError(f"No model artifact found at {path}")
+
+    manifest = json.loads((path / MANIFEST_NAME).read_text())
+    version = manifest.get("format_version")
+    if version != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact format version {version}, expected {ARTIFACT_FORMAT_VERSION}"
+        )
+
+    if manifest["storage"] == "npz":
+        with np.load(path / ARRAYS_NAME) as npz:
+            arrays = {name: npz[name] for name in manifest["arrays"]}
+    else:
+        # Read-only memory maps: worker processes loading the same artifact share the
+        # page cache instead of holding private copies of the tree arrays.
+        arrays = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None)
+            for name in manifest["arrays"]
+        }
+
+    logger.info(
+        "Loaded %s artifact from %s (%s)",
+        manifest["model_type"],
+        path,
+        "memory-mapped" if mmap and manifest["storage"] == "npy" else "in memory",
+    )
+    return ArtifactModel(manifest=manifest, arrays=arrays)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import math
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from fraudguard.features import TIME_FEATURES, extract_time_features
+
+logger = logging.getLogger(__name__)
+
+
+def _sigmoid(z: float) -> float:
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    ez = math.exp(z)
+    return ez / (1.0 + ez)
+
+
+@dataclass
+class CompiledLogReg:
+    numeric_cols: list[str]
+    numeric_weights: np.ndarray
+    categorical_cols: list[str]
+    category_weights: list[dict[Any, float]]
+    intercept: float
+
+    def __post_init__(self) -> None:
+        self._numeric_weights = self.numeric_weights.tolist()
+        self._needs_time = not set(TIME_FEATURES).isdisjoint(self.numeric_cols)
+
+    def _numeric_values(self, row: Mapping[str, Any]) -> list[float]:
+        if self._needs_time and "transaction_time" in row:
+            time_features = extract_time_features(row["transaction_time"])
+            if math.isnan(time_features["hour"]):
+                raise ValueError(f"Cannot parse transaction_time: {row['transaction_time']!r}")
+            row = {**time_features, **row}
+        values = []
+        for col in self.numeric_cols:
+            value = row.get(col)
+            # The sklearn pipeline rejects NaN inputs: a NaN score would read as "legitimate".
+            value = math.nan if value is None else float(value)
+            if math.isnan(value):
+                raise ValueError(f"Missing value for numeric feature '{col}'")
+            values.append(value)
+        return values
+
+    def _categorical_contribution(self, row: Mapping[str, Any]) -> float:
+        total = 0.0
+        for col, weights in zip(self.categorical_cols, self.category_weights, strict=True):
+            total += weights.get(row.get(col), 0.0)
+        return total
+
+    def decision_function_one(self, row: Mapping[str, Any]) -> float:
+        z = self.intercept + self._categorical_contribution(row)
+        for weight, value in zip(self._numeric_weights, self._numeric_values(row), strict=True):
+            z += weight * value
+        return z
+
+    def predict_proba_one(self, row: Mapping[str, Any]) -> float:
+        return _sigmoid(self.decision_function_one(row))
+
+    def predict_proba(
+        self, rows: Mapping[str, Any] | Sequence[Mapping[str, Any]] | pd.DataFrame
+    ) -> np.ndarray:
+        if isinstance(rows, pd.DataFrame):
+            rows = rows.to_dict("records")
+        elif isinstance(rows, Mapping):
+            rows = [rows]
+
+        numeric = np.array([self._numeric_values(row) for row in rows], dtype=float)
+        z = np.fromiter(
+            (self._categorical_contribution(row) for row in rows), dtype=float, count=len(rows)
+        )
+        z += self.intercept
+        if self.numeric_cols:
+            z += numeric @ self.numeric_weights
+
+        proba = 1.0 / (1.0 + np.exp(-z))
+        return np.column_stack([1.0 - proba, proba])
+
+
+def compile_logreg(model: Pipeline) -> CompiledLogReg:
+    if not isinstance(model, Pipeline) or "preprocess" not in model.named_steps:
+        raise TypeError("Expected a Pipeline with 'preprocess' and 'clf' steps")
+
+    preprocessor = model.named_steps["preprocess"]
+    clf = model.named_steps["clf"]
+
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise TypeError(f"Unsupported preprocessor: {type(preprocessor).__name__}")
+    if not isinstance(clf, (LogisticRegression, SGDClassifier)):
+        raise TypeError(f"Only LogisticRegression can be compiled, got {type(clf).__name__}")
+    if isinstance(clf, SGDClassifier) and clf.loss != "log_loss":
+        raise TypeError(f"Only SGDClassifier with log_loss can be compiled, got {clf.loss}")
+    if clf.coef_.shape[0] != 1:
+        raise ValueError("Only binary LogisticRegression can be compiled")
+
+    coef = clf.coef_[0]
+    numeric_cols: list[str] = []
+    numeric_weights: list[float] = []
+    categorical_cols: list[str] = []
+    category_weights: list[dict[Any, float]] = []
+    intercept = float(clf.intercept_[0])
+    offset = 0
+
+    for name, transformer, cols in preprocessor.transformers_:
+        if name == "remainder" or transformer == "drop" or len(cols) == 0:
+            continue
+
+        if isinstance(transformer, StandardScaler):
+            n = len(cols)
+            mean = transformer.mean_ if transformer.with_mean else np.zeros(n)
+            scale = transformer.scale_ if transformer.with_std else np.ones(n)
+            # Fold the scaler into the linear model: w * (x - m) / s == (w / s) * x - w * m / s
+            weights = coef[offset : offset + n] / scale
+            intercept -= float(weights @ mean)
+            numeric_cols.extend(cols)
+            numeric_weights.extend(weights.tolist())
+            offset += n
+        elif isinstance(transformer, OneHotEncoder):
+            if transformer.drop is not None or getattr(transformer, "infrequent_categories_", None):
+                raise ValueError("OneHotEncoder with drop/infrequent categories is not supported")
+            for col, categories in zip(cols, transformer.categories_, strict=True):
+                n = len(categories)
+                weights = coef[offset : offset + n]
+                categorical_cols.append(col)
+                category_weights.append(
+                    dict(zip(categories.tolist(), weights.tolist(), strict=True))
+                )
+                offset += n
+        else:
+            raise TypeError(f"Unsupported transformer '{name}': {type(transformer).__name__}")
+
+    if offset != len(coef):
+        raise ValueError(f"Compiled {offset} features, but the model has {len(coef)} coefficients")
+
+    logger.info(
+        "Compiled LogisticRegression: %d numeric, %d categorical features",
+        len(numeric_cols),
+        len(categorical_cols),
+    )
+    return CompiledLogReg(
+        numeric_cols=numeric_cols,
+        numeric_weights=np.asarray(numeric_weights, dtype=float),
+        categorical_cols=categorical_cols,
+        category_weights=category_weights,
+        intercept=intercept,
+    )
+
+
+def try_compile(model: Any) -> Any:
+    try:
+        return compile_logreg(model)
+    except (TypeError, ValueError) as e:
+        logger.info("Falling back to the sklearn pipeline for scoring: %s", e)
+        return model
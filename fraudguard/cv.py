@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.model_selection import TimeSeriesSplit
+
+from fraudguard.data import time_split_indices
+from fraudguard.evaluate import EvaluationResult, evaluate_scores
+from fraudguard.features import build_preprocessor
+from fraudguard.models import MODEL_BUILDERS
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = ("expanding", "rolling")
+DEFAULT_SPLITS = 5
+DEFAULT_CONFIDENCE = 0.95
+CV_METRICS = ("precision", "recall", "f1", "roc_auc", "pr_auc")
+
+
+@dataclass
+class Fold:
+    index: int
+    train_start: int
+    train_stop: int
+    test_start: int
+    test_stop: int
+
+    @property
+    def n_train(self) -> int:
+        return self.train_stop - self.train_start
+
+    @property
+    def n_test(self) -> int:
+        return self.test_stop - self.test_start
+
+
+@dataclass
+class FoldResult:
+    fold: Fold
+    model: str
+    seconds: float
+    result: EvaluationResult = field(repr=False)
+
+
+@dataclass
+class MetricSummary:
+    mean: float
+    std: float
+    ci_low: float
+    ci_high: float
+    n_folds: int
+
+
+@dataclass
+class CVResult:
+    window: str
+    confidence: float
+    folds: list[FoldResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self, model: str) -> dict[str, MetricSummary]:
+        results = [f.result for f in self.folds if f.model == model]
+        return {
+            metric: summarize([getattr(r, metric) for r in results], self.confidence)
+            for metric in CV_METRICS
+        }
+
+    @property
+    def models(self) -> list[str]:
+        return list(dict.fromkeys(f.model for f in self.folds))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "window": self.window,
+            "confidence": self.confidence,
+            "seconds": round(self.seconds, 3),
+            "summary": {
+                model: {metric: vars(s) for metric, s in self.summary(model).items()}
+                for model in self.models
+            },
+            "folds": [
+                {
+                    "model": f.model,
+                    "fold": f.fold.index,
+                    "train_rows": [f.fold.train_start, f.fold.train_stop],
+                    "test_rows": [f.fold.test_start, f.fold.test_stop],
+                    "seconds": round(f.seconds, 3),
+                    **{metric: getattr(f.result, metric) for metric in CV_METRICS},
+                }
+                for f in self.folds
+            ],
+        }
+
+    def __str__(self) -> str:
+        level = f"{self.confidence:.0%} CI"
+        header = f"{'Model':<10} {'Metric':<10} {'Mean':>8} {'Std':>8} {level:>19} {'Folds':>6}"
+        lines = ["=" * len(header), f"Time-series CV ({self.window} window)", header]
+        lines.append("-" * len(header))
+        for model in self.models:
+            for metric, s in self.summary(model).items():
+                ci = f"[{s.ci_low:.4f}, {s.ci_high:.4f}]"
+                lines.append(
+                    f"{model:<10} {metric:<10} {s.mean:>8.4f} {s.std:>8.4f} {ci:>19} {s.n_folds:>6}"
+                )
+        lines.append("=" * len(header))
+        return "\n".join(lines)
+
+
+def summarize(
+    values: Sequence[float | None], confidence: float = DEFAULT_CONFIDENCE
+) -> MetricSummary:
+    # Folds whose test window has a single class have no ROC/PR-AUC: they are left out.
+    values = np.array([v for v in values if v is not None and not np.isnan(v)], dtype=float)
+    n = len(values)
+    if n == 0:
+        return MetricSummary(np.nan, np.nan, np.nan, np.nan, 0)
+    mean = float(values.mean())
+    if n == 1:
+        return MetricSummary(mean, np.nan, np.nan, np.nan, 1)
+    std = float(values.std(ddof=1))
+    # Student t interval: few folds, unknown variance.
+    half = float(stats.t.ppf((1 + confidence) / 2, n - 1)) * std / np.sqrt(n)
+    return MetricSummary(mean, std, mean - half, mean + half, n)
+
+
+def time_series_folds(
+    n_rows: int,
+    n_splits: int = DEFAULT_SPLITS,
+    window: str = "expanding",
+    train_size: int | None = None,
+    test_size: int | None = None,
+    gap: int = 0,
+) -> list[Fold]:
+    if window not in WINDOWS:
+        raise ValueError(f"Unknown window '{window}', expected one of {WINDOWS}")
+    if window == "rolling" and train_size is None:
+        raise ValueError("A rolling window requires train_size")
+
+    splitter = TimeSeriesSplit(
+        n_splits=n_splits,
+        max_train_size=train_size if window == "rolling" else None,
+        test_size=test_size,
+        gap=gap,
+    )
+    # Rows are in time order, so every fold is a pair of contiguous ranges.
+    return [
+        Fold(index, int(train[0]), int(train[-1]) + 1, int(test[0]), int(test[-1]) + 1)
+        for index, (train, test) in enumerate(splitter.split(np.empty((n_rows, 1))))
+    ]
+
+
+def write_columns(df: pd.DataFrame, directory: str | Path) -> list[dict[str, Any]]:
+    # One .npy file per column: workers memory-map them instead of unpickling a copy.
+    directory = Path(directory)
+    columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        spec: dict[str, Any] = {"name": col, "file": str(directory / f"{i}.npy")}
+        if pd.api.types.is_numeric_dtype(values) and not isinstance(
+            values.dtype, pd.CategoricalDtype
+        ):
+            array = values.to_numpy()
+        else:
+            categorical = pd.Categorical(values)
+            array = categorical.codes
+            spec["categories"] = categorical.categories.tolist()
+        np.save(spec["file"], np.ascontiguousarray(array))
+        columns.append(spec)
+    return columns
+
+
+def read_columns(columns: list[dict[str, Any]], start: int, stop: int) -> pd.DataFrame:
+    data = {}
+    for spec in columns:
+        values = np.load(spec["file"], mmap_mode="r")[start:stop]
+        if "categories" in spec:
+            data[spec["name"]] = pd.Categorical.from_codes(values, categories=spec["categories"])
+        else:
+            data[spec["name"]] = np.asarray(values)
+    return pd.DataFrame(data)
+
+
+_WORKER_DATA: dict[str, Any] = {}
+
+
+def _init_worker(columns: list[dict[str, Any]], target_file: str) -> None:
+    # Workers receive file paths only; the pages of the shared arrays come from the OS cache.
+    _WORKER_DATA.update(columns=columns, y=np.load(target_file, mmap_mode="r"))
+    for name in ("fraudguard.features", "fraudguard.models", "fraudguard.evaluate"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def _run_fold(
+    fold: Fold, model: str, params: dict[str, Any], encoder: str, threshold: float
+) -> FoldResult:
+    start = time.perf_counter()
+    columns, y = _WORKER_DATA["columns"], _WORKER_DATA["y"]
+    X_train = read_columns(columns, fold.train_start, fold.train_stop)
+    X_test = read_columns(columns, fold.test_start, fold.test_stop)
+    y_train = np.asarray(y[fold.train_start : fold.train_stop])
+    y_test = np.asarray(y[fold.test_start : fold.test_stop])
+
+    # The preprocessor is fitted on the training window only, as in production.
+    preprocessor, _, _ = build_preprocessor(X_train, encoder=encoder)
+    pipeline = MODEL_BUILDERS[model](preprocessor, **params)
+    clf = pipeline.named_steps["clf"]
+    if "n_jobs" in clf.get_params():
+        clf.set_params(n_jobs=1)  # parallelism comes from the process pool
+    pipeline.fit(X_train, y_train)
+
+    scores = pipeline.predict_proba(X_test)[:, 1]
+    return FoldResult(
+        fold=fold,
+        model=model,
+        seconds=time.perf_counter() - start,
+        result=evaluate_scores(y_test, scores, threshold),
+    )
+
+
+def cross_validate(
+    df: pd.DataFrame,
+    target_col: str = "isFraud",
+    models: Sequence[str] = ("logreg",),
+    params: dict[str, dict[str, Any]] | None = None,
+    encoders: dict[str, str] | None = None,
+    n_splits: int = DEFAULT_SPLITS,
+    window: str = "expanding",
+    train_size: int | None = None,
+    test_size: int | None = None,
+    gap: int = 0,
+    time_col: str = "transaction_time",
+    threshold: float = 0.5,
+    confidence: float = DEFAULT_CONFIDENCE,
+    n_jobs: int | None = None,
+) -> CVResult:
+    if target_col not in df.columns:
+        raise KeyError(f"Target column '{target_col}' not found in DataFrame")
+    unknown = set(models) - set(MODEL_BUILDERS)
+    if unknown:
+        raise ValueError(f"Unknown models {sorted(unknown)}, expected {sorted(MODEL_BUILDERS)}")
+
+    folds = time_series_folds(len(df), n_splits, window, train_size, test_size, gap)
+    params = params or {}
+    encoders = encoders or {}
+
+    if time_col in df.columns:
+        order, _, _ = time_split_indices(df[time_col], test_size=0.0, valid_size=0.0)
+        df = df.drop(columns=[time_col]).take(order)
+    else:
+        logger.warning("Time column '%s' not found, folds follow the row order", time_col)
+
+    tasks = [
+        (fold, model, params.get(model, {}), encoders.get(model, "onehot"), threshold)
+        for model in models
+        for fold in folds
+    ]
+    max_workers = n_jobs or min(os.cpu_count() or 1, len(tasks))
+    result = CVResult(window=window, confidence=confidence)
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix="fraudguard-cv-") as directory:
+        columns = write_columns(df.drop(columns=[target_col]), directory)
+        target_file = str(Path(directory) / "target.npy")
+        np.save(target_file, df[target_col].to_numpy().astype(np.int8))
+        del df
+
+        logger.info(
+            "Time-series CV: %d folds x %d models (%s window), %d workers",
+            len(folds),
+            len(models),
+            window,
+            max_workers,
+        )
+        with multiprocessing.Pool(
+            processes=max_workers, initializer=_init_worker, initargs=(columns, target_file)
+        ) as pool:
+            for fold_result in pool.starmap(_run_fold, tasks):
+                logger.info(
+                    "Fold %d, %s: train %d rows, test %d rows, PR-AUC %s, F1 %.4f (%.1fs)",
+                    fold_result.fold.index,
+                    fold_result.model,
+                    fold_result.fold.n_train,
+                    fold_result.fold.n_test,
+                    "n/a"
+                    if fold_result.result.pr_auc is None
+                    else f"{fold_result.result.pr_auc:.4f}",
+                    fold_result.result.f1,
+                    fold_result.seconds,
+                )
+                result.folds.append(fold_result)
+
+    result.seconds = time.perf_counter() - start
+    logger.info("Cross-validation finished in %.1fs", result.seconds)
+    return result
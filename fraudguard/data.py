@@ -1,63 +1,348 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
+from collections.abc import Iterator
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
 import pandas as pd
+from pandas.api import types as ptypes
 from sklearn.model_selection import train_test_split
 
+from fraudguard.features import TARGET_COLUMNS, parse_timestamps
+
 if TYPE_CHECKING:
     pass
 
 logger = logging.getLogger(__name__)
 
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+CACHE_SUBDIR = "cache"
+FINGERPRINT_SAMPLE_BYTES = 1024**2
+CACHE_KEY_LENGTH = 16
 
+DTYPE_SAMPLE_ROWS = 100_000
+MONETARY_COLUMNS = frozenset(
+    {"amount", "oldbalanceorg", "newbalanceorig", "oldbalancedest", "newbalancedest"}
+)
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+DEFAULT_CHUNKSIZE = 500_000
+SPLIT_METHODS = ("random", "time")
 
-def load_raw_data(fname: str = "transactions.csv") -> pd.DataFrame:
-    path = DATA_DIR / "raw" / fname
-    logger.info("Loading data from %s", path)
 
+def _raw_path(fname: str) -> Path:
+    path = DATA_DIR / "raw" / fname
     if not path.exists():
         raise FileNotFoundError(
             f"Data file not found: {path}. Please download the dataset and place it in data/raw/"
         )
+    return path
+
+
+def memory_usage_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def infer_compact_dtypes(
+    sample: pd.DataFrame,
+    category_max_unique_ratio: float = CATEGORY_MAX_UNIQUE_RATIO,
+) -> dict[str, str]:
+    # Only dtypes that stay valid past the sample: an int8 target would fail on a missing
+    # label further down the file, so targets are narrowed after the read instead.
+    dtypes = {}
+    for col in sample.columns:
+        series = sample[col]
+        if col.lower() in TARGET_COLUMNS:
+            continue
+        if ptypes.is_float_dtype(series):
+            # float32 keeps ~7 significant digits: cents are lost above ~16.7M.
+            if col.lower() not in MONETARY_COLUMNS:
+                dtypes[col] = "float32"
+        elif (
+            ptypes.is_object_dtype(series)
+            and len(series) > 0
+            and series.nunique(dropna=True) / len(series) <= category_max_unique_ratio
+        ):
+            dtypes[col] = "category"
+    return dtypes
+
 
-    df = pd.read_csv(path)
-    logger.info("Loaded %d rows, %d columns", len(df), len(df.columns))
+def _narrow_targets(df: pd.DataFrame) -> pd.DataFrame:
+    # Checked against every row: labels with missing values keep their wider dtype.
+    for col in df.columns:
+        if col.lower() in TARGET_COLUMNS and ptypes.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
     return df
 
 
+def _read_options(
+    path: Path,
+    usecols: list[str] | None,
+    dtype: dict[str, Any] | None,
+    optimize_dtypes: bool,
+    chunked: bool = False,
+) -> dict[str, Any]:
+    resolved: dict[str, Any] = {}
+    if optimize_dtypes:
+        sample = pd.read_csv(path, usecols=usecols, nrows=DTYPE_SAMPLE_ROWS)
+        inferred = infer_compact_dtypes(sample)
+        if chunked:
+            # Each chunk would get its own categories (and codes): keep strings as objects.
+            inferred = {col: value for col, value in inferred.items() if value != "category"}
+        resolved.update(inferred)
+    if dtype:
+        resolved.update(dtype)
+
+    if resolved:
+        logger.info("Using dtypes: %s", resolved)
+    return {"usecols": usecols, "dtype": resolved or None}
+
+
+def read_transactions(
+    path: str | Path,
+    usecols: list[str] | None = None,
+    dtype: dict[str, Any] | None = None,
+    optimize_dtypes: bool = False,
+) -> pd.DataFrame:
+    path = Path(path)
+    df = pd.read_csv(path, **_read_options(path, usecols, dtype, optimize_dtypes))
+    return _narrow_targets(df) if optimize_dtypes else df
+
+
+def _source_fingerprint(path: Path) -> str:
+    stat = path.stat()
+    digest = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    # Hash the head and tail of the file as well, so a rewrite that keeps size and
+    # mtime (e.g. restored from an archive) still invalidates the cache.
+    with path.open("rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if stat.st_size > FINGERPRINT_SAMPLE_BYTES:
+            f.seek(max(stat.st_size - FINGERPRINT_SAMPLE_BYTES, FINGERPRINT_SAMPLE_BYTES))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _cache_path(path: Path, options: dict[str, Any]) -> Path:
+    # <stem>-<path key>-<source key>-<options key>: the path key keeps files with the same
+    # name in different directories apart, the source key tells stale caches of one file
+    # apart from caches of it read with other options.
+    path_key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:CACHE_KEY_LENGTH]
+    source_key = _source_fingerprint(path)[:CACHE_KEY_LENGTH]
+    options_key = hashlib.sha1(json.dumps(options, sort_keys=True, default=str).encode())
+    return (
+        DATA_DIR
+        / CACHE_SUBDIR
+        / (
+            f"{path.stem}-{path_key}-{source_key}-"
+            f"{options_key.hexdigest()[:CACHE_KEY_LENGTH]}.feather"
+        )
+    )
+
+
+def _cache_keys(candidate: Path, source_stem: str) -> tuple[str, str] | None:
+    # (path key, source key) of a cache file of source_stem, or None for other files.
+    prefix = f"{source_stem}-"
+    if not candidate.stem.startswith(prefix):
+        return None
+    keys = candidate.stem[len(prefix) :].split("-")
+    if len(keys) != 3 or not all(
+        len(key) == CACHE_KEY_LENGTH and all(c in "0123456789abcdef" for c in key) for key in keys
+    ):
+        return None
+    return keys[0], keys[1]
+
+
+def _import_feather() -> Any:
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return None
+    return feather
+
+
+def _read_cache(cache_path: Path, memory_map: bool) -> pd.DataFrame | None:
+    feather = _import_feather()
+    if feather is None or not cache_path.exists():
+        return None
+    logger.info("Loading cached data from %s (memory_map=%s)", cache_path, memory_map)
+    table = feather.read_table(cache_path, memory_map=memory_map)
+    if not memory_map:
+        return table.to_pandas()
+    # The cache is uncompressed and written as one chunk, so with split_blocks numeric
+    # columns without missing values stay read-only views of the mapped file.
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_cache(df: pd.DataFrame, cache_path: Path, source_stem: str) -> None:
+    feather = _import_feather()
+    if feather is None:
+        logger.warning("pyarrow is not installed, raw data cache is disabled")
+        return
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    path_key, source_key = _cache_keys(cache_path, source_stem)
+    for stale in cache_path.parent.glob("*.feather"):
+        keys = _cache_keys(stale, source_stem)
+        if keys is not None and keys[0] == path_key and keys[1] != source_key:
+            logger.info("Removing stale cache %s", stale)
+            stale.unlink()
+
+    tmp_path = cache_path.with_suffix(".tmp")
+    feather.write_feather(
+        df.reset_index(drop=True),
+        tmp_path,
+        compression="uncompressed",
+        chunksize=max(len(df), 1),
+    )
+    os.replace(tmp_path, cache_path)
+    logger.info("Cached data to %s", cache_path)
+
+
+def load_raw_data(
+    fname: str = "transactions.csv",
+    usecols: list[str] | None = None,
+    dtype: dict[str, Any] | None = None,
+    optimize_dtypes: bool = False,
+    cache: bool = False,
+    memory_map: bool = False,
+) -> pd.DataFrame:
+    path = _raw_path(fname)
+    logger.info("Loading data from %s", path)
+
+    cache_path = None
+    df = None
+    if cache:
+        cache_path = _cache_path(
+            path, {"usecols": usecols, "dtype": dtype, "optimize_dtypes": optimize_dtypes}
+        )
+        df = _read_cache(cache_path, memory_map)
+
+    if df is None:
+        df = read_transactions(path, usecols, dtype, optimize_dtypes)
+        if cache_path is not None:
+            _write_cache(df, cache_path, path.stem)
+
+    logger.info(
+        "Loaded %d rows, %d columns (%.1f MB in memory)",
+        len(df),
+        len(df.columns),
+        memory_usage_mb(df),
+    )
+    return df
+
+
+def iter_raw_data(
+    fname: str = "transactions.csv",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    usecols: list[str] | None = None,
+    dtype: dict[str, Any] | None = None,
+    optimize_dtypes: bool = False,
+) -> Iterator[pd.DataFrame]:
+    path = _raw_path(fname)
+    logger.info("Streaming data from %s (chunksize=%d)", path, chunksize)
+
+    options = _read_options(path, usecols, dtype, optimize_dtypes, chunked=True)
+    rows = 0
+    chunks = 0
+    peak_mb = 0.0
+
+    with pd.read_csv(path, chunksize=chunksize, **options) as reader:
+        for chunk in reader:
+            rows += len(chunk)
+            chunks += 1
+            peak_mb = max(peak_mb, memory_usage_mb(chunk))
+            logger.debug("Read chunk %d (%d rows total)", chunks, rows)
+            yield chunk
+
+    logger.info(
+        "Streamed %d rows in %d chunks (peak chunk %.1f MB in memory)", rows, chunks, peak_mb
+    )
+
+
+def split_indices(
+    y: Any,
+    test_size: float = 0.2,
+    valid_size: float = 0.25,
+    random_state: int = 42,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Stratified shuffle splits depend only on the labels, so splitting row positions gives
+    # the same rows as splitting the frame, without copying it.
+    y = np.asarray(y)
+    rows = np.arange(len(y))
+    temp, test = train_test_split(rows, test_size=test_size, stratify=y, random_state=random_state)
+    valid_ratio = valid_size / (1 - test_size)
+    train, valid = train_test_split(
+        temp, test_size=valid_ratio, stratify=y[temp], random_state=random_state
+    )
+    return train, valid, test
+
+
+def time_split_indices(
+    times: pd.Series,
+    test_size: float = 0.2,
+    valid_size: float = 0.25,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    ts = parse_timestamps(times)
+    missing = int(ts.isna().sum())
+    if missing:
+        logger.warning("%d rows without a valid timestamp are put in the train split", missing)
+    # NaT sorts first; the stable sort keeps file order among equal timestamps.
+    order = np.argsort(ts.to_numpy(dtype="datetime64[ns]").view(np.int64), kind="stable")
+    n_test = round(len(order) * test_size)
+    n_valid = round(len(order) * valid_size)
+    n_train = len(order) - n_valid - n_test
+    return order[:n_train], order[n_train : n_train + n_valid], order[n_train + n_valid :]
+
+
 def train_valid_test_split(
     df: pd.DataFrame,
     target_col: str = "is_fraud",
     test_size: float = 0.2,
     valid_size: float = 0.25,
     random_state: int = 42,
+    method: str = "random",
+    time_col: str = "transaction_time",
 ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.Series, pd.Series, pd.Series]:
     if target_col not in df.columns:
         raise KeyError(f"Target column '{target_col}' not found in DataFrame")
+    if method not in SPLIT_METHODS:
+        raise ValueError(f"Unknown split method '{method}', expected one of {SPLIT_METHODS}")
 
-    X = df.drop(columns=[target_col])
     y = df[target_col]
-
     logger.info("Target distribution: %s", y.value_counts().to_dict())
 
-    X_temp, X_test, y_temp, y_test = train_test_split(
-        X, y, test_size=test_size, stratify=y, random_state=random_state
-    )
+    if method == "time":
+        if time_col not in df.columns:
+            raise KeyError(f"Time column '{time_col}' not found in DataFrame")
+        # Train on the past, validate and test on the most recent transactions.
+        parts = time_split_indices(df[time_col], test_size=test_size, valid_size=valid_size)
+    else:
+        parts = split_indices(
+            y, test_size=test_size, valid_size=valid_size, random_state=random_state
+        )
 
-    valid_ratio = valid_size / (1 - test_size)
-    X_train, X_valid, y_train, y_valid = train_test_split(
-        X_temp, y_temp, test_size=valid_ratio, stratify=y_temp, random_state=random_state
-    )
+    # One copy per split: rows and feature columns are selected in a single iloc.
+    features = [i for i, col in enumerate(df.columns) if col != target_col]
+    X_train, X_valid, X_test = (df.iloc[rows, features] for rows in parts)
+    y_train, y_valid, y_test = (y.iloc[rows] for rows in parts)
 
     logger.info(
-        "Split sizes - Train: %d, Valid: %d, Test: %d",
+        "Split sizes (%s) - Train: %d, Valid: %d, Test: %d",
+        method,
         len(X_train),
         len(X_valid),
         len(X_test),
     )
+    if method == "time":
+        logger.info(
+            "Fraud rate - Train: %.4f, Valid: %.4f, Test: %.4f",
+            y_train.mean(),
+            y_valid.mean(),
+            y_test.mean(),
+        )
 
     return X_train, X_valid, X_test, y_train, y_valid, y_test
@@ -1,25 +1,19 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
-from sklearn.metrics import (
-    average_precision_score,
-    classification_report,
-    confusion_matrix,
-    f1_score,
-    precision_score,
-    recall_score,
-    roc_auc_score,
-)
 
 if TYPE_CHECKING:
     import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+REPORT_DIGITS = 4
+DEFAULT_HISTOGRAM_BINS = 10_000
+
 
 @dataclass
 class EvaluationResult:
@@ -55,51 +49,249 @@ class EvaluationResult:
         return "\n".join(lines)
 
 
-def evaluate_model(
-    model: Any,
-    X: pd.DataFrame,
-    y_true: pd.Series,
-    threshold: float = 0.5,
-) -> EvaluationResult:
-    y_pred = model.predict(X)
+@dataclass
+class ScoreCurve:
+    thresholds: np.ndarray
+    tps: np.ndarray
+    fps: np.ndarray
+    n_pos: int
+    n_neg: int
 
-    y_proba = _get_probabilities(model, X)
+    def counts_at(self, threshold: float) -> tuple[int, int, int, int]:
+        # thresholds are strictly decreasing: count the distinct scores >= threshold
+        idx = int(np.searchsorted(-self.thresholds, -threshold, side="right"))
+        tp = int(self.tps[idx - 1]) if idx else 0
+        fp = int(self.fps[idx - 1]) if idx else 0
+        return tp, fp, self.n_pos - tp, self.n_neg - fp
+
+    def roc_auc(self) -> float:
+        if self.n_pos == 0 or self.n_neg == 0:
+            raise ValueError("ROC-AUC is not defined when only one class is present in y_true")
+        tpr = np.concatenate([[0.0], self.tps / self.n_pos])
+        fpr = np.concatenate([[0.0], self.fps / self.n_neg])
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2)
+
+    def average_precision(self) -> float:
+        if self.n_pos == 0:
+            raise ValueError("Average precision is not defined without positive samples")
+        precision = self.tps / (self.tps + self.fps)
+        recall_gain = np.diff(self.tps, prepend=0) / self.n_pos
+        return float(np.sum(recall_gain * precision))
+
+
+def score_curve(y_true: Any, y_score: Any) -> ScoreCurve:
+    y = np.asarray(y_true) == 1
+    scores = np.asarray(y_score, dtype=float)
+    if len(y) != len(scores):
+        raise ValueError(f"Got {len(y)} labels but {len(scores)} scores")
+
+    # One descending sort; every curve and threshold metric is read from its cumsums.
+    order = np.argsort(-scores)
+    scores = scores[order]
+    y = y[order]
+
+    distinct = np.flatnonzero(np.diff(scores)) if len(scores) else np.empty(0, dtype=int)
+    last = np.r_[distinct, len(scores) - 1] if len(scores) else distinct
+    tps = np.cumsum(y, dtype=np.int64)[last]
+    fps = last + 1 - tps
+
+    n_pos = int(tps[-1]) if len(tps) else 0
+    return ScoreCurve(
+        thresholds=scores[last],
+        tps=tps,
+        fps=fps,
+        n_pos=n_pos,
+        n_neg=len(y) - n_pos,
+    )
+
+
+def _safe_div(num: float, den: float) -> float:
+    return num / den if den else 0.0
+
+
+def _class_metrics(tp: int, fp: int, fn: int) -> tuple[float, float, float]:
+    precision = _safe_div(tp, tp + fp)
+    recall = _safe_div(tp, tp + fn)
+    f1 = _safe_div(2 * tp, 2 * tp + fp + fn)
+    return precision, recall, f1
+
+
+def _label_counts(y_true: Any, y_pred: Any) -> tuple[int, int, int, int]:
+    y = (np.asarray(y_true) == 1).astype(np.int64)
+    tn, fp, fn, tp = np.bincount(2 * y + (np.asarray(y_pred) == 1), minlength=4).tolist()
+    return tp, fp, fn, tn
+
+
+def _present_labels(cm: np.ndarray) -> list[int]:
+    # Like sklearn, only report classes that occur in y_true or y_pred.
+    return [label for label in (0, 1) if cm[label, :].sum() or cm[:, label].sum()]
+
+
+def _confusion_matrix(tp: int, fp: int, fn: int, tn: int) -> np.ndarray:
+    cm = np.array([[tn, fp], [fn, tp]], dtype=np.int64)
+    labels = _present_labels(cm)
+    return cm[np.ix_(labels, labels)]
+
+
+def format_classification_report(
+    tp: int, fp: int, fn: int, tn: int, digits: int = REPORT_DIGITS
+) -> str:
+    cm = np.array([[tn, fp], [fn, tp]], dtype=np.int64)
+    labels = _present_labels(cm)
+    rows = []
+    for label in labels:
+        other = 1 - label
+        label_tp = cm[label, label]
+        metrics = _class_metrics(label_tp, cm[other, label], cm[label, other])
+        rows.append((str(label), *metrics, int(cm[label, :].sum())))
 
-    cm = confusion_matrix(y_true, y_pred)
-    precision = precision_score(y_true, y_pred, zero_division=0)
-    recall = recall_score(y_true, y_pred, zero_division=0)
-    f1 = f1_score(y_true, y_pred, zero_division=0)
+    total = int(cm[np.ix_(labels, labels)].sum())
+    supports = np.array([row[4] for row in rows], dtype=float)
+    per_class = np.array([row[1:4] for row in rows], dtype=float).reshape(-1, 3)
+    accuracy = _safe_div(sum(cm[label, label] for label in labels), total)
+    macro = per_class.mean(axis=0) if rows else np.zeros(3)
+    weighted = per_class.T @ supports / supports.sum() if supports.sum() else np.zeros(3)
+
+    # Same layout as sklearn.metrics.classification_report
+    width = max(*(len(row[0]) for row in rows), len("weighted avg"), digits)
+    head_fmt = "{:>{width}s} " + " {:>9}" * 4
+    row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+    accuracy_fmt = "{:>{width}s} " + " {:>9.{digits}}" * 2 + " {:>9.{digits}f}" + " {:>9}\n"
+
+    report = head_fmt.format("", "precision", "recall", "f1-score", "support", width=width)
+    report += "\n\n"
+    for row in rows:
+        report += row_fmt.format(*row, width=width, digits=digits)
+    report += "\n"
+    report += accuracy_fmt.format("accuracy", "", "", accuracy, total, width=width, digits=digits)
+    report += row_fmt.format("macro avg", *macro, total, width=width, digits=digits)
+    report += row_fmt.format("weighted avg", *weighted, total, width=width, digits=digits)
+    return report
+
+
+def _build_result(tp: int, fp: int, fn: int, tn: int, curve: ScoreCurve | None) -> EvaluationResult:
+    precision, recall, f1 = _class_metrics(tp, fp, fn)
 
     roc_auc = None
     pr_auc = None
 
-    if y_proba is not None:
+    if curve is not None:
         try:
-            roc_auc = roc_auc_score(y_true, y_proba)
-            pr_auc = average_precision_score(y_true, y_proba)
+            roc_auc = curve.roc_auc()
+            pr_auc = curve.average_precision()
         except ValueError as e:
             logger.warning("Could not compute AUC metrics: %s", e)
 
-    report = classification_report(y_true, y_pred, digits=4)
-
-    result = EvaluationResult(
-        confusion_matrix=cm,
+    return EvaluationResult(
+        confusion_matrix=_confusion_matrix(tp, fp, fn, tn),
         precision=precision,
         recall=recall,
         f1=f1,
         roc_auc=roc_auc,
         pr_auc=pr_auc,
-        classification_report=report,
+        classification_report=format_classification_report(tp, fp, fn, tn),
     )
 
-    logger.info("Evaluation complete - F1: %.4f, ROC-AUC: %s", f1, roc_auc)
+
+def evaluate_scores(y_true: Any, y_score: Any, threshold: float = 0.5) -> EvaluationResult:
+    curve = score_curve(y_true, y_score)
+    result = _build_result(*curve.counts_at(threshold), curve)
+    logger.info("Evaluation complete - F1: %.4f, ROC-AUC: %s", result.f1, result.roc_auc)
     return result
 
 
-def _get_probabilities(model: Any, X: pd.DataFrame) -> np.ndarray | None:
+def evaluate_model(
+    model: Any,
+    X: pd.DataFrame,
+    y_true: pd.Series,
+    threshold: float = 0.5,
+) -> EvaluationResult:
+    # Single inference pass: hard labels come from the probabilities at the threshold.
     if hasattr(model, "predict_proba"):
-        return model.predict_proba(X)[:, 1]
+        return evaluate_scores(y_true, model.predict_proba(X)[:, 1], threshold)
 
+    y_proba = _get_probabilities(model, X)
+    curve = score_curve(y_true, y_proba) if y_proba is not None else None
+    result = _build_result(*_label_counts(y_true, model.predict(X)), curve)
+    logger.info("Evaluation complete - F1: %.4f, ROC-AUC: %s", result.f1, result.roc_auc)
+    return result
+
+
+@dataclass
+class StreamingEvaluator:
+    threshold: float = 0.5
+    n_bins: int = DEFAULT_HISTOGRAM_BINS
+    tp: int = field(default=0, init=False)
+    fp: int = field(default=0, init=False)
+    fn: int = field(default=0, init=False)
+    tn: int = field(default=0, init=False)
+    pos_hist: np.ndarray = field(init=False, repr=False)
+    neg_hist: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.n_bins < 1:
+            raise ValueError(f"n_bins must be >= 1, got {self.n_bins}")
+        self.pos_hist = np.zeros(self.n_bins, dtype=np.int64)
+        self.neg_hist = np.zeros(self.n_bins, dtype=np.int64)
+
+    @property
+    def n_rows(self) -> int:
+        return self.tp + self.fp + self.fn + self.tn
+
+    def update(self, y_true: Any, y_score: Any) -> StreamingEvaluator:
+        y = np.asarray(y_true) == 1
+        scores = np.asarray(y_score, dtype=float)
+        if len(y) != len(scores):
+            raise ValueError(f"Got {len(y)} labels but {len(scores)} scores")
+
+        # Confusion counts at the threshold are exact; only the curves are binned.
+        tp, fp, fn, tn = _label_counts(y, scores >= self.threshold)
+        self.tp += tp
+        self.fp += fp
+        self.fn += fn
+        self.tn += tn
+
+        bins = np.clip((scores * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        self.pos_hist += np.bincount(bins[y], minlength=self.n_bins)
+        self.neg_hist += np.bincount(bins[~y], minlength=self.n_bins)
+        return self
+
+    def merge(self, other: StreamingEvaluator) -> StreamingEvaluator:
+        if (other.threshold, other.n_bins) != (self.threshold, self.n_bins):
+            raise ValueError(
+                f"Cannot merge evaluators with different settings: "
+                f"threshold/n_bins {self.threshold}/{self.n_bins} vs "
+                f"{other.threshold}/{other.n_bins}"
+            )
+        self.tp += other.tp
+        self.fp += other.fp
+        self.fn += other.fn
+        self.tn += other.tn
+        self.pos_hist += other.pos_hist
+        self.neg_hist += other.neg_hist
+        return self
+
+    def curve(self) -> ScoreCurve:
+        # Bins play the role of distinct scores: walk them from the highest score down.
+        pos = self.pos_hist[::-1]
+        neg = self.neg_hist[::-1]
+        occupied = np.flatnonzero(pos + neg)
+        edges = np.arange(self.n_bins - 1, -1, -1) / self.n_bins
+        tps = np.cumsum(pos)[occupied]
+        fps = np.cumsum(neg)[occupied]
+        return ScoreCurve(
+            thresholds=edges[occupied],
+            tps=tps,
+            fps=fps,
+            n_pos=int(self.pos_hist.sum()),
+            n_neg=int(self.neg_hist.sum()),
+        )
+
+    def result(self) -> EvaluationResult:
+        return _build_result(self.tp, self.fp, self.fn, self.tn, self.curve())
+
+
+def _get_probabilities(model: Any, X: pd.DataFrame) -> np.ndarray | None:
     if hasattr(model, "decision_function"):
         scores = model.decision_function(X)
         return (scores - scores.min()) / (scores.max() - scores.min() + 1e-10)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+import math
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
 import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler, TargetEncoder
 
 if TYPE_CHECKING:
     pass
@@ -13,29 +19,178 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 TARGET_COLUMNS = frozenset({"is_fraud", "isfraud", "target", "label", "fraud"})
+ENCODERS = ("onehot", "frequency", "target", "hashing", "ordinal")
+DEFAULT_HASH_FEATURES = 2**18
+# Native categorical support in HistGradientBoosting is limited to max_bins (255) values;
+# rarer categories are grouped together.
+MAX_ORDINAL_CATEGORIES = 255
+TIME_FEATURES = (
+    "hour",
+    "dayofweek",
+    "is_weekend",
+    "hour_sin",
+    "hour_cos",
+    "dayofweek_sin",
+    "dayofweek_cos",
+)
+
+
+def parse_timestamps(values: pd.Series, time_format: str | None = None) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    # Transaction logs repeat timestamps heavily: parse each distinct value once.
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(
+        pd.Series(uniques, dtype=object), format=time_format or "ISO8601", errors="coerce"
+    )
+
+    # Non-ISO leftovers: infer one format for all of them, then parse stragglers one by one.
+    for fallback_format in (None, "mixed"):
+        failed = parsed.isna().to_numpy()
+        if not failed.any():
+            break
+        parsed[failed] = pd.to_datetime(
+            pd.Series(uniques[failed], dtype=object), format=fallback_format, errors="coerce"
+        ).to_numpy()
 
+    result = pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(result, index=values.index, name=values.name)
 
-def add_basic_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+
+def add_basic_features(
+    df: pd.DataFrame,
+    inplace: bool = False,
+    time_format: str | None = None,
+) -> pd.DataFrame:
+    if not inplace:
+        df = df.copy()
 
     if "transaction_time" in df.columns:
-        dt = pd.to_datetime(df["transaction_time"], errors="coerce")
-        df["hour"] = dt.dt.hour
-        df["dayofweek"] = dt.dt.dayofweek
-        logger.debug("Added time features: hour, dayofweek")
+        dt = parse_timestamps(df["transaction_time"], time_format=time_format)
+        hour = dt.dt.hour
+        dayofweek = dt.dt.dayofweek
+
+        df["hour"] = hour
+        df["dayofweek"] = dayofweek
+        df["is_weekend"] = (dayofweek >= 5).astype(dayofweek.dtype).where(dayofweek.notna())
+        df["hour_sin"] = np.sin(2 * np.pi * hour / 24)
+        df["hour_cos"] = np.cos(2 * np.pi * hour / 24)
+        df["dayofweek_sin"] = np.sin(2 * np.pi * dayofweek / 7)
+        df["dayofweek_cos"] = np.cos(2 * np.pi * dayofweek / 7)
+        logger.debug("Added time features: %s", ", ".join(TIME_FEATURES))
 
     return df
 
 
+@lru_cache(maxsize=4096)
+def _parse_timestamp_str(value: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        ts = pd.to_datetime(value, errors="coerce")
+        return None if pd.isna(ts) else ts.to_pydatetime()
+
+
+def parse_timestamp(value: Any) -> datetime | None:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return _parse_timestamp_str(value)
+    ts = pd.to_datetime(value, errors="coerce")
+    return None if pd.isna(ts) else ts.to_pydatetime()
+
+
+def extract_time_features(value: Any) -> dict[str, float]:
+    ts = parse_timestamp(value)
+    if ts is None:
+        return dict.fromkeys(TIME_FEATURES, math.nan)
+
+    hour = ts.hour
+    dayofweek = ts.weekday()
+    return {
+        "hour": hour,
+        "dayofweek": dayofweek,
+        "is_weekend": int(dayofweek >= 5),
+        "hour_sin": math.sin(2 * math.pi * hour / 24),
+        "hour_cos": math.cos(2 * math.pi * hour / 24),
+        "dayofweek_sin": math.sin(2 * math.pi * dayofweek / 7),
+        "dayofweek_cos": math.cos(2 * math.pi * dayofweek / 7),
+    }
+
+
+class FrequencyEncoder(TransformerMixin, BaseEstimator):
+    def fit(self, X: pd.DataFrame, y: Any = None) -> FrequencyEncoder:
+        X = pd.DataFrame(X)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.frequencies_ = [X[col].value_counts(normalize=True) for col in X.columns]
+        return self
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        X = pd.DataFrame(X)
+        columns = [
+            X[col].map(freq).astype(float).fillna(0.0).to_numpy()
+            for col, freq in zip(X.columns, self.frequencies_, strict=True)
+        ]
+        return np.column_stack(columns) if columns else np.empty((len(X), 0))
+
+    def get_feature_names_out(self, input_features: Any = None) -> np.ndarray:
+        return np.asarray([f"{col}_freq" for col in self.feature_names_in_], dtype=object)
+
+
+class HashingEncoder(TransformerMixin, BaseEstimator):
+    def __init__(self, n_features: int = DEFAULT_HASH_FEATURES) -> None:
+        self.n_features = n_features
+
+    def fit(self, X: pd.DataFrame, y: Any = None) -> HashingEncoder:
+        self.feature_names_in_ = np.asarray(pd.DataFrame(X).columns, dtype=object)
+        return self
+
+    def transform(self, X: pd.DataFrame) -> Any:
+        X = pd.DataFrame(X)
+        # Prefix values with the column name so equal values in different columns
+        # hash to different buckets.
+        tokens = zip(*(col + "=" + X[col].astype(str) for col in X.columns), strict=True)
+        hasher = FeatureHasher(n_features=self.n_features, input_type="string")
+        return hasher.transform(tokens)
+
+    def get_feature_names_out(self, input_features: Any = None) -> np.ndarray:
+        return np.asarray([f"hash_{i}" for i in range(self.n_features)], dtype=object)
+
+
+def _categorical_encoder(encoder: str, sparse: bool) -> Any:
+    if encoder == "onehot":
+        return OneHotEncoder(handle_unknown="ignore", sparse_output=sparse)
+    if encoder == "frequency":
+        return FrequencyEncoder()
+    if encoder == "target":
+        return TargetEncoder(random_state=42)
+    if encoder == "hashing":
+        return HashingEncoder()
+    if encoder == "ordinal":
+        return OrdinalEncoder(
+            handle_unknown="use_encoded_value",
+            unknown_value=np.nan,
+            encoded_missing_value=np.nan,
+            max_categories=MAX_ORDINAL_CATEGORIES,
+        )
+    raise ValueError(f"Unknown encoder '{encoder}', expected one of {ENCODERS}")
+
+
 def build_preprocessor(
     df: pd.DataFrame,
     numeric_cols: list[str] | None = None,
     categorical_cols: list[str] | None = None,
+    encoder: str = "onehot",
+    sparse: bool = False,
 ) -> tuple[ColumnTransformer, list[str], list[str]]:
-    df = add_basic_features(df)
+    categorical_transformer = _categorical_encoder(encoder, sparse)
+
+    if not set(TIME_FEATURES).issubset(df.columns):
+        df = add_basic_features(df)
 
     if numeric_cols is None:
-        numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
+        numeric_cols = df.select_dtypes(include="number").columns.tolist()
 
     if categorical_cols is None:
         categorical_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
@@ -48,9 +203,11 @@ def build_preprocessor(
 
     logger.info("Numeric features (%d): %s", len(numeric_cols), numeric_cols)
     logger.info("Categorical features (%d): %s", len(categorical_cols), categorical_cols)
+    logger.info("Categorical encoder: %s (sparse=%s)", encoder, sparse or encoder == "hashing")
 
-    numeric_transformer = StandardScaler()
-    categorical_transformer = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+    # Centering would densify a sparse design matrix, so only scale in sparse mode.
+    sparse = sparse or encoder == "hashing"
+    numeric_transformer = StandardScaler(with_mean=not sparse)
 
     preprocessor = ColumnTransformer(
         transformers=[
@@ -58,6 +215,7 @@ def build_preprocessor(
             ("cat", categorical_transformer, categorical_cols),
         ],
         remainder="drop",
+        sparse_threshold=1.0 if sparse else 0.0,
         verbose_feature_names_out=False,
     )
 
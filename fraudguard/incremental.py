@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.metrics import log_loss
+from sklearn.pipeline import Pipeline
+
+from fraudguard.features import add_basic_features, build_preprocessor
+from fraudguard.models import build_sgd_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EPOCHS = 5
+DEFAULT_ALPHA = 1e-4
+# Rows kept from the first chunk to fit the column layout of the final preprocessor.
+SAMPLE_ROWS = 1_000
+SPLIT_TRAIN, SPLIT_VALID, SPLIT_TEST = 0, 1, 2
+CLASSES = np.array([0, 1])
+
+
+@dataclass
+class StreamingPreprocessor:
+    sparse: bool = False
+    numeric_cols: list[str] = field(default_factory=list, init=False)
+    categorical_cols: list[str] = field(default_factory=list, init=False)
+    vocabularies: dict[str, set[Any]] = field(default_factory=dict, init=False)
+    n_rows: int = field(default=0, init=False)
+    _template: ColumnTransformer | None = field(default=None, init=False, repr=False)
+    _scaler: Any = field(default=None, init=False, repr=False)
+    _sample: pd.DataFrame | None = field(default=None, init=False, repr=False)
+
+    def partial_fit(self, X: pd.DataFrame) -> StreamingPreprocessor:
+        if self._template is None:
+            # Column roles are fixed by the first chunk, as build_preprocessor does for a frame.
+            self._template, self.numeric_cols, self.categorical_cols = build_preprocessor(
+                X, encoder="onehot", sparse=self.sparse
+            )
+            transformers = {name: t for name, t, _ in self._template.transformers}
+            self._scaler = clone(transformers["num"])
+            self._sample = X.head(SAMPLE_ROWS).copy()
+            self.vocabularies = {col: set() for col in self.categorical_cols}
+
+        if self.numeric_cols:
+            self._scaler.partial_fit(X[self.numeric_cols])
+        for col in self.categorical_cols:
+            self.vocabularies[col].update(X[col].dropna().unique().tolist())
+        self.n_rows += len(X)
+        return self
+
+    def to_preprocessor(self) -> ColumnTransformer:
+        if self._template is None:
+            raise ValueError("StreamingPreprocessor has not seen any data")
+
+        preprocessor = clone(self._template)
+        if self.categorical_cols:
+            categories = [sorted(self.vocabularies[col]) for col in self.categorical_cols]
+            preprocessor.set_params(cat__categories=categories)
+        # The sample only fixes the output layout: categories are given explicitly and the
+        # scaler is replaced by the one accumulated over the whole stream.
+        preprocessor.fit(self._sample)
+        for i, (name, _, cols) in enumerate(preprocessor.transformers_):
+            if name == "num":
+                preprocessor.transformers_[i] = (name, self._scaler, cols)
+
+        logger.info(
+            "Streaming preprocessor: %d rows, %d numeric, %d categorical (%d categories)",
+            self.n_rows,
+            len(self.numeric_cols),
+            len(self.categorical_cols),
+            sum(len(v) for v in self.vocabularies.values()),
+        )
+        return preprocessor
+
+
+@dataclass
+class IncrementalResult:
+    model: Pipeline
+    epochs: int
+    n_train: int
+    seconds: float
+    y_valid: np.ndarray = field(repr=False)
+    valid_scores: np.ndarray = field(repr=False)
+    y_test: np.ndarray = field(repr=False)
+    test_scores: np.ndarray = field(repr=False)
+    epoch_log_loss: list[float] = field(default_factory=list)
+
+
+def split_rows(
+    n_rows: int,
+    chunk_index: int,
+    test_size: float = 0.2,
+    valid_size: float = 0.25,
+    random_state: int = 42,
+) -> np.ndarray:
+    # Seeded by chunk position, so every pass over the same file assigns rows identically.
+    u = np.random.default_rng([random_state, chunk_index]).random(n_rows)
+    return np.where(
+        u < test_size, SPLIT_TEST, np.where(u < test_size + valid_size, SPLIT_VALID, SPLIT_TRAIN)
+    )
+
+
+def _split_chunks(
+    chunks: Callable[[], Iterable[pd.DataFrame]],
+    target_col: str,
+    test_size: float,
+    valid_size: float,
+    random_state: int,
+) -> Iterator[tuple[pd.DataFrame, np.ndarray, np.ndarray]]:
+    for index, chunk in enumerate(chunks()):
+        if target_col not in chunk.columns:
+            raise KeyError(f"Target column '{target_col}' not found in chunk {index}")
+        y = chunk[target_col].to_numpy().astype(np.int64)
+        X = add_basic_features(chunk.drop(columns=[target_col]), inplace=True)
+        yield X, y, split_rows(len(chunk), index, test_size, valid_size, random_state)
+
+
+def balanced_class_weight(class_counts: np.ndarray) -> dict[int, float]:
+    if (class_counts == 0).any():
+        raise ValueError(f"Training stream must contain both classes, got counts {class_counts}")
+    # Same weights as class_weight="balanced", which partial_fit does not support.
+    weights = class_counts.sum() / (len(class_counts) * class_counts)
+    return {int(label): float(w) for label, w in zip(CLASSES, weights, strict=True)}
+
+
+def train_incremental(
+    chunks: Callable[[], Iterable[pd.DataFrame]],
+    target_col: str = "isFraud",
+    epochs: int = DEFAULT_EPOCHS,
+    alpha: float = DEFAULT_ALPHA,
+    sparse: bool = False,
+    test_size: float = 0.2,
+    valid_size: float = 0.25,
+    random_state: int = 42,
+) -> IncrementalResult:
+    if epochs < 1:
+        raise ValueError(f"epochs must be >= 1, got {epochs}")
+
+    # chunks: returns a fresh iterator over the raw file on every call (one call per pass).
+    def stream() -> Iterator[tuple[pd.DataFrame, np.ndarray, np.ndarray]]:
+        return _split_chunks(chunks, target_col, test_size, valid_size, random_state)
+
+    start = time.perf_counter()
+    streaming = StreamingPreprocessor(sparse=sparse)
+    class_counts = np.zeros(len(CLASSES), dtype=np.int64)
+    for X, y, split in stream():
+        train = split == SPLIT_TRAIN
+        if train.any():
+            streaming.partial_fit(X[train])
+            class_counts += np.bincount(y[train], minlength=len(CLASSES))
+
+    preprocessor = streaming.to_preprocessor()
+    model = build_sgd_model(
+        preprocessor, alpha=alpha, class_weight=balanced_class_weight(class_counts)
+    )
+    clf = model.named_steps["clf"]
+
+    rng = np.random.default_rng(random_state)
+    epoch_log_loss = []
+    for epoch in range(1, epochs + 1):
+        # Progressive validation: each chunk is scored before the model learns from it.
+        loss_sum = 0.0
+        loss_rows = 0
+        for X, y, split in stream():
+            # The file is usually ordered by time: shuffle within the chunk for SGD.
+            rows = rng.permutation(np.flatnonzero(split == SPLIT_TRAIN))
+            if len(rows) == 0:
+                continue
+            Xt = preprocessor.transform(X.iloc[rows])
+            if hasattr(clf, "coef_"):
+                proba = clf.predict_proba(Xt)[:, 1]
+                loss_sum += log_loss(y[rows], proba, labels=CLASSES) * len(rows)
+                loss_rows += len(rows)
+            clf.partial_fit(Xt, y[rows], classes=CLASSES)
+        epoch_log_loss.append(loss_sum / loss_rows if loss_rows else float("nan"))
+        logger.info("Epoch %d/%d: progressive log loss %.4f", epoch, epochs, epoch_log_loss[-1])
+
+    # Hold-out rows are only scored, after training: keep labels and scores, not features.
+    holdout: dict[int, tuple[list[np.ndarray], list[np.ndarray]]] = {
+        SPLIT_VALID: ([], []),
+        SPLIT_TEST: ([], []),
+    }
+    for X, y, split in stream():
+        for part, (labels, scores) in holdout.items():
+            rows = split == part
+            if rows.any():
+                labels.append(y[rows])
+                scores.append(model.predict_proba(X[rows])[:, 1])
+
+    def collect(part: int) -> tuple[np.ndarray, np.ndarray]:
+        labels, scores = holdout[part]
+        if not labels:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(labels), np.concatenate(scores)
+
+    y_valid, valid_scores = collect(SPLIT_VALID)
+    y_test, test_scores = collect(SPLIT_TEST)
+    seconds = time.perf_counter() - start
+    logger.info(
+        "Trained incrementally on %d rows in %d epochs (%.1fs); hold-out: %d valid, %d test",
+        int(class_counts.sum()),
+        epochs,
+        seconds,
+        len(y_valid),
+        len(y_test),
+    )
+    return IncrementalResult(
+        model=model,
+        epochs=epochs,
+        n_train=int(class_counts.sum()),
+        seconds=seconds,
+        y_valid=y_valid,
+        valid_scores=valid_scores,
+        y_test=y_test,
+        test_scores=test_scores,
+        epoch_log_loss=epoch_log_loss,
+    )
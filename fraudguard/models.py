@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import inspect
 import logging
-from typing import TYPE_CHECKING
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
+import scipy.sparse as sp
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder
 
 if TYPE_CHECKING:
+    import pandas as pd
     from sklearn.compose import ColumnTransformer
 
 logger = logging.getLogger(__name__)
@@ -17,10 +24,11 @@ def build_logreg_model(
     preprocessor: ColumnTransformer,
     max_iter: int = 1000,
     C: float = 1.0,
+    class_weight: str | dict[int, float] | None = "balanced",
 ) -> Pipeline:
     clf = LogisticRegression(
         C=C,
-        class_weight="balanced",
+        class_weight=class_weight,
         max_iter=max_iter,
         n_jobs=-1,
         random_state=42,
@@ -37,17 +45,48 @@ def build_logreg_model(
     return model
 
 
+def build_sgd_model(
+    preprocessor: ColumnTransformer,
+    alpha: float = 1e-4,
+    eta0: float = 0.01,
+    class_weight: str | dict[int, float] | None = "balanced",
+) -> Pipeline:
+    # Logistic regression trained by SGD: supports partial_fit for out-of-core training.
+    # Averaged SGD with a constant step is stable under large class weights, where the
+    # default "optimal" schedule takes huge first steps.
+    clf = SGDClassifier(
+        loss="log_loss",
+        alpha=alpha,
+        learning_rate="constant",
+        eta0=eta0,
+        average=True,
+        class_weight=class_weight,
+        random_state=42,
+    )
+
+    model = Pipeline(
+        steps=[
+            ("preprocess", preprocessor),
+            ("clf", clf),
+        ]
+    )
+
+    logger.info("Built SGD logistic regression model (alpha=%g, eta0=%g)", alpha, eta0)
+    return model
+
+
 def build_forest_model(
     preprocessor: ColumnTransformer,
     n_estimators: int = 200,
     max_depth: int | None = None,
     min_samples_leaf: int = 1,
+    class_weight: str | dict[int, float] | None = "balanced_subsample",
 ) -> Pipeline:
     clf = RandomForestClassifier(
         n_estimators=n_estimators,
         max_depth=max_depth,
         min_samples_leaf=min_samples_leaf,
-        class_weight="balanced_subsample",
+        class_weight=class_weight,
         n_jobs=-1,
         random_state=42,
     )
@@ -65,3 +104,141 @@ def build_forest_model(
         max_depth,
     )
     return model
+
+
+def _categorical_mask(preprocessor: Any) -> list[bool] | None:
+    transformers = getattr(preprocessor, "transformers", None)
+    if not transformers or not any(
+        isinstance(transformer, OrdinalEncoder) for _, transformer, _ in transformers
+    ):
+        return None
+
+    # Ordinal-encoded columns map 1:1 to output columns, in transformer order.
+    mask: list[bool] = []
+    for _, transformer, cols in transformers:
+        if transformer == "drop" or len(cols) == 0:
+            continue
+        mask.extend([isinstance(transformer, OrdinalEncoder)] * len(cols))
+    return mask
+
+
+def build_hgb_model(
+    preprocessor: ColumnTransformer,
+    max_iter: int = 500,
+    learning_rate: float = 0.1,
+    max_leaf_nodes: int = 31,
+    min_samples_leaf: int = 20,
+    l2_regularization: float = 0.0,
+    n_iter_no_change: int = 20,
+    class_weight: str | dict[int, float] | None = "balanced",
+) -> Pipeline:
+    categorical_mask = _categorical_mask(preprocessor)
+    clf = HistGradientBoostingClassifier(
+        learning_rate=learning_rate,
+        max_iter=max_iter,
+        max_leaf_nodes=max_leaf_nodes,
+        min_samples_leaf=min_samples_leaf,
+        l2_regularization=l2_regularization,
+        categorical_features=categorical_mask,
+        early_stopping=True,
+        n_iter_no_change=n_iter_no_change,
+        class_weight=class_weight,
+        random_state=42,
+    )
+
+    model = Pipeline(
+        steps=[
+            ("preprocess", preprocessor),
+            ("clf", clf),
+        ]
+    )
+
+    logger.info(
+        "Built HistGradientBoosting model (max_iter=%d, learning_rate=%.3f, "
+        "native categoricals=%d)",
+        max_iter,
+        learning_rate,
+        sum(categorical_mask or []),
+    )
+    return model
+
+
+MODEL_BUILDERS: dict[str, Callable[..., Pipeline]] = {
+    "logreg": build_logreg_model,
+    "sgd": build_sgd_model,
+    "forest": build_forest_model,
+    "hgb": build_hgb_model,
+}
+# Models with native categorical support get ordinal codes instead of the configured encoder.
+NATIVE_CATEGORICAL_MODELS = frozenset({"hgb"})
+
+
+def matrix_memory_mb(X: Any) -> float:
+    if sp.issparse(X):
+        X = X.tocsr()
+        nbytes = X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    else:
+        nbytes = X.nbytes
+    return nbytes / 1024**2
+
+
+def fit_preprocessor(preprocessor: ColumnTransformer, X: pd.DataFrame, y: pd.Series) -> Any:
+    start = time.perf_counter()
+    Xt = preprocessor.fit_transform(X, y)
+    logger.info(
+        "Fitted shared preprocessor in %.2fs: %d x %d %s matrix, %.1f MB",
+        time.perf_counter() - start,
+        Xt.shape[0],
+        Xt.shape[1],
+        "sparse" if sp.issparse(Xt) else "dense",
+        matrix_memory_mb(Xt),
+    )
+    return Xt
+
+
+def _supports_validation_set(clf: Any) -> bool:
+    return "X_val" in inspect.signature(clf.fit).parameters
+
+
+def fit_pipelines(
+    models: Mapping[str, Pipeline],
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_jobs: int | None = None,
+    Xt: Any = None,
+    validation: tuple[Any, Any] | None = None,
+) -> dict[str, float]:
+    preprocessors = {id(model.named_steps["preprocess"]) for model in models.values()}
+    if len(preprocessors) != 1:
+        raise ValueError("All pipelines must share the same preprocessor instance")
+
+    # Xt: output of the already fitted shared preprocessor on X, to skip refitting it.
+    if Xt is None:
+        Xt = fit_preprocessor(next(iter(models.values())).named_steps["preprocess"], X, y)
+
+    def fit_classifier(clf: Any) -> float:
+        clf_start = time.perf_counter()
+        # validation: preprocessed (X_val, y_val) used for early stopping where supported
+        if validation is not None and _supports_validation_set(clf):
+            clf.fit(Xt, y, X_val=validation[0], y_val=validation[1])
+        else:
+            clf.fit(Xt, y)
+        return time.perf_counter() - clf_start
+
+    max_workers = n_jobs or len(models)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            name: pool.submit(fit_classifier, model.named_steps["clf"])
+            for name, model in models.items()
+        }
+        fit_times = {name: future.result() for name, future in futures.items()}
+
+    for name, seconds in fit_times.items():
+        clf = models[name].named_steps["clf"]
+        if getattr(clf, "do_early_stopping_", False):
+            logger.info(
+                "Fitted %s in %.2fs (early stopping at %d iterations)", name, seconds, clf.n_iter_
+            )
+        else:
+            logger.info("Fitted %s in %.2fs", name, seconds)
+    return fit_times
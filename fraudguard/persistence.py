@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import joblib
+
+from fraudguard.artifact import MANIFEST_NAME, is_artifact, load_artifact
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.5
+METADATA_SUFFIX = ".meta.json"
+
+
+def metadata_path(model_path: str | Path) -> Path:
+    return Path(model_path).with_suffix(METADATA_SUFFIX)
+
+
+def save_model(model: Any, model_path: str | Path, metadata: dict[str, Any] | None = None) -> Path:
+    model_path = Path(model_path)
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, model_path)
+
+    meta_path = metadata_path(model_path)
+    meta_path.write_text(json.dumps(metadata or {}, indent=2))
+    logger.info("Model saved to %s (metadata: %s)", model_path, meta_path)
+    return model_path
+
+
+def load_metadata(model_path: str | Path) -> dict[str, Any]:
+    meta_path = metadata_path(model_path)
+    if not meta_path.exists():
+        logger.debug("No metadata found at %s", meta_path)
+        return {}
+    return json.loads(meta_path.read_text())
+
+
+def load_model(model_path: str | Path) -> tuple[Any, dict[str, Any]]:
+    model_path = Path(model_path)
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model not found: {model_path}")
+    # Directory artifacts carry their metadata in the manifest.
+    if is_artifact(model_path):
+        model = load_artifact(model_path)
+        return model, model.metadata
+    return joblib.load(model_path), load_metadata(model_path)
+
+
+def model_version(model_path: str | Path) -> str:
+    # Changes whenever the model is retrained or updated in place: used to key score caches.
+    model_path = Path(model_path)
+    stat_path = model_path / MANIFEST_NAME if is_artifact(model_path) else model_path
+    stat = stat_path.stat()
+    return f"{model_path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def resolve_threshold(metadata: dict[str, Any], override: float | None = None) -> float:
+    if override is not None:
+        return override
+    return float(metadata.get("threshold", DEFAULT_THRESHOLD))
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import json
+import logging
+import sys
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, TypeVar, cast
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def peak_rss_mb() -> float | None:
+    # VmHWM is the resident set high-water mark, resettable through clear_refs (Linux).
+    try:
+        with PROC_STATUS.open() as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def reset_peak_rss() -> bool:
+    try:
+        PROC_CLEAR_REFS.write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+@dataclass
+class StageCall:
+    rows: int | None = None
+
+
+@dataclass
+class StageProfile:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows: int = 0
+    peak_rss_mb: float | None = None
+    profile_path: str | None = None
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "rows_per_sec": self.rows_per_sec}
+
+
+@dataclass
+class _Frame:
+    peak: float = 0.0
+
+
+@dataclass
+class StageProfiler:
+    enabled: bool = True
+    profile_dir: str | Path | None = None
+    stages: dict[str, StageProfile] = field(default_factory=dict, init=False)
+    _frames: list[_Frame] = field(default_factory=list, init=False, repr=False)
+    _profiles: dict[str, cProfile.Profile] = field(default_factory=dict, init=False, repr=False)
+    _profiling: bool = field(default=False, init=False, repr=False)
+
+    def _enter_memory(self) -> None:
+        # Fold the peak reached so far into the enclosing stage before resetting the
+        # high-water mark, so nested stages do not hide their parent's peak.
+        current = peak_rss_mb()
+        if self._frames and current is not None:
+            self._frames[-1].peak = max(self._frames[-1].peak, current)
+        reset_peak_rss()
+        self._frames.append(_Frame())
+
+    def _exit_memory(self) -> float | None:
+        frame = self._frames.pop()
+        current = peak_rss_mb()
+        if current is None:
+            return None
+        peak = max(current, frame.peak)
+        if self._frames:
+            self._frames[-1].peak = max(self._frames[-1].peak, peak)
+        return peak
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None) -> Iterator[StageCall]:
+        call = StageCall(rows=rows)
+        if not self.enabled:
+            yield call
+            return
+        # Registered on entry so the report lists parents before their nested stages.
+        record = self.stages.setdefault(name, StageProfile(name))
+
+        # Only the outermost profiled stage runs cProfile: profilers cannot be nested.
+        profiler = None
+        if self.profile_dir is not None and not self._profiling:
+            profiler = self._profiles.setdefault(name, cProfile.Profile())
+            self._profiling = True
+
+        self._enter_memory()
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield call
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+            seconds = time.perf_counter() - start
+            cpu_seconds = time.process_time() - cpu_start
+            peak = self._exit_memory()
+
+            record.calls += 1
+            record.seconds += seconds
+            record.cpu_seconds += cpu_seconds
+            record.rows += call.rows or 0
+            if peak is not None:
+                record.peak_rss_mb = max(record.peak_rss_mb or 0.0, peak)
+            logger.debug(
+                "Stage %s: %.3fs wall, %.3fs CPU, %s rows", name, seconds, cpu_seconds, call.rows
+            )
+
+    def profiled(self, name: str | None = None) -> Callable[[F], F]:
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.stage(name or func.__qualname__) as call:
+                    result = func(*args, **kwargs)
+                    if hasattr(result, "__len__"):
+                        call.rows = len(result)
+                    return result
+
+            return cast(F, wrapper)
+
+        return decorator
+
+    def dump_profiles(self) -> None:
+        if self.profile_dir is None:
+            return
+        profile_dir = Path(self.profile_dir)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        for name, profiler in self._profiles.items():
+            path = profile_dir / f"{name.replace('/', '_')}.prof"
+            profiler.dump_stats(path)
+            self.stages[name].profile_path = str(path)
+        logger.info("cProfile output for %d stages saved to %s", len(self._profiles), profile_dir)
+
+    def report(self) -> dict[str, Any]:
+        # The high-water mark is reset per stage, so the run's peak is the largest seen.
+        peaks = [s.peak_rss_mb for s in self.stages.values() if s.peak_rss_mb is not None]
+        current = peak_rss_mb()
+        return {
+            "stages": [stage.to_dict() for stage in self.stages.values()],
+            "peak_rss_mb": max([*peaks, current]) if current is not None else None,
+        }
+
+    def write(self, path: str | Path) -> Path:
+        self.dump_profiles()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2))
+        logger.info("Profile report saved to %s", path)
+        return path
+
+    def __str__(self) -> str:
+        lines = [
+            "=" * 90,
+            f"{'Stage':<28}{'Calls':>6}{'Wall, s':>10}{'CPU, s':>10}{'Rows':>12}"
+            f"{'Rows/s':>14}{'Peak, MB':>10}",
+            "-" * 90,
+        ]
+        for stage in self.stages.values():
+            peak = f"{stage.peak_rss_mb:.0f}" if stage.peak_rss_mb is not None else "-"
+            lines.append(
+                f"{stage.name:<28}{stage.calls:>6}{stage.seconds:>10.3f}{stage.cpu_seconds:>10.3f}"
+                f"{stage.rows:>12,}{stage.rows_per_sec:>14,.0f}{peak:>10}"
+            )
+        lines.append("=" * 90)
+        return "\n".join(lines)
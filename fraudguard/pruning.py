@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import copy
+import logging
+import pickle
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.tree._tree import Tree
+
+from fraudguard.evaluate import score_curve
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOLERANCE = 0.005
+DEFAULT_DEPTHS = (None, 16, 12, 8, 6)
+TREE_FRACTIONS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0)
+# sklearn marks leaves with TREE_LEAF children and TREE_UNDEFINED feature/threshold.
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+
+def node_depths(tree: Tree) -> np.ndarray:
+    depth = np.zeros(tree.node_count, dtype=np.int64)
+    left, right = tree.children_left, tree.children_right
+    # Children are always stored after their parent.
+    for node in range(tree.node_count):
+        if left[node] != TREE_LEAF:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return depth
+
+
+def truncate_tree(tree: Tree, max_depth: int) -> Tree:
+    state = tree.__getstate__()
+    depth = node_depths(tree)
+    keep = depth <= max_depth
+    new_ids = np.cumsum(keep) - 1
+
+    nodes = state["nodes"][keep].copy()
+    inner = nodes["left_child"] != TREE_LEAF
+    cut = inner & (depth[keep] == max_depth)
+    # Nodes at the depth cap become leaves predicting their training class distribution.
+    nodes["left_child"] = np.where(inner, new_ids[nodes["left_child"]], TREE_LEAF)
+    nodes["right_child"] = np.where(inner, new_ids[nodes["right_child"]], TREE_LEAF)
+    for name, value in (
+        ("left_child", TREE_LEAF),
+        ("right_child", TREE_LEAF),
+        ("feature", TREE_UNDEFINED),
+        ("threshold", TREE_UNDEFINED),
+        ("missing_go_to_left", 0),
+    ):
+        nodes[name][cut] = value
+
+    truncated = Tree(tree.n_features, np.asarray(tree.n_classes), tree.n_outputs)
+    truncated.__setstate__(
+        {
+            "max_depth": min(tree.max_depth, max_depth),
+            "node_count": int(keep.sum()),
+            "nodes": nodes,
+            "values": state["values"][keep].copy(),
+        }
+    )
+    return truncated
+
+
+@dataclass
+class PruningCandidate:
+    n_trees: int
+    max_depth: int | None
+    n_nodes: int
+    pr_auc: float
+    size_mb: float = 0.0
+    predict_seconds: float = 0.0
+
+
+@dataclass
+class PruningResult:
+    baseline: PruningCandidate
+    selected: PruningCandidate
+    candidates: list[PruningCandidate] = field(default_factory=list)
+    tree_order: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=int), repr=False)
+    model: Pipeline | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "baseline": asdict(self.baseline),
+            "selected": asdict(self.selected),
+            "candidates": [asdict(c) for c in self.candidates],
+        }
+
+    def __str__(self) -> str:
+        lines = [
+            "=" * 72,
+            f"{'Trees':>6}{'Depth':>7}{'Nodes':>10}{'Size, MB':>10}{'Predict, s':>12}"
+            f"{'PR-AUC':>9}{'Delta':>9}",
+            "-" * 72,
+        ]
+        for c in self.candidates:
+            marker = "  <- selected" if c is self.selected else ""
+            lines.append(
+                f"{c.n_trees:>6}{c.max_depth if c.max_depth is not None else '-':>7}"
+                f"{c.n_nodes:>10,}{c.size_mb:>10.2f}{c.predict_seconds:>12.3f}"
+                f"{c.pr_auc:>9.4f}{c.pr_auc - self.baseline.pr_auc:>+9.4f}{marker}"
+            )
+        lines.append("=" * 72)
+        return "\n".join(lines)
+
+
+def _tree_counts(n_trees: int) -> list[int]:
+    return sorted({max(1, round(n_trees * fraction)) for fraction in TREE_FRACTIONS})
+
+
+def _stratified_halves(y: np.ndarray, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    first, second = [], []
+    for label in np.unique(y):
+        rows = rng.permutation(np.flatnonzero(y == label))
+        first.append(rows[: len(rows) // 2])
+        second.append(rows[len(rows) // 2 :])
+    return np.sort(np.concatenate(first)), np.sort(np.concatenate(second))
+
+
+def _positive_proba(estimator: Any, Xt: Any, positive: int) -> np.ndarray:
+    return estimator.predict_proba(Xt)[:, positive]
+
+
+def _truncated_estimator(estimator: Any, max_depth: int | None) -> Any:
+    if max_depth is None or estimator.tree_.max_depth <= max_depth:
+        return estimator
+    truncated = copy.copy(estimator)
+    truncated.tree_ = truncate_tree(estimator.tree_, max_depth)
+    return truncated
+
+
+def build_pruned_forest(
+    clf: RandomForestClassifier, tree_order: Sequence[int], max_depth: int | None
+) -> RandomForestClassifier:
+    estimators = [_truncated_estimator(clf.estimators_[i], max_depth) for i in tree_order]
+    pruned = copy.copy(clf)
+    pruned.estimators_ = estimators
+    pruned.n_estimators = len(estimators)
+    return pruned
+
+
+def _unpruned_result(model: Pipeline, Xt: Any, y_valid: np.ndarray, positive: int) -> PruningResult:
+    clf = model.named_steps["clf"]
+    proba = clf.predict_proba(Xt)[:, positive]
+    # Without any fraud the PR-AUC is 0, as in sklearn's average_precision_score.
+    pr_auc = score_curve(y_valid, proba).average_precision() if np.any(y_valid == 1) else 0.0
+    baseline = PruningCandidate(
+        n_trees=len(clf.estimators_),
+        max_depth=None,
+        n_nodes=sum(e.tree_.node_count for e in clf.estimators_),
+        pr_auc=pr_auc,
+        size_mb=len(pickle.dumps(clf, protocol=pickle.HIGHEST_PROTOCOL)) / 1024**2,
+    )
+    return PruningResult(
+        baseline=baseline,
+        selected=baseline,
+        candidates=[baseline],
+        tree_order=np.arange(len(clf.estimators_)),
+        model=model,
+    )
+
+
+def prune_forest(
+    model: Pipeline,
+    X_valid: Any,
+    y_valid: Any,
+    tolerance: float = DEFAULT_TOLERANCE,
+    tree_counts: Sequence[int] | None = None,
+    depths: Sequence[int | None] = DEFAULT_DEPTHS,
+    Xt: Any = None,
+    random_state: int = 42,
+) -> PruningResult:
+    clf = model.named_steps["clf"]
+    if not isinstance(clf, RandomForestClassifier):
+        raise TypeError(f"Only RandomForestClassifier can be pruned, got {type(clf).__name__}")
+    if tolerance < 0:
+        raise ValueError(f"tolerance must be >= 0, got {tolerance}")
+
+    start = time.perf_counter()
+    # Xt: the already preprocessed validation matrix, to skip transforming it again.
+    if Xt is None:
+        Xt = model.named_steps["preprocess"].transform(X_valid)
+    y_valid = np.asarray(y_valid)
+    positive = list(clf.classes_).index(1)
+    n_trees = len(clf.estimators_)
+    # The full, uncapped forest is always a candidate: it is the baseline.
+    tree_counts = sorted(
+        {min(k, n_trees) for k in tree_counts or _tree_counts(n_trees)} | {n_trees}
+    )
+    if None not in depths:
+        depths = (None, *depths)
+
+    # Rank trees by their own PR-AUC on one half of the validation set, best first, and
+    # score the prefixes on the other half so the choice is not tuned on the ranking data.
+    rank_rows, eval_rows = _stratified_halves(y_valid, np.random.default_rng(random_state))
+    y_rank, y_eval = y_valid[rank_rows], y_valid[eval_rows]
+    if not all(np.any(y == 1) and np.any(y != 1) for y in (y_rank, y_eval)):
+        logger.warning(
+            "Too few frauds in the validation set (%d) to rank and evaluate trees on separate "
+            "halves, keeping the forest unpruned",
+            int((y_valid == 1).sum()),
+        )
+        return _unpruned_result(model, Xt, y_valid, positive)
+
+    # One tree's predictions at a time: memory stays O(n_valid), not O(n_trees * n_valid).
+    Xt_rank, Xt_eval = Xt[rank_rows], Xt[eval_rows]
+    tree_scores = [
+        score_curve(y_rank, _positive_proba(est, Xt_rank, positive)).average_precision()
+        for est in clf.estimators_
+    ]
+    tree_order = np.argsort(tree_scores, kind="stable")[::-1]
+
+    candidates: list[PruningCandidate] = []
+    for max_depth in depths:
+        if max_depth is not None and max_depth >= max(e.tree_.max_depth for e in clf.estimators_):
+            continue  # the cap would not change any tree
+
+        total = np.zeros(len(eval_rows))
+        n_nodes = 0
+        for k, index in enumerate(tree_order, start=1):
+            estimator = _truncated_estimator(clf.estimators_[index], max_depth)
+            total += _positive_proba(estimator, Xt_eval, positive)
+            n_nodes += estimator.tree_.node_count
+            if k in tree_counts:
+                pr_auc = score_curve(y_eval, total / k).average_precision()
+                candidates.append(PruningCandidate(k, max_depth, n_nodes, pr_auc))
+
+    baseline = next(c for c in candidates if c.n_trees == n_trees and c.max_depth is None)
+    # Smallest ensemble (by node count, a proxy for latency and size) within the tolerance.
+    feasible = [c for c in candidates if c.pr_auc >= baseline.pr_auc - tolerance]
+    selected = min(feasible, key=lambda c: (c.n_nodes, -c.pr_auc))
+
+    for candidate in candidates:
+        pruned = build_pruned_forest(clf, tree_order[: candidate.n_trees], candidate.max_depth)
+        candidate.size_mb = len(pickle.dumps(pruned, protocol=pickle.HIGHEST_PROTOCOL)) / 1024**2
+        predict_start = time.perf_counter()
+        pruned.predict_proba(Xt_eval)
+        candidate.predict_seconds = time.perf_counter() - predict_start
+
+    pruned_model = Pipeline(
+        steps=[
+            ("preprocess", model.named_steps["preprocess"]),
+            ("clf", build_pruned_forest(clf, tree_order[: selected.n_trees], selected.max_depth)),
+        ]
+    )
+
+    logger.info(
+        "Pruned forest from %d trees (%d nodes, PR-AUC %.4f) to %d trees with max_depth=%s "
+        "(%d nodes, PR-AUC %.4f) in %.1fs",
+        baseline.n_trees,
+        baseline.n_nodes,
+        baseline.pr_auc,
+        selected.n_trees,
+        selected.max_depth,
+        selected.n_nodes,
+        selected.pr_auc,
+        time.perf_counter() - start,
+    )
+    return PruningResult(
+        baseline=baseline,
+        selected=selected,
+        candidates=candidates,
+        tree_order=tree_order,
+        model=pruned_model,
+    )
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import inspect
+import logging
+from typing import Any
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.pipeline import Pipeline
+
+logger = logging.getLogger(__name__)
+
+SAMPLERS = ("random", "nearmiss", "instance-hardness")
+DEFAULT_RATIO = 10.0
+
+
+def correct_probabilities(proba: Any, negative_rate: float) -> np.ndarray:
+    # A model fitted on all positives and a share beta of negatives overstates the fraud
+    # odds by 1 / beta: p = beta * p_s / (beta * p_s - p_s + 1).
+    proba = np.asarray(proba, dtype=float)
+    return negative_rate * proba / (negative_rate * proba - proba + 1.0)
+
+
+def negative_rate_for_ratio(y: Any, ratio: float) -> float:
+    y = np.asarray(y)
+    n_pos = int((y == 1).sum())
+    n_neg = len(y) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        raise ValueError("Downsampling requires both classes in the training data")
+    return min(1.0, ratio * n_pos / n_neg)
+
+
+def sample_negatives(y: Any, negative_rate: float, random_state: int = 42) -> np.ndarray:
+    y = np.asarray(y)
+    negatives = np.flatnonzero(y != 1)
+    n_keep = round(negative_rate * len(negatives))
+    rng = np.random.default_rng(random_state)
+    keep = rng.choice(negatives, size=n_keep, replace=False)
+    return np.sort(np.concatenate([np.flatnonzero(y == 1), keep]))
+
+
+def _imblearn_sampler(name: str, ratio: float, random_state: int) -> Any:
+    try:
+        from imblearn.under_sampling import InstanceHardnessThreshold, NearMiss
+    except ImportError as e:
+        raise ImportError(
+            f"Sampler '{name}' requires imbalanced-learn. Install it with: "
+            "pip install imbalanced-learn"
+        ) from e
+    # sampling_strategy is the minority / majority ratio after resampling.
+    if name == "nearmiss":
+        return NearMiss(sampling_strategy=1.0 / ratio, version=1)
+    if name == "instance-hardness":
+        return InstanceHardnessThreshold(sampling_strategy=1.0 / ratio, random_state=random_state)
+    raise ValueError(f"Unknown sampler '{name}', expected one of {SAMPLERS}")
+
+
+class DownsampledClassifier(ClassifierMixin, BaseEstimator):
+    def __init__(
+        self,
+        estimator: Any,
+        ratio: float = DEFAULT_RATIO,
+        sampler: str = "random",
+        random_state: int = 42,
+    ) -> None:
+        self.estimator = estimator
+        self.ratio = ratio
+        self.sampler = sampler
+        self.random_state = random_state
+
+    def _resample(self, X: Any, y: np.ndarray) -> tuple[Any, np.ndarray]:
+        if self.sampler == "random":
+            rows = sample_negatives(
+                y, negative_rate_for_ratio(y, self.ratio), random_state=self.random_state
+            )
+            return X[rows], y[rows]
+        # imblearn samplers pick informative negatives instead of a uniform share, so the
+        # probability correction below is only approximate for them.
+        sampler = _imblearn_sampler(self.sampler, self.ratio, self.random_state)
+        return sampler.fit_resample(X, y)
+
+    def fit(self, X: Any, y: Any, X_val: Any = None, y_val: Any = None) -> DownsampledClassifier:
+        if self.ratio <= 0:
+            raise ValueError(f"ratio must be > 0, got {self.ratio}")
+        y = np.asarray(y)
+        negative_rate_for_ratio(y, self.ratio)  # both classes are required
+
+        X_sample, y_sample = self._resample(X, y)
+        n_neg = int((y != 1).sum())
+        self.negative_rate_ = float((y_sample != 1).sum() / n_neg)
+        self.n_samples_fit_ = len(y_sample)
+
+        self.estimator_ = clone(self.estimator)
+        # X_val: unsampled validation data for early stopping, forwarded where supported.
+        if X_val is not None and "X_val" in inspect.signature(self.estimator_.fit).parameters:
+            self.estimator_.fit(X_sample, y_sample, X_val=X_val, y_val=y_val)
+        else:
+            self.estimator_.fit(X_sample, y_sample)
+        self.classes_ = self.estimator_.classes_
+
+        logger.info(
+            "Downsampled negatives with %s sampler: %d -> %d rows (negative rate %.4f)",
+            self.sampler,
+            len(y),
+            len(y_sample),
+            self.negative_rate_,
+        )
+        return self
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        proba = correct_probabilities(self.estimator_.predict_proba(X)[:, 1], self.negative_rate_)
+        return np.column_stack([1.0 - proba, proba])
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] >= 0.5).astype(int)]
+
+
+def downsample_pipeline(
+    model: Pipeline, ratio: float, sampler: str = "random", random_state: int = 42
+) -> Pipeline:
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler '{sampler}', expected one of {SAMPLERS}")
+    clf = DownsampledClassifier(
+        model.named_steps["clf"], ratio=ratio, sampler=sampler, random_state=random_state
+    )
+    return Pipeline(steps=[("preprocess", model.named_steps["preprocess"]), ("clf", clf)])
@@ -0,0 +1,457 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from fraudguard.artifact import ArtifactModel
+from fraudguard.compiled import CompiledLogReg
+from fraudguard.evaluate import EvaluationResult, StreamingEvaluator
+from fraudguard.features import TIME_FEATURES, add_basic_features
+from fraudguard.profiling import StageProfiler
+from fraudguard.velocity import VelocityStore, velocity_feature_names
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+CSV_SUFFIXES = frozenset({".csv", ".gz", ".bz2", ".zip", ".xz"})
+PARQUET_SUFFIXES = frozenset({".parquet", ".pq"})
+DEFAULT_CACHE_SIZE = 10_000
+FINGERPRINT_BYTES = 16
+
+
+@dataclass
+class BatchScoringStats:
+    rows: int
+    chunks: int
+    seconds: float
+    evaluation: EvaluationResult | None = None
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        result = {
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+        if self.evaluation is not None:
+            result["evaluation"] = {
+                "confusion_matrix": self.evaluation.confusion_matrix.tolist(),
+                "precision": self.evaluation.precision,
+                "recall": self.evaluation.recall,
+                "f1": self.evaluation.f1,
+                "roc_auc": self.evaluation.roc_auc,
+                "pr_auc": self.evaluation.pr_auc,
+            }
+        return result
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": self.size,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class ScoreCache:
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be >= 1, got {maxsize}")
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"ttl must be > 0, got {ttl}")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        # key -> (score, expiry); ordered from least to most recently used.
+        self._entries: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> float | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= self._clock():
+                del self._entries[key]
+                self._stats.expirations += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry[0]
+
+    def put(self, key: str, score: float) -> None:
+        expiry = self._clock() + self.ttl if self.ttl is not None else math.inf
+        with self._lock:
+            self._entries[key] = (score, expiry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                size=len(self._entries),
+            )
+
+
+def _normalize_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        # 100, 100.0 and np.float32(100) are the same feature value; NaN is missing.
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value  # " CASH_OUT" is an unknown category to the model, not "CASH_OUT"
+    return str(value)
+
+
+def transaction_fingerprint(
+    row: Mapping[str, Any], model_version: str = "", columns: list[str] | None = None
+) -> str:
+    # columns: the fields the model reads; ids, labels and other extras then share a key.
+    if columns is None:
+        normalized = {str(key): _normalize_value(value) for key, value in row.items()}
+    else:
+        normalized = {str(col): _normalize_value(row.get(col)) for col in columns}
+    payload = json.dumps([model_version, normalized], sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=FINGERPRINT_BYTES).hexdigest()
+
+
+def _file_format(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in PARQUET_SUFFIXES:
+        return "parquet"
+    if suffix in CSV_SUFFIXES:
+        return "csv"
+    raise ValueError(f"Unsupported file format '{suffix}': expected CSV or Parquet")
+
+
+def _import_pyarrow_parquet() -> Any:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "Parquet support requires pyarrow. Install it with: pip install 'fraudguard[parquet]'"
+        ) from e
+    return pq
+
+
+def iter_chunks(
+    path: str | Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: list[str] | None = None,
+) -> Iterator[pd.DataFrame]:
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Input file not found: {path}")
+
+    if _file_format(path) == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns)
+        return
+
+    pq = _import_pyarrow_parquet()
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+def model_input_columns(model: Any) -> list[str] | None:
+    # Columns the model reads after add_basic_features; None when the model does not record them.
+    if isinstance(model, CompiledLogReg):
+        return [*model.numeric_cols, *model.categorical_cols]
+    if isinstance(model, ArtifactModel):
+        return list(model.manifest["input_columns"])
+    names = getattr(model, "feature_names_in_", None)
+    return None if names is None else [str(name) for name in names]
+
+
+def uses_velocity_features(model: Any) -> bool:
+    return not set(model_input_columns(model) or ()).isdisjoint(velocity_feature_names())
+
+
+def check_row_features(model: Any, velocity: VelocityStore | None = None) -> None:
+    # Velocity features need the account history: computed from a request alone they would
+    # silently differ from training, so such models are only scored through a VelocityStore.
+    if uses_velocity_features(model) and velocity is None:
+        raise ValueError(
+            "Model uses per-account velocity features: score it with a VelocityStore "
+            "holding the account history"
+        )
+
+
+def load_velocity_store(
+    model: Any, metadata: Mapping[str, Any], history: str | Path | None = None
+) -> VelocityStore | None:
+    # None unless the model uses velocity features; the store is then warmed up on the
+    # transactions that precede the ones to score, as training saw them.
+    if not uses_velocity_features(model):
+        return None
+    store = VelocityStore(account_col=metadata.get("velocity", {}).get("account_col", "nameOrig"))
+    if history is None:
+        logger.warning("No transaction history given: velocity features start from empty accounts")
+        return store
+    columns = [store.account_col, store.time_col, store.amount_col]
+    return store.warm_up(pd.concat(iter_chunks(history, columns=columns), ignore_index=True))
+
+
+def _fingerprint_columns(model: Any) -> list[str] | None:
+    columns = model_input_columns(model)
+    if columns is not None and not set(TIME_FEATURES).isdisjoint(columns):
+        # add_basic_features derives the time features from the raw timestamp.
+        columns = list(dict.fromkeys([*columns, "transaction_time"]))
+    return columns
+
+
+def predict_scores(model: Any, df: pd.DataFrame) -> np.ndarray:
+    return model.predict_proba(add_basic_features(df))[:, 1]
+
+
+def score_transaction(
+    model: Any,
+    row: Mapping[str, Any],
+    cache: ScoreCache | None = None,
+    model_version: str = "",
+    velocity: VelocityStore | None = None,
+) -> float:
+    # cache: optional ScoreCache; duplicate payloads skip feature engineering and the model.
+    # velocity: the account history; the transaction is recorded in it as it is scored.
+    if velocity is not None:
+        row = {**row, **velocity.process_row(row)}
+    key = None
+    if cache is not None:
+        key = transaction_fingerprint(row, model_version, _fingerprint_columns(model))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if isinstance(model, CompiledLogReg):
+        score = model.predict_proba_one(row)
+    else:
+        score = float(predict_scores(model, pd.DataFrame([row]))[0])
+
+    if key is not None:
+        cache.put(key, score)
+    return score
+
+
+def _cached_scores(
+    model: Any, df: pd.DataFrame, cache: ScoreCache, model_version: str
+) -> np.ndarray:
+    columns = _fingerprint_columns(model)
+    records = (df if columns is None else df.reindex(columns=columns)).to_dict("records")
+    keys = [transaction_fingerprint(row, model_version) for row in records]
+    proba = np.empty(len(df))
+    missing: dict[str, int] = {}
+    repeats: list[tuple[int, str]] = []
+    for i, key in enumerate(keys):
+        if key in missing:
+            repeats.append((i, key))  # looked up once the first occurrence is scored
+            continue
+        cached = cache.get(key)
+        if cached is None:
+            missing[key] = i
+        else:
+            proba[i] = cached
+
+    if missing:
+        # Only the first row of each unseen payload is scored.
+        rows = list(missing.values())
+        scores = predict_scores(model, df.iloc[rows])
+        proba[rows] = scores
+        for key, score in zip(missing, scores, strict=True):
+            cache.put(key, float(score))
+    for i, key in repeats:
+        cached = cache.get(key)
+        # A cache smaller than the chunk may already have evicted the entry.
+        proba[i] = cached if cached is not None else proba[missing[key]]
+    return proba
+
+
+def score_frame(
+    model: Any,
+    df: pd.DataFrame,
+    threshold: float = 0.5,
+    keep_columns: list[str] | None = None,
+    cache: ScoreCache | None = None,
+    model_version: str = "",
+    velocity: VelocityStore | None = None,
+) -> pd.DataFrame:
+    if velocity is not None:
+        df = velocity.process_frame(df)
+    if cache is None:
+        proba = predict_scores(model, df)
+    else:
+        proba = _cached_scores(model, df, cache, model_version)
+
+    scored = df[keep_columns].copy() if keep_columns else pd.DataFrame(index=df.index)
+    scored["fraud_probability"] = proba
+    scored["prediction"] = (proba >= threshold).astype("int8")
+    return scored
+
+
+class _ScoreWriter:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.format = _file_format(path)
+        self._parquet_writer: Any = None
+        self._header_written = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.format == "csv":
+            df.to_csv(
+                self.path,
+                mode="a" if self._header_written else "w",
+                header=not self._header_written,
+                index=False,
+            )
+            self._header_written = True
+            return
+
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._parquet_writer is None:
+            pq = _import_pyarrow_parquet()
+            self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        self._parquet_writer.write_table(table)
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+def score_file(
+    model: Any,
+    input_path: str | Path,
+    output_path: str | Path,
+    threshold: float = 0.5,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    keep_columns: list[str] | None = None,
+    label_col: str | None = None,
+    profiler: StageProfiler | None = None,
+    cache: ScoreCache | None = None,
+    model_version: str = "",
+    velocity: VelocityStore | None = None,
+) -> BatchScoringStats:
+    input_path = Path(input_path)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    check_row_features(model, velocity)
+    logger.info("Scoring %s -> %s (chunksize=%d)", input_path, output_path, chunksize)
+
+    writer = _ScoreWriter(output_path)
+    evaluator = StreamingEvaluator(threshold=threshold) if label_col else None
+    rows = 0
+    chunks = 0
+    start = time.perf_counter()
+
+    # profiler: optional StageProfiler; per-chunk stages are aggregated by name.
+    profiler = profiler or StageProfiler(enabled=False)
+    chunk_iter = iter_chunks(input_path, chunksize=chunksize)
+
+    try:
+        while True:
+            with profiler.stage("score_file/read") as call:
+                chunk = next(chunk_iter, None)
+                call.rows = len(chunk) if chunk is not None else 0
+            if chunk is None:
+                break
+            with profiler.stage("score_file/predict", rows=len(chunk)):
+                scored = score_frame(
+                    model,
+                    chunk,
+                    threshold=threshold,
+                    keep_columns=keep_columns,
+                    cache=cache,
+                    model_version=model_version,
+                    velocity=velocity,
+                )
+            with profiler.stage("score_file/write", rows=len(chunk)):
+                writer.write(scored)
+            if evaluator is not None:
+                if label_col not in chunk.columns:
+                    raise KeyError(f"Label column '{label_col}' not found in {input_path}")
+                with profiler.stage("score_file/evaluate", rows=len(chunk)):
+                    evaluator.update(chunk[label_col], scored["fraud_probability"])
+            rows += len(chunk)
+            chunks += 1
+            logger.debug("Scored chunk %d (%d rows total)", chunks, rows)
+    finally:
+        writer.close()
+
+    stats = BatchScoringStats(
+        rows=rows,
+        chunks=chunks,
+        seconds=time.perf_counter() - start,
+        evaluation=evaluator.result() if evaluator is not None else None,
+    )
+    logger.info(
+        "Scored %d rows in %d chunks (%.1fs, %.0f rows/sec)",
+        stats.rows,
+        stats.chunks,
+        stats.seconds,
+        stats.rows_per_sec,
+    )
+    return stats
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import numpy as np
+
+from fraudguard.evaluate import score_curve
+from fraudguard.models import MODEL_BUILDERS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CANDIDATES = 16
+DEFAULT_ETA = 3
+MIN_TRIAL_ROWS = 1_000
+
+
+def _sample_logreg(rng: np.random.Generator) -> dict[str, Any]:
+    return {
+        "C": float(10 ** rng.uniform(-3, 2)),
+        "max_iter": int(rng.choice([200, 500, 1000, 2000])),
+    }
+
+
+def _sample_forest(rng: np.random.Generator) -> dict[str, Any]:
+    max_depth = rng.choice([0, 6, 10, 16, 24])
+    return {
+        "n_estimators": int(rng.integers(50, 401)),
+        "max_depth": None if max_depth == 0 else int(max_depth),
+        "min_samples_leaf": int(rng.choice([1, 2, 5, 10, 20])),
+    }
+
+
+PARAM_SAMPLERS: dict[str, Callable[[np.random.Generator], dict[str, Any]]] = {
+    "logreg": _sample_logreg,
+    "forest": _sample_forest,
+}
+
+
+@dataclass
+class TrialResult:
+    model: str
+    params: dict[str, Any]
+    rung: int
+    n_rows: int
+    pr_auc: float
+    roc_auc: float | None
+    seconds: float
+
+
+@dataclass
+class SearchResult:
+    trials: list[TrialResult] = field(default_factory=list)
+    seconds: float = 0.0
+    budget_exhausted: bool = False
+
+    def best(self, model: str | None = None) -> TrialResult | None:
+        trials = [t for t in self.trials if model is None or t.model == model]
+        if not trials:
+            return None
+        # Only compare trials trained on the same amount of data: the last rung reached.
+        top_rung = max(t.rung for t in trials)
+        return max((t for t in trials if t.rung == top_rung), key=lambda t: t.pr_auc)
+
+    def to_dict(self) -> dict[str, Any]:
+        best = self.best()
+        return {
+            "best": asdict(best) if best is not None else None,
+            "trials": [asdict(t) for t in self.trials],
+            "seconds": round(self.seconds, 3),
+            "budget_exhausted": self.budget_exhausted,
+        }
+
+
+_WORKER_DATA: dict[str, Any] = {}
+
+
+def _init_worker(
+    X_train: Any, y_train: np.ndarray, X_valid: Any, y_valid: np.ndarray, order: np.ndarray
+) -> None:
+    # Each worker receives the preprocessed matrices once, not once per trial.
+    _WORKER_DATA.update(
+        X_train=X_train, y_train=y_train, X_valid=X_valid, y_valid=y_valid, order=order
+    )
+    logging.getLogger("fraudguard.models").setLevel(logging.WARNING)
+
+
+def _run_trial(model: str, params: dict[str, Any], rung: int, n_rows: int) -> TrialResult:
+    start = time.perf_counter()
+    rows = np.sort(_WORKER_DATA["order"][:n_rows])
+    clf = MODEL_BUILDERS[model]("passthrough", **params).named_steps["clf"]
+    if "n_jobs" in clf.get_params():
+        clf.set_params(n_jobs=1)  # parallelism comes from the process pool
+
+    clf.fit(_WORKER_DATA["X_train"][rows], _WORKER_DATA["y_train"][rows])
+    curve = score_curve(_WORKER_DATA["y_valid"], clf.predict_proba(_WORKER_DATA["X_valid"])[:, 1])
+    try:
+        roc_auc = curve.roc_auc()
+    except ValueError:
+        roc_auc = None  # a validation set without legitimate transactions; PR-AUC still ranks
+    return TrialResult(
+        model=model,
+        params=params,
+        rung=rung,
+        n_rows=n_rows,
+        pr_auc=curve.average_precision(),
+        roc_auc=roc_auc,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def _stratified_order(y: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # Every prefix of the returned order keeps the class ratio of y, so small rungs
+    # still contain fraud cases.
+    perm = rng.permutation(len(y))
+    labels = y[perm]
+    position = np.empty(len(y))
+    for label in np.unique(labels):
+        mask = labels == label
+        position[mask] = np.arange(mask.sum()) / mask.sum()
+    return perm[np.argsort(position, kind="stable")]
+
+
+def search_hyperparameters(
+    X_train: Any,
+    y_train: Any,
+    X_valid: Any,
+    y_valid: Any,
+    models: Sequence[str] = ("logreg", "forest"),
+    n_candidates: int = DEFAULT_CANDIDATES,
+    eta: int = DEFAULT_ETA,
+    min_rows: int = MIN_TRIAL_ROWS,
+    budget_seconds: float | None = None,
+    n_jobs: int | None = None,
+    random_state: int = 42,
+) -> SearchResult:
+    unknown = set(models) - set(PARAM_SAMPLERS)
+    if unknown:
+        raise ValueError(f"Cannot search {sorted(unknown)}, expected {sorted(PARAM_SAMPLERS)}")
+    if eta < 2:
+        raise ValueError(f"eta must be >= 2, got {eta}")
+
+    rng = np.random.default_rng(random_state)
+    y_train = np.asarray(y_train)
+    y_valid = np.asarray(y_valid)
+    n_train = len(y_train)
+    order = _stratified_order(y_train, rng)
+
+    configs = [(model, PARAM_SAMPLERS[model](rng)) for model in models for _ in range(n_candidates)]
+    n_rungs = int(math.log(len(configs), eta)) + 1
+    rung_rows = [
+        min(n_train, max(min_rows, math.ceil(n_train / eta ** (n_rungs - 1 - rung))))
+        for rung in range(n_rungs)
+    ]
+
+    result = SearchResult()
+    start = time.perf_counter()
+    deadline = start + budget_seconds if budget_seconds is not None else math.inf
+    max_workers = n_jobs or min(os.cpu_count() or 1, len(configs))
+
+    logger.info(
+        "Successive halving: %d candidates, eta=%d, rungs with %s rows, %d workers, budget %s",
+        len(configs),
+        eta,
+        rung_rows,
+        max_workers,
+        f"{budget_seconds:.0f}s" if budget_seconds is not None else "none",
+    )
+
+    # multiprocessing.Pool rather than ProcessPoolExecutor: leaving the block terminates
+    # the workers, so trials still running when the budget runs out are really stopped.
+    with multiprocessing.Pool(
+        processes=max_workers,
+        initializer=_init_worker,
+        initargs=(X_train, y_train, X_valid, y_valid, order),
+    ) as pool:
+        for rung, n_rows in enumerate(rung_rows):
+            submitted = [
+                pool.apply_async(_run_trial, (model, params, rung, n_rows))
+                for model, params in configs
+            ]
+            finished: list[TrialResult] = []
+
+            for async_result in submitted:
+                if budget_seconds is not None:
+                    async_result.wait(timeout=max(deadline - time.perf_counter(), 0))
+                    if not async_result.ready():
+                        result.budget_exhausted = True
+                        continue  # keep trials that already finished out of order
+                try:
+                    trial = async_result.get()
+                except Exception as e:
+                    logger.warning("Trial failed in rung %d: %s", rung, e)
+                    continue
+                finished.append(trial)
+                logger.info(
+                    "Rung %d, %s %s on %d rows: PR-AUC %.4f (%.1fs)",
+                    rung,
+                    trial.model,
+                    trial.params,
+                    trial.n_rows,
+                    trial.pr_auc,
+                    trial.seconds,
+                )
+
+            result.trials.extend(finished)
+            if result.budget_exhausted:
+                logger.warning(
+                    "Search budget exhausted in rung %d, %d trials abandoned",
+                    rung,
+                    len(submitted) - len(finished),
+                )
+                break
+            if not finished:
+                break
+
+            finished.sort(key=lambda t: t.pr_auc, reverse=True)
+            configs = [(t.model, t.params) for t in finished[: max(1, len(finished) // eta)]]
+
+    result.seconds = time.perf_counter() - start
+    best = result.best()
+    if best is None:
+        logger.warning("No trial finished within the search budget")
+    else:
+        logger.info(
+            "Best configuration: %s %s (validation PR-AUC %.4f on %d rows), search took %.1fs",
+            best.model,
+            best.params,
+            best.pr_auc,
+            best.n_rows,
+            result.seconds,
+        )
+    return result
@@ -0,0 +1,480 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from fraudguard.scoring import check_row_features, predict_scores
+from fraudguard.velocity import VelocityStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+DEFAULT_MAX_QUEUE = 1024
+DEFAULT_MAX_WORKERS = 2
+LATENCY_WINDOW = 10_000
+
+
+class LatencyStats:
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+
+    def record_request(self, latency: float, rows: int) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            self.requests += 1
+            self.rows += rows
+
+    def record_batch(self) -> None:
+        with self._lock:
+            self.batches += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            latencies = np.fromiter(self._latencies, dtype=float)
+            uptime = time.perf_counter() - self._started
+            requests, rows, batches, errors = self.requests, self.rows, self.batches, self.errors
+
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if len(latencies) else (0.0, 0.0)
+        return {
+            "requests": requests,
+            "rows": rows,
+            "batches": batches,
+            "errors": errors,
+            "uptime_sec": round(uptime, 3),
+            "latency_p50_ms": round(float(p50), 3),
+            "latency_p99_ms": round(float(p99), 3),
+            "mean_batch_rows": round(rows / batches, 2) if batches else 0.0,
+            "requests_per_sec": round(requests / uptime, 2) if uptime > 0 else 0.0,
+            "rows_per_sec": round(rows / uptime, 2) if uptime > 0 else 0.0,
+        }
+
+
+def _split_requests(
+    fn: Callable[[list[dict[str, Any]]], Any], requests: list[list[dict[str, Any]]]
+) -> list[Any]:
+    # Runs fn once over the rows of all requests; each gets its slice of the result or its error.
+    try:
+        out = fn([row for rows in requests for row in rows])
+    except Exception as e:
+        if len(requests) == 1:
+            return [e]
+        # One malformed request must not fail the whole batch: retry individually.
+        return [_split_requests(fn, [rows])[0] for rows in requests]
+
+    bounds = np.cumsum([0, *map(len, requests)])
+    return [out[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:], strict=True)]
+
+
+def _score_requests(
+    score_fn: Callable[[pd.DataFrame], np.ndarray],
+    requests: list[list[dict[str, Any]]],
+    prepare_fn: Callable[[list[dict[str, Any]]], list[dict[str, Any]]] | None = None,
+) -> list[np.ndarray | Exception]:
+    # prepare_fn may record state (a VelocityStore does), so it runs once per request and
+    # a failed scoring attempt is retried on the prepared rows.
+    results = list(requests) if prepare_fn is None else _split_requests(prepare_fn, requests)
+    ready = [i for i, result in enumerate(results) if not isinstance(result, Exception)]
+    scores = _split_requests(
+        lambda rows: np.asarray(score_fn(pd.DataFrame(rows))), [results[i] for i in ready]
+    )
+    for i, score in zip(ready, scores, strict=True):
+        results[i] = score
+    return results
+
+
+def _velocity_rows(velocity: VelocityStore, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return velocity.process_frame(pd.DataFrame(rows)).to_dict("records")
+
+
+@dataclass
+class _Request:
+    rows: list[dict[str, Any]]
+    future: Future = field(default_factory=Future)
+    submitted: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        score_fn: Callable[[pd.DataFrame], np.ndarray],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        stats: LatencyStats | None = None,
+        prepare_fn: Callable[[list[dict[str, Any]]], list[dict[str, Any]]] | None = None,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+
+        self.score_fn = score_fn
+        self.prepare_fn = prepare_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats if stats is not None else LatencyStats()
+        self._queue: queue.Queue[_Request | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_model(
+        cls, model: Any, velocity: VelocityStore | None = None, **kwargs: Any
+    ) -> MicroBatcher:
+        # velocity: account history for models trained with velocity features.
+        check_row_features(model, velocity)
+        if velocity is not None:
+            kwargs["prepare_fn"] = partial(_velocity_rows, velocity)
+        return cls(lambda df: predict_scores(model, df), **kwargs)
+
+    def start(self) -> MicroBatcher:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> MicroBatcher:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def submit(self, rows: list[dict[str, Any]]) -> Future:
+        if self._thread is None:
+            raise RuntimeError("MicroBatcher is not running; call start() first")
+        request = _Request(rows=rows)
+        self._queue.put(request)
+        return request.future
+
+    def score(self, rows: list[dict[str, Any]], timeout: float | None = None) -> np.ndarray:
+        return self.submit(rows).result(timeout=timeout)
+
+    def _collect(self, first: _Request) -> tuple[list[_Request], bool]:
+        batch = [first]
+        n_rows = len(first.rows)
+        deadline = time.perf_counter() + self.max_wait
+
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            n_rows += len(request.rows)
+
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch, stopping = self._collect(first)
+            self._score_batch(batch)
+            if stopping:
+                return
+
+    def _score_batch(self, batch: list[_Request]) -> None:
+        self.stats.record_batch()
+        results = _score_requests(
+            self.score_fn, [request.rows for request in batch], self.prepare_fn
+        )
+
+        now = time.perf_counter()
+        for request, result in zip(batch, results, strict=True):
+            if isinstance(result, Exception):
+                self.stats.record_error()
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
+                self.stats.record_request(now - request.submitted, len(request.rows))
+
+
+@dataclass
+class _AsyncRequest:
+    rows: list[dict[str, Any]]
+    future: asyncio.Future
+    submitted: float = field(default_factory=time.perf_counter)
+
+
+class AsyncScorer:
+    def __init__(
+        self,
+        score_fn: Callable[[pd.DataFrame], np.ndarray],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        block_when_full: bool = True,
+        stats: LatencyStats | None = None,
+        prepare_fn: Callable[[list[dict[str, Any]]], list[dict[str, Any]]] | None = None,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+        if max_queue < 1:
+            raise ValueError(f"max_queue must be >= 1, got {max_queue}")
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {max_workers}")
+
+        self.score_fn = score_fn
+        self.prepare_fn = prepare_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.max_workers = max_workers
+        # block_when_full: callers wait for queue space; otherwise score() raises QueueFull.
+        self.block_when_full = block_when_full
+        self.stats = stats if stats is not None else LatencyStats()
+        self._queue: asyncio.Queue[_AsyncRequest | None] | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._getter: asyncio.Task | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_model(
+        cls, model: Any, velocity: VelocityStore | None = None, **kwargs: Any
+    ) -> AsyncScorer:
+        # velocity: account history for models trained with velocity features.
+        check_row_features(model, velocity)
+        if velocity is not None:
+            kwargs["prepare_fn"] = partial(_velocity_rows, velocity)
+        return cls(lambda df: predict_scores(model, df), **kwargs)
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> AsyncScorer:
+        if self._dispatcher is None:
+            # The queue and semaphore belong to the running event loop.
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="async-scorer"
+            )
+            self._dispatcher = asyncio.create_task(self._run(), name="async-scorer")
+        return self
+
+    async def stop(self) -> None:
+        if self._dispatcher is None:
+            return
+        # Requests already queued are scored before the sentinel is reached.
+        await self._queue.put(None)
+        await self._dispatcher
+        if self._inflight:
+            await asyncio.gather(*self._inflight)
+        self._executor.shutdown(wait=True)
+        self._dispatcher = self._executor = self._queue = self._slots = None
+
+    async def __aenter__(self) -> AsyncScorer:
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    async def score(self, rows: list[dict[str, Any]]) -> np.ndarray:
+        if self._dispatcher is None:
+            raise RuntimeError("AsyncScorer is not running; call start() first")
+        request = _AsyncRequest(rows=rows, future=asyncio.get_running_loop().create_future())
+        if self.block_when_full:
+            await self._queue.put(request)
+        else:
+            self._queue.put_nowait(request)
+        return await request.future
+
+    async def score_one(self, row: dict[str, Any]) -> float:
+        return float((await self.score([row]))[0])
+
+    async def _next(self, timeout: float | None) -> _AsyncRequest | None | bool:
+        # The pending get() survives a timeout and is reused, so no request is ever lost.
+        if self._getter is None:
+            self._getter = asyncio.ensure_future(self._queue.get())
+        done, _ = await asyncio.wait({self._getter}, timeout=timeout)
+        if not done:
+            return False
+        request = self._getter.result()
+        self._getter = None
+        return request
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._next(None)
+            if first is None:
+                return
+
+            batch = [first]
+            n_rows = len(first.rows)
+            deadline = time.perf_counter() + self.max_wait
+            while n_rows < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                request = await self._next(remaining)
+                if request is False:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+                n_rows += len(request.rows)
+
+            # At most max_workers batches run at once; meanwhile requests queue up and
+            # the queue bound pushes back on callers.
+            await self._slots.acquire()
+            task = asyncio.create_task(self._score_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        self._slots.release()
+
+    async def _score_batch(self, batch: list[_AsyncRequest]) -> None:
+        # Requests cancelled while queued (e.g. a caller timeout) are not scored.
+        batch = [request for request in batch if not request.future.done()]
+        if not batch:
+            return
+        self.stats.record_batch()
+
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            self._executor,
+            _score_requests,
+            self.score_fn,
+            [request.rows for request in batch],
+            self.prepare_fn,
+        )
+
+        now = time.perf_counter()
+        for request, result in zip(batch, results, strict=True):
+            if isinstance(result, Exception):
+                self.stats.record_error()
+                if not request.future.done():
+                    request.future.set_exception(result)
+            else:
+                if not request.future.done():
+                    request.future.set_result(result)
+                self.stats.record_request(now - request.submitted, len(request.rows))
+
+
+class _ScoringHandler(BaseHTTPRequestHandler):
+    server: ScoringServer
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send_json(HTTPStatus.OK, self.server.batcher.stats.snapshot())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/score":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length))
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {e}"})
+            return
+
+        single = isinstance(payload, dict)
+        rows = [payload] if single else payload
+        if not isinstance(rows, list) or not rows or not all(isinstance(r, dict) for r in rows):
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "Expected a transaction object or a non-empty list of objects"},
+            )
+            return
+
+        try:
+            scores = self.server.batcher.score(rows, timeout=self.server.timeout_sec)
+        except FutureTimeoutError:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Scoring timed out"})
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            # Raised by feature engineering and the model on malformed transactions.
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except Exception:
+            logger.exception("Scoring failed for a request of %d rows", len(rows))
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal scoring error"})
+            return
+
+        threshold = self.server.threshold
+        results = [
+            {
+                "fraud_probability": round(float(proba), 6),
+                "prediction": int(proba >= threshold),
+            }
+            for proba in scores
+        ]
+        body: dict[str, Any] = results[0] if single else {"results": results}
+        self._send_json(HTTPStatus.OK, {**body, "threshold": threshold})
+
+    def _send_json(self, status: HTTPStatus, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        batcher: MicroBatcher,
+        threshold: float = 0.5,
+        timeout_sec: float = 5.0,
+    ) -> None:
+        super().__init__(address, _ScoringHandler)
+        self.batcher = batcher
+        self.threshold = threshold
+        self.timeout_sec = timeout_sec
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BASE_TRANSACTION_TYPES = ["PAYMENT", "CASH_OUT", "TRANSFER", "DEBIT", "CASH_IN"]
+BASE_DEVICE_TYPES = ["mobile", "web", "pos-terminal", "atm"]
+FRAUD_PRONE_TYPES = ("TRANSFER", "CASH_OUT")
+
+
+def _categories(base: list[str], n: int, prefix: str) -> list[str]:
+    if n < 1:
+        raise ValueError(f"Cardinality must be >= 1, got {n}")
+    return (base + [f"{prefix}_{i}" for i in range(len(base), n)])[:n]
+
+
+def _ids(prefix: str, codes: np.ndarray, n: int) -> pd.Categorical:
+    return pd.Categorical.from_codes(codes, categories=[f"{prefix}{i}" for i in range(n)])
+
+
+def generate_transactions(
+    n_rows: int = 10_000,
+    fraud_rate: float = 0.01,
+    n_accounts: int = 10_000,
+    n_merchants: int = 1_000,
+    n_transaction_types: int = len(BASE_TRANSACTION_TYPES),
+    n_device_types: int = len(BASE_DEVICE_TYPES),
+    start: str = "2025-01-01",
+    days: int = 30,
+    target_col: str = "isFraud",
+    random_state: int = 42,
+) -> pd.DataFrame:
+    if not 0 <= fraud_rate <= 1:
+        raise ValueError(f"fraud_rate must be in [0, 1], got {fraud_rate}")
+
+    rng = np.random.default_rng(random_state)
+    transaction_types = _categories(BASE_TRANSACTION_TYPES, n_transaction_types, "TYPE")
+    device_types = _categories(BASE_DEVICE_TYPES, n_device_types, "device")
+
+    is_fraud = np.zeros(n_rows, dtype="int8")
+    n_fraud = round(n_rows * fraud_rate)
+    is_fraud[rng.choice(n_rows, size=n_fraud, replace=False)] = 1
+    fraud = is_fraud == 1
+
+    # Legitimate traffic follows a daytime pattern; fraud is spread over the night too.
+    day = rng.integers(0, days, n_rows)
+    hour = np.where(
+        fraud,
+        rng.integers(0, 24, n_rows),
+        np.clip(rng.normal(14, 4, n_rows), 0, 23).astype(int),
+    )
+    seconds = day * 86400 + hour * 3600 + rng.integers(0, 3600, n_rows)
+
+    amount = rng.lognormal(mean=np.where(fraud, 7.0, 4.5), sigma=1.2)
+
+    type_weights = np.ones(len(transaction_types))
+    fraud_type_weights = type_weights.copy()
+    for i, name in enumerate(transaction_types):
+        if name in FRAUD_PRONE_TYPES:
+            fraud_type_weights[i] = 10.0
+    type_codes = np.where(
+        fraud,
+        rng.choice(len(transaction_types), n_rows, p=fraud_type_weights / fraud_type_weights.sum()),
+        rng.choice(len(transaction_types), n_rows, p=type_weights / type_weights.sum()),
+    )
+
+    device_codes = rng.integers(0, len(device_types), n_rows)
+    account_codes = rng.integers(0, n_accounts, n_rows)
+    merchant_codes = rng.integers(0, n_merchants, n_rows)
+
+    # Rows come out in time order; one permutation keeps every column aligned with its time.
+    order = np.argsort(seconds, kind="stable")
+    df = pd.DataFrame(
+        {
+            "transaction_time": pd.Timestamp(start) + pd.to_timedelta(seconds[order], unit="s"),
+            "amount": amount[order].round(2),
+            "transaction_type": pd.Categorical.from_codes(
+                type_codes[order], categories=transaction_types
+            ),
+            "device_type": pd.Categorical.from_codes(device_codes[order], categories=device_types),
+            "nameOrig": _ids("C", account_codes[order], n_accounts),
+            "nameDest": _ids("M", merchant_codes[order], n_merchants),
+            target_col: is_fraud[order],
+        }
+    )
+
+    logger.info(
+        "Generated %d synthetic transactions (%d fraud, %d accounts, %d merchants)",
+        n_rows,
+        n_fraud,
+        n_accounts,
+        n_merchants,
+    )
+    return df
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import numpy as np
+
+from fraudguard.evaluate import score_curve
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CostMatrix:
+    false_positive: float = 1.0
+    false_negative: float = 10.0
+    true_positive: float = 0.0
+    true_negative: float = 0.0
+
+
+@dataclass
+class OperatingPoint:
+    threshold: float
+    precision: float
+    recall: float
+    f1: float
+    alert_rate: float
+    cost: float | None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ThresholdSweep:
+    thresholds: np.ndarray
+    tp: np.ndarray
+    fp: np.ndarray
+    fn: np.ndarray
+    tn: np.ndarray
+    cost: np.ndarray | None
+
+    @property
+    def precision(self) -> np.ndarray:
+        alerts = self.tp + self.fp
+        return np.divide(self.tp, alerts, out=np.zeros(len(alerts)), where=alerts > 0)
+
+    @property
+    def recall(self) -> np.ndarray:
+        positives = self.tp + self.fn
+        return np.divide(self.tp, positives, out=np.zeros(len(positives)), where=positives > 0)
+
+    @property
+    def f1(self) -> np.ndarray:
+        denom = 2 * self.tp + self.fp + self.fn
+        return np.divide(2 * self.tp, denom, out=np.zeros(len(denom)), where=denom > 0)
+
+    @property
+    def alert_rate(self) -> np.ndarray:
+        return (self.tp + self.fp) / (self.tp + self.fp + self.fn + self.tn)
+
+    def point(self, index: int) -> OperatingPoint:
+        return OperatingPoint(
+            threshold=float(self.thresholds[index]),
+            precision=float(self.precision[index]),
+            recall=float(self.recall[index]),
+            f1=float(self.f1[index]),
+            alert_rate=float(self.alert_rate[index]),
+            cost=None if self.cost is None else float(self.cost[index]),
+        )
+
+
+def sweep_thresholds(
+    y_true: Any,
+    y_score: Any,
+    costs: CostMatrix | None = None,
+) -> ThresholdSweep:
+    curve = score_curve(y_true, y_score)
+
+    # Candidate thresholds are the distinct scores (alert when score >= threshold), plus
+    # one above every score and above 1 for the "never alert" operating point. It is kept
+    # finite: the chosen threshold is saved to JSON metadata, which has no Infinity.
+    never = np.nextafter(max(1.0, float(curve.thresholds.max(initial=1.0))), np.inf)
+    thresholds = np.concatenate([[never], curve.thresholds])
+    tp = np.concatenate([[0], curve.tps])
+    fp = np.concatenate([[0], curve.fps])
+    fn = curve.n_pos - tp
+    tn = curve.n_neg - fp
+
+    cost = None
+    if costs is not None:
+        cost = (
+            costs.true_positive * tp
+            + costs.false_positive * fp
+            + costs.false_negative * fn
+            + costs.true_negative * tn
+        )
+
+    return ThresholdSweep(thresholds=thresholds, tp=tp, fp=fp, fn=fn, tn=tn, cost=cost)
+
+
+def optimize_threshold(
+    y_true: Any,
+    y_score: Any,
+    costs: CostMatrix | None = None,
+    max_alert_rate: float | None = None,
+) -> OperatingPoint:
+    if max_alert_rate is not None and not 0 <= max_alert_rate <= 1:
+        raise ValueError(f"max_alert_rate must be in [0, 1], got {max_alert_rate}")
+
+    sweep = sweep_thresholds(y_true, y_score, costs)
+
+    feasible = np.ones(len(sweep.thresholds), dtype=bool)
+    if max_alert_rate is not None:
+        feasible = sweep.alert_rate <= max_alert_rate
+    candidates = np.flatnonzero(feasible)
+
+    # Minimize expected cost if costs are given, otherwise maximize F1.
+    objective = sweep.cost if sweep.cost is not None else -sweep.f1
+    best = int(candidates[np.argmin(objective[candidates])])
+    point = sweep.point(best)
+
+    logger.info(
+        "Optimal threshold %.4f: precision %.4f, recall %.4f, F1 %.4f, alert rate %.4f%s",
+        point.threshold,
+        point.precision,
+        point.recall,
+        point.f1,
+        point.alert_rate,
+        "" if point.cost is None else f", cost {point.cost:.2f}",
+    )
+    return point
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import logging
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+
+from fraudguard.incremental import CLASSES, balanced_class_weight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEW_TREES = 20
+DEFAULT_EPOCHS = 1
+# Step size of the SGD updates applied to a batch-trained LogisticRegression.
+DEFAULT_LOGREG_ETA0 = 0.001
+
+
+@dataclass
+class UpdateResult:
+    model_type: str
+    rows: int
+    fraud_rows: int
+    seconds: float
+    before: dict[str, Any] = field(default_factory=dict)
+    after: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "model_type": self.model_type,
+            "rows": self.rows,
+            "fraud_rows": self.fraud_rows,
+            "seconds": round(self.seconds, 3),
+            "before": self.before,
+            "after": self.after,
+        }
+
+
+def _update_forest(
+    clf: RandomForestClassifier, Xt: Any, y: np.ndarray, n_trees: int, max_trees: int | None
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    before = {"n_estimators": len(clf.estimators_)}
+    # warm_start keeps the fitted trees and grows only the new ones, on the new data.
+    clf.set_params(warm_start=True, n_estimators=len(clf.estimators_) + n_trees)
+    try:
+        with warnings.catch_warnings():
+            # Balancing the new trees on the new data alone is intended here.
+            warnings.filterwarnings("ignore", message="class_weight presets", category=UserWarning)
+            clf.fit(Xt, y)
+    finally:
+        clf.set_params(warm_start=False)
+
+    if max_trees is not None and len(clf.estimators_) > max_trees:
+        # Sliding window: retire the oldest trees so the ensemble tracks recent data.
+        clf.estimators_ = clf.estimators_[-max_trees:]
+        clf.n_estimators = max_trees
+    return before, {"n_estimators": len(clf.estimators_)}
+
+
+def _update_sgd(
+    clf: SGDClassifier, Xt: Any, y: np.ndarray, epochs: int, random_state: int
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    before = {"updates": int(clf.t_)}
+    class_weight = clf.class_weight
+    if class_weight == "balanced":
+        # partial_fit does not support "balanced": use the weights of the new data.
+        clf.set_params(class_weight=balanced_class_weight(np.bincount(y, minlength=len(CLASSES))))
+    rng = np.random.default_rng(random_state)
+    try:
+        for _ in range(epochs):
+            rows = rng.permutation(len(y))
+            clf.partial_fit(Xt[rows], y[rows], classes=CLASSES)
+    finally:
+        clf.set_params(class_weight=class_weight)
+    return before, {"updates": int(clf.t_)}
+
+
+def _update_logreg(
+    clf: LogisticRegression, Xt: Any, y: np.ndarray, epochs: int, eta0: float, random_state: int
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    before = {"coef_norm": float(np.linalg.norm(clf.coef_))}
+    # LogisticRegression has no partial_fit, and a warm-started solver converges to the
+    # optimum of the new data alone. Small averaged SGD steps on the same loss, starting
+    # from the current coefficients, adapt the model without forgetting it.
+    class_weight = clf.class_weight
+    if class_weight == "balanced":
+        class_weight = balanced_class_weight(np.bincount(y, minlength=len(CLASSES)))
+    sgd = SGDClassifier(
+        loss="log_loss",
+        alpha=1.0 / (clf.C * len(y)),
+        learning_rate="constant",
+        eta0=eta0,
+        average=True,
+        max_iter=epochs,
+        tol=None,
+        class_weight=class_weight,
+        random_state=random_state,
+    )
+    with warnings.catch_warnings():
+        # max_iter is the number of epochs here, not a convergence budget.
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        sgd.fit(Xt, y, coef_init=clf.coef_, intercept_init=clf.intercept_)
+    clf.coef_ = sgd.coef_.copy()
+    clf.intercept_ = sgd.intercept_.copy()
+    return before, {"coef_norm": float(np.linalg.norm(clf.coef_))}
+
+
+UPDATABLE_MODELS = {
+    RandomForestClassifier: "forest",
+    SGDClassifier: "sgd",
+    LogisticRegression: "logreg",
+}
+
+
+def update_model(
+    model: Pipeline,
+    X: Any,
+    y: Any,
+    n_trees: int = DEFAULT_NEW_TREES,
+    max_trees: int | None = None,
+    epochs: int = DEFAULT_EPOCHS,
+    logreg_eta0: float = DEFAULT_LOGREG_ETA0,
+    random_state: int = 42,
+) -> UpdateResult:
+    if not isinstance(model, Pipeline) or "preprocess" not in model.named_steps:
+        raise TypeError(
+            f"Expected a Pipeline with 'preprocess' and 'clf' steps, got {type(model).__name__}"
+        )
+    clf = model.named_steps["clf"]
+    if isinstance(clf, HistGradientBoostingClassifier):
+        # Warm start re-bins the new data but walks the fitted trees with the new bin
+        # indices, which is only valid when refitting on the original training data.
+        raise TypeError("HistGradientBoosting cannot be updated incrementally, retrain it")
+    if type(clf) not in UPDATABLE_MODELS:
+        raise TypeError(f"Cannot update {type(clf).__name__} incrementally")
+
+    y = np.asarray(y).astype(np.int64)
+    if set(np.unique(y)) != set(CLASSES):
+        raise ValueError(f"New data must contain both classes, got {np.unique(y).tolist()}")
+
+    start = time.perf_counter()
+    # The fitted preprocessor is reused as is: unseen categories are handled as unknown.
+    Xt = model.named_steps["preprocess"].transform(X)
+    model_type = UPDATABLE_MODELS[type(clf)]
+    if model_type == "forest":
+        before, after = _update_forest(clf, Xt, y, n_trees, max_trees)
+    elif model_type == "sgd":
+        before, after = _update_sgd(clf, Xt, y, epochs, random_state)
+    else:
+        before, after = _update_logreg(clf, Xt, y, epochs, logreg_eta0, random_state)
+
+    result = UpdateResult(
+        model_type=model_type,
+        rows=len(y),
+        fraud_rows=int(y.sum()),
+        seconds=time.perf_counter() - start,
+        before=before,
+        after=after,
+    )
+    logger.info(
+        "Updated %s on %d rows (%d fraud) in %.2fs: %s -> %s",
+        model_type,
+        result.rows,
+        result.fraud_rows,
+        result.seconds,
+        before,
+        after,
+    )
+    return result
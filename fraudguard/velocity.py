@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from collections import deque
+from collections.abc import Hashable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from fraudguard.features import parse_timestamp, parse_timestamps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOWS: dict[str, float] = {"1h": 3600.0, "24h": 86400.0}
+NO_HISTORY = -1.0
+
+
+def velocity_feature_names(windows: Mapping[str, float] = DEFAULT_WINDOWS) -> list[str]:
+    names = []
+    for name in windows:
+        names.extend([f"txn_count_{name}", f"amount_sum_{name}"])
+    return [*names, "secs_since_prev", "amount_zscore"]
+
+
+def _zscore(amount: float, n: int, mean: float, var: float) -> float:
+    if n < 2 or var <= 0:
+        return 0.0
+    return (amount - mean) / math.sqrt(var)
+
+
+def add_velocity_features(
+    df: pd.DataFrame,
+    account_col: str = "nameOrig",
+    time_col: str = "transaction_time",
+    amount_col: str = "amount",
+    windows: Mapping[str, float] = DEFAULT_WINDOWS,
+    inplace: bool = False,
+) -> pd.DataFrame:
+    for col in (account_col, time_col, amount_col):
+        if col not in df.columns:
+            raise KeyError(f"Column '{col}' not found in DataFrame")
+
+    if not inplace:
+        df = df.copy()
+
+    n_rows = len(df)
+    features = {name: np.full(n_rows, np.nan) for name in velocity_feature_names(windows)}
+
+    times = parse_timestamps(df[time_col])
+    valid = times.notna().to_numpy()
+    rows = np.flatnonzero(valid)
+
+    t = times.to_numpy()[valid].astype("int64") / 1e9
+    amounts = df[amount_col].to_numpy(dtype=float)[valid]
+    amounts = np.nan_to_num(amounts)
+    codes, _ = pd.factorize(df[account_col].to_numpy()[valid])
+
+    # Sort by (account, time); lexsort is stable, so ties keep their input order.
+    order = np.lexsort((t, codes))
+    rows, t, amounts, codes = rows[order], t[order], amounts[order], codes[order]
+
+    n = len(t)
+    position = np.arange(n)
+    new_account = np.ones(n, dtype=bool)
+    new_account[1:] = codes[1:] != codes[:-1]
+    account_start = np.maximum.accumulate(np.where(new_account, position, 0))
+    n_prev = position - account_start
+
+    def exclusive_cumsum(values: np.ndarray) -> np.ndarray:
+        # Per-account running sums keep magnitudes small, unlike differences of one
+        # global cumsum over the whole file.
+        inclusive = pd.Series(values).groupby(codes, sort=False).cumsum().to_numpy()
+        return inclusive - values
+
+    prev_amounts = exclusive_cumsum(amounts)
+
+    for name, seconds in windows.items():
+        # Rank times so that (account, time) packs into one sortable int64 key; the window
+        # start for every row is then a single searchsorted over all accounts at once.
+        grid, ranks = np.unique(np.concatenate([t, t - seconds]), return_inverse=True)
+        width = np.int64(len(grid))
+        key = codes * width + ranks[:n]
+        key_lo = codes * width + ranks[n:]
+        start = np.searchsorted(key, key_lo, side="right")
+
+        features[f"txn_count_{name}"][rows] = position - start
+        features[f"amount_sum_{name}"][rows] = prev_amounts - prev_amounts[start]
+
+    since_prev = np.full(n, NO_HISTORY)
+    has_prev = ~new_account
+    since_prev[has_prev] = t[has_prev] - t[np.flatnonzero(has_prev) - 1]
+    features["secs_since_prev"][rows] = since_prev
+
+    # Shift by the account's first amount before accumulating squares to avoid cancellation.
+    shifted = amounts - amounts[account_start]
+    prev_sum = exclusive_cumsum(shifted)
+    prev_sq = exclusive_cumsum(shifted**2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = prev_sum / n_prev
+        var = (prev_sq - n_prev * mean**2) / (n_prev - 1)
+        zscore = np.where((n_prev >= 2) & (var > 0), (shifted - mean) / np.sqrt(var), 0.0)
+    features["amount_zscore"][rows] = zscore
+
+    for name, values in features.items():
+        df[name] = values
+
+    logger.debug("Added velocity features for %d accounts", codes.max() + 1 if n else 0)
+    return df
+
+
+@dataclass
+class _AccountState:
+    windows: list[deque[tuple[float, float]]]
+    sums: list[float]
+    last_time: float | None = None
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+
+def _to_amount(value: Any) -> float:
+    # Missing amounts count as 0, as in add_velocity_features.
+    return 0.0 if value is None or math.isnan(value) else float(value)
+
+
+def _to_seconds(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    ts = parse_timestamp(value)
+    if ts is None:
+        raise ValueError(f"Cannot parse timestamp: {value!r}")
+    return pd.Timestamp(ts).value / 1e9
+
+
+@dataclass
+class VelocityStore:
+    windows: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_WINDOWS))
+    account_col: str = "nameOrig"
+    time_col: str = "transaction_time"
+    amount_col: str = "amount"
+    _accounts: dict[Hashable, _AccountState] = field(default_factory=dict, init=False)
+    # Scoring threads share one store: each event is read and recorded atomically.
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def _state(self, account: Hashable) -> _AccountState:
+        state = self._accounts.get(account)
+        if state is None:
+            state = _AccountState(
+                windows=[deque() for _ in self.windows], sums=[0.0] * len(self.windows)
+            )
+            self._accounts[account] = state
+        return state
+
+    def _evict(self, state: _AccountState, t: float) -> None:
+        for i, seconds in enumerate(self.windows.values()):
+            events = state.windows[i]
+            bound = t - seconds
+            while events and events[0][0] <= bound:
+                state.sums[i] -= events.popleft()[1]
+            if not events:
+                state.sums[i] = 0.0  # drop accumulated rounding error
+
+    def features(self, account: Hashable, timestamp: Any, amount: float) -> dict[str, float]:
+        t = _to_seconds(timestamp)
+        amount = _to_amount(amount)
+        state = self._state(account)
+        self._evict(state, t)
+
+        result = {}
+        for i, name in enumerate(self.windows):
+            result[f"txn_count_{name}"] = float(len(state.windows[i]))
+            result[f"amount_sum_{name}"] = state.sums[i]
+        result["secs_since_prev"] = NO_HISTORY if state.last_time is None else t - state.last_time
+        variance = state.m2 / (state.count - 1) if state.count >= 2 else 0.0
+        result["amount_zscore"] = _zscore(amount, state.count, state.mean, variance)
+        return result
+
+    def update(self, account: Hashable, timestamp: Any, amount: float) -> None:
+        t = _to_seconds(timestamp)
+        amount = _to_amount(amount)
+        state = self._state(account)
+        self._evict(state, t)
+
+        for i in range(len(self.windows)):
+            state.windows[i].append((t, amount))
+            state.sums[i] += amount
+        state.last_time = t
+
+        # Welford's online mean/variance: O(1) per event, no history re-scan.
+        state.count += 1
+        delta = amount - state.mean
+        state.mean += delta / state.count
+        state.m2 += delta * (amount - state.mean)
+
+    def process(self, account: Hashable, timestamp: Any, amount: float) -> dict[str, float]:
+        with self._lock:
+            result = self.features(account, timestamp, amount)
+            self.update(account, timestamp, amount)
+        return result
+
+    def process_row(self, row: Mapping[str, Any]) -> dict[str, float]:
+        account = row.get(self.account_col)
+        if account is None:
+            raise ValueError(f"Missing value for account column '{self.account_col}'")
+        return self.process(account, row.get(self.time_col), row.get(self.amount_col))
+
+    def process_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Features of a batch of new transactions, which are then recorded. Rows are replayed
+        # in time order, as add_velocity_features sees them; the whole batch is validated
+        # first, so a rejected batch records nothing.
+        for col in (self.account_col, self.time_col, self.amount_col):
+            if col not in df.columns:
+                raise KeyError(f"Column '{col}' not found in DataFrame")
+        if df[self.account_col].isna().any():
+            raise ValueError(f"Missing value for account column '{self.account_col}'")
+        times = parse_timestamps(df[self.time_col])
+        if times.isna().any():
+            bad = df[self.time_col][times.isna()].iloc[0]
+            raise ValueError(f"Cannot parse timestamp: {bad!r}")
+
+        seconds = times.to_numpy().astype("int64") / 1e9
+        accounts = df[self.account_col].to_numpy()
+        amounts = df[self.amount_col].to_numpy(dtype=float)
+        rows: list[dict[str, float]] = [{}] * len(df)
+        with self._lock:
+            for i in np.argsort(seconds, kind="stable"):
+                rows[i] = self.process(accounts[i], seconds[i], amounts[i])
+
+        features = pd.DataFrame(rows, index=df.index, columns=velocity_feature_names(self.windows))
+        return df.assign(**{name: features[name] for name in features.columns})
+
+    def warm_up(self, df: pd.DataFrame) -> VelocityStore:
+        times = parse_timestamps(df[self.time_col])
+        history = pd.DataFrame(
+            {"account": df[self.account_col].to_numpy(), "t": times, "amount": df[self.amount_col]}
+        )
+        history = history[history["t"].notna()].sort_values("t", kind="stable")
+
+        with self._lock:
+            for account, ts, amount in history.itertuples(index=False):
+                self.update(account, ts, amount)
+
+        logger.info("Warmed up velocity store with %d events, %d accounts", len(history), len(self))
+        return self
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from fraudguard import (
+    add_basic_features,
+    build_forest_model,
+    build_logreg_model,
+    build_preprocessor,
+    evaluate_model,
+    train_valid_test_split,
+)
+from fraudguard.data import read_transactions
+from fraudguard.features import ENCODERS, TIME_FEATURES
+from fraudguard.synthetic import generate_transactions
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)-8s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+TARGET_COL = "isFraud"
+NUMERIC_COLS = ["amount", *TIME_FEATURES]
+CATEGORICAL_COLS = ["transaction_type", "device_type"]
+MODEL_BUILDERS: dict[str, Callable[..., Any]] = {
+    "logreg": build_logreg_model,
+    "forest": build_forest_model,
+}
+
+
+@dataclass
+class StageResult:
+    n_rows: int
+    stage: str
+    model: str | None
+    seconds: float
+    rows_per_sec: float
+    peak_mb: float | None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the training pipeline on synthetic transactions",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000],
+        help="Dataset sizes to benchmark (e.g. 10000 1000000 10000000)",
+    )
+    parser.add_argument(
+        "--models",
+        type=str,
+        nargs="+",
+        choices=sorted(MODEL_BUILDERS),
+        default=["logreg", "forest"],
+        help="Models to fit and evaluate",
+    )
+    parser.add_argument(
+        "--fraud-rate",
+        type=float,
+        default=0.01,
+        help="Share of fraudulent transactions in the synthetic data",
+    )
+    parser.add_argument(
+        "--accounts",
+        type=int,
+        default=100_000,
+        help="Number of distinct accounts (nameOrig)",
+    )
+    parser.add_argument(
+        "--forest-trees",
+        type=int,
+        default=50,
+        help="Number of trees in the Random Forest",
+    )
+    parser.add_argument(
+        "--encoder",
+        type=str,
+        choices=ENCODERS,
+        default="onehot",
+        help="Encoding of categorical features",
+    )
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="Keep the design matrix sparse (CSR) end to end",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Do not trace peak memory (tracemalloc slows allocation-heavy stages)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed of the synthetic data",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write results as JSON to this path",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="JSON results of a previous run; exit with 1 if a stage became slower",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown against the baseline",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.05,
+        help="Ignore slowdowns smaller than this many seconds (timer noise)",
+    )
+    return parser.parse_args()
+
+
+class Benchmark:
+    def __init__(self, trace_memory: bool) -> None:
+        self.trace_memory = trace_memory
+        self.results: list[StageResult] = []
+
+    @contextmanager
+    def stage(self, name: str, n_rows: int, model: str | None = None) -> Iterator[None]:
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_mb = None
+            if self.trace_memory:
+                peak_mb = tracemalloc.get_traced_memory()[1] / 1024**2
+                tracemalloc.stop()
+
+        result = StageResult(
+            n_rows=n_rows,
+            stage=name,
+            model=model,
+            seconds=seconds,
+            rows_per_sec=n_rows / seconds if seconds > 0 else 0.0,
+            peak_mb=peak_mb,
+        )
+        self.results.append(result)
+        logger.info(
+            "%-10s %-8s %10d rows %9.3fs %12.0f rows/s %s",
+            name,
+            model or "-",
+            n_rows,
+            seconds,
+            result.rows_per_sec,
+            f"{peak_mb:9.1f} MB peak" if peak_mb is not None else "",
+        )
+
+
+def run_size(bench: Benchmark, n_rows: int, args: argparse.Namespace, workdir: Path) -> None:
+    logger.info("=" * 50)
+    logger.info("Benchmarking %d rows", n_rows)
+    logger.info("=" * 50)
+
+    path = workdir / f"transactions-{n_rows}.csv"
+    generate_transactions(
+        n_rows,
+        fraud_rate=args.fraud_rate,
+        n_accounts=args.accounts,
+        random_state=args.seed,
+    ).to_csv(path, index=False)
+
+    with bench.stage("load", n_rows):
+        df = read_transactions(path, optimize_dtypes=True)
+
+    with bench.stage("features", n_rows):
+        df = add_basic_features(df, inplace=True)
+
+    with bench.stage("split", n_rows):
+        X_train, _, X_test, y_train, _, y_test = train_valid_test_split(df, target_col=TARGET_COL)
+    del df
+
+    with bench.stage("preprocess", len(X_train)):
+        preprocessor, _, _ = build_preprocessor(
+            X_train,
+            numeric_cols=NUMERIC_COLS,
+            categorical_cols=CATEGORICAL_COLS,
+            encoder=args.encoder,
+            sparse=args.sparse,
+        )
+        X_train_t = preprocessor.fit_transform(X_train, y_train)
+        X_test_t = preprocessor.transform(X_test)
+
+    for name in args.models:
+        builder = MODEL_BUILDERS[name]
+        model = (
+            builder(preprocessor, n_estimators=args.forest_trees)
+            if name == "forest"
+            else builder(preprocessor)
+        )
+        clf = model.named_steps["clf"]
+
+        with bench.stage("fit", len(X_train), name):
+            clf.fit(X_train_t, y_train)
+        with bench.stage("predict", len(X_test), name):
+            clf.predict_proba(X_test_t)
+        with bench.stage("evaluate", len(X_test), name):
+            evaluate_model(clf, X_test_t, y_test)
+
+
+def find_regressions(
+    results: list[StageResult],
+    baseline: list[dict[str, Any]],
+    tolerance: float,
+    min_seconds: float,
+) -> list[str]:
+    previous = {(r["n_rows"], r["stage"], r["model"]): r["seconds"] for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result.n_rows, result.stage, result.model))
+        if before is None:
+            continue
+        if result.seconds > before * (1 + tolerance) and result.seconds - before > min_seconds:
+            regressions.append(
+                f"{result.stage}/{result.model or '-'} @ {result.n_rows} rows: "
+                f"{before:.3f}s -> {result.seconds:.3f}s"
+            )
+    return regressions
+
+
+def main() -> int:
+    args = parse_args()
+    logger.info("Arguments: %s", vars(args))
+
+    bench = Benchmark(trace_memory=not args.no_memory)
+    with tempfile.TemporaryDirectory(prefix="fraudguard-bench-") as workdir:
+        for n_rows in args.sizes:
+            run_size(bench, n_rows, args, Path(workdir))
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps([asdict(r) for r in bench.results], indent=2))
+        logger.info("Results saved to %s", output_path)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = find_regressions(bench.results, baseline, args.tolerance, args.min_seconds)
+        for line in regressions:
+            logger.error("Regression: %s", line)
+        if regressions:
+            return 1
+        logger.info("No regressions against %s", args.baseline)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
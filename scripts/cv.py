@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from fraudguard.cv import DEFAULT_CONFIDENCE, DEFAULT_SPLITS, WINDOWS, cross_validate
+from fraudguard.data import load_raw_data
+from fraudguard.features import ENCODERS, add_basic_features
+from fraudguard.models import MODEL_BUILDERS, NATIVE_CATEGORICAL_MODELS
+from fraudguard.velocity import add_velocity_features
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time-series cross-validation of fraud models",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--data",
+        type=str,
+        default="transactions.csv",
+        help="Filename of the dataset in data/raw/",
+    )
+    parser.add_argument(
+        "--target",
+        type=str,
+        default="isFraud",
+        help="Name of the target column",
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        nargs="+",
+        choices=list(MODEL_BUILDERS),
+        default=["logreg", "forest"],
+        help="Models to cross-validate",
+    )
+    parser.add_argument(
+        "--splits",
+        type=int,
+        default=DEFAULT_SPLITS,
+        help="Number of folds",
+    )
+    parser.add_argument(
+        "--window",
+        type=str,
+        choices=WINDOWS,
+        default="expanding",
+        help="expanding: train on all the past; rolling: train on the last --train-size rows",
+    )
+    parser.add_argument(
+        "--train-size",
+        type=int,
+        default=None,
+        help="Rows in the training window (required for --window rolling)",
+    )
+    parser.add_argument(
+        "--test-size",
+        type=int,
+        default=None,
+        help="Rows in each test window (default: rows / (splits + 1))",
+    )
+    parser.add_argument(
+        "--gap",
+        type=int,
+        default=0,
+        help="Rows skipped between the training and the test window",
+    )
+    parser.add_argument(
+        "--time-col",
+        type=str,
+        default="transaction_time",
+        help="Timestamp column the rows are ordered by",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.5,
+        help="Classification threshold for precision, recall and F1",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=DEFAULT_CONFIDENCE,
+        help="Confidence level of the intervals over folds",
+    )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--velocity",
+        action="store_true",
+        help="Add per-account velocity features (rolling counts/sums, recency, z-score)",
+    )
+    parser.add_argument(
+        "--account-col",
+        type=str,
+        default="nameOrig",
+        help="Account identifier column used for velocity features",
+    )
+    parser.add_argument(
+        "--encoder",
+        type=str,
+        choices=ENCODERS,
+        default="onehot",
+        help="Encoding of categorical features",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Save per-fold metrics and the summary as JSON",
+    )
+    args = parser.parse_args()
+
+    if args.window == "rolling" and args.train_size is None:
+        parser.error("--window rolling requires --train-size")
+
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+
+    try:
+        df = load_raw_data(args.data)
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        return 1
+
+    df = add_basic_features(df, inplace=True)
+    if args.velocity:
+        df = add_velocity_features(df, account_col=args.account_col, inplace=True)
+
+    try:
+        result = cross_validate(
+            df,
+            target_col=args.target,
+            models=args.model,
+            encoders={
+                name: "ordinal" if name in NATIVE_CATEGORICAL_MODELS else args.encoder
+                for name in args.model
+            },
+            n_splits=args.splits,
+            window=args.window,
+            train_size=args.train_size,
+            test_size=args.test_size,
+            gap=args.gap,
+            time_col=args.time_col,
+            threshold=args.threshold,
+            confidence=args.confidence,
+            n_jobs=args.n_jobs,
+        )
+    except (KeyError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+    print(result)
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(result.to_dict(), indent=2))
+        logger.info("Results saved to %s", output_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
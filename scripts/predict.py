@@ -5,11 +5,19 @@ import json
 import logging
 import sys
 from pathlib import Path
+from typing import Any
 
-import joblib
-import pandas as pd
-
-from fraudguard.features import add_basic_features
+from fraudguard.compiled import try_compile
+from fraudguard.persistence import load_model, model_version, resolve_threshold
+from fraudguard.profiling import StageProfiler
+from fraudguard.scoring import (
+    DEFAULT_CHUNKSIZE,
+    ScoreCache,
+    load_velocity_store,
+    score_file,
+    score_transaction,
+)
+from fraudguard.velocity import VelocityStore
 
 MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
 
@@ -20,54 +28,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+TRANSACTION_FIELDS = ("amount", "transaction_type", "device_type", "transaction_time")
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Predict fraud probability for a single transaction",
+        description="Predict fraud probability for a single transaction or a batch file",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser.add_argument(
         "--amount",
         type=float,
-        required=True,
         help="Transaction amount",
     )
     parser.add_argument(
         "--transaction_type",
         type=str,
-        required=True,
         help="Transaction type (e.g., PAYMENT, CASH_OUT, TRANSFER)",
     )
     parser.add_argument(
         "--device_type",
         type=str,
-        required=True,
         help="Device type (e.g., mobile, web, pos-terminal)",
     )
     parser.add_argument(
         "--transaction_time",
         type=str,
-        required=True,
         help="Transaction timestamp (e.g., '2025-01-01 12:34:56')",
     )
+    parser.add_argument(
+        "--account",
+        type=str,
+        default=None,
+        help="Account identifier (required by models trained with --velocity)",
+    )
+    parser.add_argument(
+        "--history",
+        type=str,
+        default=None,
+        help="CSV/Parquet file with past transactions, for the velocity features of models "
+        "trained with --velocity",
+    )
     parser.add_argument(
         "--model",
         type=str,
         default="fraud_model.joblib",
-        help="Model filename in models/ directory",
+        help="Model filename (or artifact directory) in models/ directory",
     )
     parser.add_argument(
         "--threshold",
         type=float,
-        default=0.5,
-        help="Probability threshold for fraud classification",
+        default=None,
+        help="Probability threshold for fraud classification "
+        "(default: the threshold saved with the model, or 0.5)",
     )
     parser.add_argument(
         "--json",
         action="store_true",
         help="Output result as JSON",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--input",
+        type=str,
+        default=None,
+        help="CSV/Parquet file with transactions to score in batch mode",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="CSV/Parquet file to write batch scores to",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help="Number of rows scored per chunk in batch mode",
+    )
+    parser.add_argument(
+        "--keep-columns",
+        type=str,
+        nargs="*",
+        default=None,
+        help="Input columns copied to the batch output (e.g. transaction ids)",
+    )
+    parser.add_argument(
+        "--label-col",
+        type=str,
+        default=None,
+        help="Label column in the batch input; if set, metrics are computed while scoring",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=0,
+        help="Batch mode: cache up to this many scores by transaction fingerprint, so repeated "
+        "rows (retries, duplicate submissions) are scored once (0 disables the cache)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help="Seconds a cached score stays valid (default: until evicted)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Batch mode: record time, peak RSS and rows/sec per stage and write a JSON report here",
+    )
+    parser.add_argument(
+        "--cprofile-dir",
+        type=str,
+        default=None,
+        help="Batch mode: also run cProfile per stage and save <stage>.prof files here",
+    )
+    args = parser.parse_args()
+
+    if args.input is None:
+        missing = [f"--{name}" for name in TRANSACTION_FIELDS if getattr(args, name) is None]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+    elif args.output is None:
+        parser.error("--output is required together with --input")
+    if args.cache_size < 0:
+        parser.error("--cache-size must be >= 0")
+
+    return args
 
 
 def main() -> int:
@@ -78,20 +165,95 @@ def main() -> int:
         logger.error("Please run 'python -m scripts.train' first")
         return 1
 
-    model = joblib.load(model_path)
-    logger.info("Loaded model from %s", model_path)
+    model, metadata = load_model(model_path)
+    try:
+        velocity = load_velocity_store(model, metadata, args.history)
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        logger.error(str(e))
+        return 1
+    args.threshold = resolve_threshold(metadata, args.threshold)
+    logger.info("Loaded model from %s (threshold=%.4f)", model_path, args.threshold)
+
+    if args.input is not None:
+        return _predict_batch(model, args, version=model_version(model_path), velocity=velocity)
+    return _predict_single(model, args, velocity=velocity)
+
+
+def _predict_batch(
+    model: Any, args: argparse.Namespace, version: str, velocity: VelocityStore | None = None
+) -> int:
+    profiler = StageProfiler(
+        enabled=args.profile is not None or args.cprofile_dir is not None,
+        profile_dir=args.cprofile_dir,
+    )
+    cache = ScoreCache(maxsize=args.cache_size, ttl=args.cache_ttl) if args.cache_size else None
+    try:
+        stats = score_file(
+            model,
+            args.input,
+            args.output,
+            threshold=args.threshold,
+            chunksize=args.chunksize,
+            keep_columns=args.keep_columns,
+            label_col=args.label_col,
+            profiler=profiler,
+            cache=cache,
+            model_version=version,
+            velocity=velocity,
+        )
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        logger.error(str(e))
+        return 1
 
+    result = {"output": args.output, **stats.to_dict()}
+    if cache is not None:
+        result["cache"] = cache.stats.to_dict()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print("\n" + "=" * 40)
+        print("FraudGuard Batch Scoring Result")
+        print("=" * 40)
+        print(f"Output:            {args.output}")
+        print(f"Rows scored:       {stats.rows:,}")
+        print(f"Elapsed:           {stats.seconds:.2f}s")
+        print(f"Throughput:        {stats.rows_per_sec:,.0f} rows/sec")
+        if cache is not None:
+            cache_stats = cache.stats
+            print(f"Cache hits:        {cache_stats.hits:,} ({cache_stats.hit_rate:.1%})")
+        print("=" * 40 + "\n")
+        if stats.evaluation is not None:
+            print(stats.evaluation)
+
+    if profiler.enabled:
+        if not args.json:
+            print(profiler)
+        if args.profile:
+            profiler.write(args.profile)
+        else:
+            profiler.dump_profiles()
+
+    return 0
+
+
+def _predict_single(
+    model: Any, args: argparse.Namespace, velocity: VelocityStore | None = None
+) -> int:
     row = {
         "amount": args.amount,
         "transaction_type": args.transaction_type,
         "device_type": args.device_type,
         "transaction_time": args.transaction_time,
     }
+    if velocity is not None:
+        row[velocity.account_col] = args.account
 
-    df = pd.DataFrame([row])
-    df = add_basic_features(df)
-
-    proba = model.predict_proba(df)[:, 1][0]
+    try:
+        proba = score_transaction(try_compile(model), row, velocity=velocity)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
     pred = int(proba >= args.threshold)
 
     result = {
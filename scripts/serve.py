@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from fraudguard.persistence import load_model, resolve_threshold
+from fraudguard.scoring import load_velocity_store
+from fraudguard.serving import (
+    DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_MAX_WAIT_MS,
+    MicroBatcher,
+    ScoringServer,
+)
+
+MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)-8s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run a low-latency HTTP fraud scoring service",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="fraud_model.joblib",
+        help="Model filename (or artifact directory) in models/ directory",
+    )
+    parser.add_argument(
+        "--history",
+        type=str,
+        default=None,
+        help="CSV/Parquet file with past transactions, for the velocity features of models "
+        "trained with --velocity",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Interface to bind to",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Port to listen on",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="Probability threshold for fraud classification "
+        "(default: the threshold saved with the model, or 0.5)",
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=DEFAULT_MAX_BATCH_SIZE,
+        help="Maximum number of rows scored together in one micro-batch",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=DEFAULT_MAX_WAIT_MS,
+        help="Maximum time a request waits for others to join its micro-batch",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=5.0,
+        help="Per-request scoring timeout in seconds",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    model_path = MODELS_DIR / args.model
+    if not model_path.exists():
+        logger.error("Model not found: %s", model_path)
+        logger.error("Please run 'python -m scripts.train' first")
+        return 1
+
+    model, metadata = load_model(model_path)
+    threshold = resolve_threshold(metadata, args.threshold)
+    logger.info("Loaded model from %s (threshold=%.4f)", model_path, threshold)
+
+    try:
+        batcher = MicroBatcher.from_model(
+            model,
+            velocity=load_velocity_store(model, metadata, args.history),
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms,
+        )
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        logger.error(str(e))
+        return 1
+
+    server = ScoringServer(
+        (args.host, args.port),
+        batcher,
+        threshold=threshold,
+        timeout_sec=args.timeout,
+    )
+
+    with batcher, server:
+        logger.info(
+            "Serving on http://%s:%d (max_batch_size=%d, max_wait_ms=%.1f)",
+            args.host,
+            server.server_address[1],
+            args.max_batch_size,
+            args.max_wait_ms,
+        )
+        logger.info("Endpoints: POST /score, GET /metrics, GET /health")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Shutting down")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
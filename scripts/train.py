@@ -2,18 +2,54 @@ from __future__ import annotations
 
 import argparse
 import logging
+import pickle
 import sys
+import time
 from pathlib import Path
+from typing import Any
 
-import joblib
-
-from fraudguard.data import load_raw_data, train_valid_test_split
-from fraudguard.evaluate import evaluate_model
-from fraudguard.features import add_basic_features, build_preprocessor
-from fraudguard.models import build_forest_model, build_logreg_model
+from fraudguard.artifact import ARTIFACT_SUFFIX, export_artifact
+from fraudguard.data import (
+    DEFAULT_CHUNKSIZE,
+    SPLIT_METHODS,
+    iter_raw_data,
+    load_raw_data,
+    train_valid_test_split,
+)
+from fraudguard.evaluate import EvaluationResult, evaluate_model, evaluate_scores
+from fraudguard.features import ENCODERS, add_basic_features, build_preprocessor
+from fraudguard.incremental import DEFAULT_EPOCHS, train_incremental
+from fraudguard.models import (
+    MODEL_BUILDERS,
+    NATIVE_CATEGORICAL_MODELS,
+    fit_pipelines,
+    fit_preprocessor,
+)
+from fraudguard.persistence import save_model
+from fraudguard.profiling import StageProfiler
+from fraudguard.pruning import DEFAULT_TOLERANCE, prune_forest
+from fraudguard.sampling import SAMPLERS, downsample_pipeline
+from fraudguard.search import DEFAULT_CANDIDATES, PARAM_SAMPLERS, search_hyperparameters
+from fraudguard.thresholds import CostMatrix, optimize_threshold
+from fraudguard.velocity import add_velocity_features
 
 MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
 
+MODEL_TITLES = {
+    "logreg": "Logistic Regression",
+    "sgd": "SGD Logistic Regression",
+    "forest": "Random Forest",
+    "hgb": "HistGradientBoosting",
+}
+MODEL_CHOICES = {
+    "logreg": ["logreg"],
+    "sgd": ["sgd"],
+    "forest": ["forest"],
+    "hgb": ["hgb"],
+    "both": ["logreg", "forest"],
+    "all": ["logreg", "forest", "hgb"],
+}
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
@@ -42,9 +78,158 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--model",
         type=str,
-        choices=["logreg", "forest", "both"],
+        choices=list(MODEL_CHOICES),
         default="both",
-        help="Model type to train",
+        help="Model type to train (both: logreg + forest, all: logreg + forest + hgb)",
+    )
+    parser.add_argument(
+        "--usecols",
+        type=str,
+        nargs="*",
+        default=None,
+        help="Load only these columns from the dataset",
+    )
+    parser.add_argument(
+        "--optimize-dtypes",
+        action="store_true",
+        help="Load with compact dtypes (category, float32 for non-monetary floats, int8 target) "
+        "to reduce memory",
+    )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Cache the parsed dataset as Feather under data/cache/ and reuse it",
+    )
+    parser.add_argument(
+        "--memory-map",
+        action="store_true",
+        help="Memory-map the cached dataset: numeric columns are not copied into RAM",
+    )
+    parser.add_argument(
+        "--split",
+        type=str,
+        choices=SPLIT_METHODS,
+        default="random",
+        help="random: stratified shuffle; time: train on the past, validate and test on the "
+        "most recent transactions (by --time-col)",
+    )
+    parser.add_argument(
+        "--time-col",
+        type=str,
+        default="transaction_time",
+        help="Timestamp column used by --split time",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Train the SGD logistic regression out of core: stream the file in chunks "
+        "(scaler and vocabularies in a first pass, then partial_fit per epoch)",
+    )
+    parser.add_argument(
+        "--epochs",
+        type=int,
+        default=DEFAULT_EPOCHS,
+        help="Passes over the file in --incremental mode",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help="Rows per chunk in --incremental mode",
+    )
+    parser.add_argument(
+        "--downsample",
+        type=float,
+        default=None,
+        metavar="RATIO",
+        help="Fit on all frauds and RATIO negatives per fraud, without class weights; "
+        "probabilities are corrected back to the full negative rate",
+    )
+    parser.add_argument(
+        "--sampler",
+        type=str,
+        choices=SAMPLERS,
+        default="random",
+        help="Negatives kept by --downsample: uniform random share or imbalanced-learn "
+        "undersampler (correction is approximate for the latter)",
+    )
+    parser.add_argument(
+        "--velocity",
+        action="store_true",
+        help="Add per-account velocity features (rolling counts/sums, recency, z-score)",
+    )
+    parser.add_argument(
+        "--account-col",
+        type=str,
+        default="nameOrig",
+        help="Account identifier column used for velocity features",
+    )
+    parser.add_argument(
+        "--encoder",
+        type=str,
+        choices=ENCODERS,
+        default="onehot",
+        help="Encoding of categorical features",
+    )
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="Keep the design matrix sparse (CSR) end to end",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="Tune hyperparameters with successive halving over a process pool",
+    )
+    parser.add_argument(
+        "--search-candidates",
+        type=int,
+        default=DEFAULT_CANDIDATES,
+        help="Random configurations per model in the first halving rung",
+    )
+    parser.add_argument(
+        "--search-budget",
+        type=float,
+        default=None,
+        help="Wall-clock budget of the search in seconds",
+    )
+    parser.add_argument(
+        "--search-jobs",
+        type=int,
+        default=None,
+        help="Worker processes for the search (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Trim the best random forest to the smallest tree subset / depth cap whose "
+        "validation PR-AUC stays within --prune-tolerance",
+    )
+    parser.add_argument(
+        "--prune-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Maximum allowed drop of validation PR-AUC when pruning",
+    )
+    parser.add_argument(
+        "--fp-cost",
+        type=float,
+        default=1.0,
+        help="Cost of reviewing a false alert (used with --fn-cost)",
+    )
+    parser.add_argument(
+        "--fn-cost",
+        type=float,
+        default=None,
+        help="Loss from a missed fraud; if set, the threshold minimizes expected cost "
+        "instead of maximizing F1",
+    )
+    parser.add_argument(
+        "--max-alert-rate",
+        type=float,
+        default=None,
+        help="Alert budget: maximum share of transactions flagged as fraud",
     )
     parser.add_argument(
         "--output",
@@ -52,7 +237,159 @@ def parse_args() -> argparse.Namespace:
         default="fraud_model.joblib",
         help="Output filename for the saved model",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=["joblib", "artifact"],
+        default="joblib",
+        help="joblib: pickled pipeline; artifact: directory with a JSON manifest and "
+        f"memory-mappable NumPy arrays (saved as <output>{ARTIFACT_SUFFIX})",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Store artifact arrays in one compressed .npz (smaller, but not memory-mapped)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Record wall/CPU time, peak RSS and rows/sec per stage and write a JSON report here",
+    )
+    parser.add_argument(
+        "--cprofile-dir",
+        type=str,
+        default=None,
+        help="Also run cProfile per stage and save <stage>.prof files to this directory",
+    )
+    args = parser.parse_args()
+
+    if args.incremental and (args.velocity or args.search or args.prune):
+        parser.error("--incremental cannot be combined with --velocity, --search or --prune")
+    if args.incremental and args.split != "random":
+        parser.error("--incremental only supports --split random")
+    if args.incremental and args.encoder != "onehot":
+        parser.error("--incremental only supports --encoder onehot")
+    if args.downsample is not None and (args.incremental or args.prune):
+        parser.error("--downsample cannot be combined with --incremental or --prune")
+    if args.downsample is not None and args.downsample <= 0:
+        parser.error("--downsample must be > 0")
+
+    return args
+
+
+def format_comparison(
+    rows: list[tuple[str, float, float, float, EvaluationResult]], n_valid: int
+) -> str:
+    lines = [
+        "=" * 78,
+        f"{'Model':<22}{'Fit, s':>9}{'Predict, s':>12}{'Rows/s':>12}{'Size, MB':>10}"
+        f"{'F1':>7}{'PR-AUC':>8}",
+        "-" * 78,
+    ]
+    for name, fit_seconds, predict_seconds, size_mb, result in rows:
+        rows_per_sec = n_valid / predict_seconds if predict_seconds > 0 else 0.0
+        pr_auc = f"{result.pr_auc:.4f}" if result.pr_auc is not None else "-"
+        lines.append(
+            f"{MODEL_TITLES[name]:<22}{fit_seconds:>9.2f}{predict_seconds:>12.3f}"
+            f"{rows_per_sec:>12,.0f}{size_mb:>10.1f}{result.f1:>7.4f}{pr_auc:>8}"
+        )
+    lines.append("=" * 78)
+    return "\n".join(lines)
+
+
+def cost_matrix(args: argparse.Namespace) -> CostMatrix | None:
+    if args.fn_cost is None:
+        return None
+    return CostMatrix(false_positive=args.fp_cost, false_negative=args.fn_cost)
+
+
+def save_best_model(
+    model: Any, name: str, metadata: dict[str, Any], args: argparse.Namespace
+) -> None:
+    output = MODELS_DIR / args.output
+    if args.format == "artifact":
+        try:
+            export_artifact(
+                model,
+                output.with_suffix(ARTIFACT_SUFFIX),
+                metadata=metadata,
+                compress=args.compress,
+            )
+            return
+        except (TypeError, ValueError) as e:
+            logger.warning("Cannot export %s as an artifact, saving joblib: %s", name, e)
+    save_model(model, output, metadata=metadata)
+
+
+def report_profile(profiler: StageProfiler, args: argparse.Namespace) -> None:
+    if not profiler.enabled:
+        return
+    print(profiler)
+    if args.profile:
+        profiler.write(args.profile)
+    else:
+        profiler.dump_profiles()
+
+
+def run_incremental(args: argparse.Namespace, profiler: StageProfiler) -> int:
+    logger.info("=" * 50)
+    logger.info("Training %s out of core", MODEL_TITLES["sgd"])
+    logger.info("=" * 50)
+
+    def chunks() -> Any:
+        return iter_raw_data(
+            args.data,
+            chunksize=args.chunksize,
+            usecols=args.usecols,
+            optimize_dtypes=args.optimize_dtypes,
+        )
+
+    with profiler.stage("incremental") as call:
+        try:
+            result = train_incremental(
+                chunks, target_col=args.target, epochs=args.epochs, sparse=args.sparse
+            )
+        except (FileNotFoundError, KeyError) as e:
+            logger.error(str(e))
+            return 1
+        call.rows = result.n_train
+
+    logger.info("Evaluating %s on validation set:", MODEL_TITLES["sgd"])
+    print(evaluate_scores(result.y_valid, result.valid_scores))
+
+    costs = cost_matrix(args)
+    with profiler.stage("threshold", rows=len(result.y_valid)):
+        operating_point = optimize_threshold(
+            result.y_valid, result.valid_scores, costs=costs, max_alert_rate=args.max_alert_rate
+        )
+
+    logger.info("=" * 50)
+    logger.info("Final evaluation on TEST set")
+    logger.info("=" * 50)
+    print(evaluate_scores(result.y_test, result.test_scores, threshold=operating_point.threshold))
+
+    clf = result.model.named_steps["clf"]
+    metadata = {
+        "model": "sgd",
+        "hyperparameters": {"alpha": clf.alpha, "eta0": clf.eta0},
+        "threshold": operating_point.threshold,
+        "operating_point": operating_point.to_dict(),
+        "costs": None if costs is None else vars(costs),
+        "max_alert_rate": args.max_alert_rate,
+        "incremental": {
+            "epochs": result.epochs,
+            "chunksize": args.chunksize,
+            "train_rows": result.n_train,
+            "epoch_log_loss": result.epoch_log_loss,
+        },
+    }
+    with profiler.stage("save"):
+        save_best_model(result.model, "sgd", metadata, args)
+
+    report_profile(profiler, args)
+    logger.info("Training complete!")
+    return 0
 
 
 def main() -> int:
@@ -60,69 +397,191 @@ def main() -> int:
     logger.info("Starting training pipeline")
     logger.info("Arguments: %s", vars(args))
 
-    try:
-        df = load_raw_data(args.data)
-    except FileNotFoundError as e:
-        logger.error(str(e))
-        return 1
+    profiler = StageProfiler(
+        enabled=args.profile is not None or args.cprofile_dir is not None,
+        profile_dir=args.cprofile_dir,
+    )
 
-    df = add_basic_features(df)
+    if args.incremental:
+        return run_incremental(args, profiler)
 
-    X_train, X_valid, X_test, y_train, y_valid, y_test = train_valid_test_split(
-        df, target_col=args.target
-    )
+    with profiler.stage("load") as call:
+        try:
+            df = load_raw_data(
+                args.data,
+                usecols=args.usecols,
+                optimize_dtypes=args.optimize_dtypes,
+                cache=args.cache,
+                memory_map=args.memory_map,
+            )
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            return 1
+        call.rows = len(df)
+
+    with profiler.stage("features", rows=len(df)):
+        df = add_basic_features(df, inplace=True)
+        if args.velocity:
+            df = add_velocity_features(df, account_col=args.account_col, inplace=True)
+
+    with profiler.stage("split", rows=len(df)):
+        X_train, X_valid, X_test, y_train, y_valid, y_test = train_valid_test_split(
+            df, target_col=args.target, method=args.split, time_col=args.time_col
+        )
 
-    preprocessor, num_cols, cat_cols = build_preprocessor(X_train)
-    logger.info("Features: %d numeric, %d categorical", len(num_cols), len(cat_cols))
+    groups: dict[str, list[str]] = {}
+    for name in MODEL_CHOICES[args.model]:
+        encoder = "ordinal" if name in NATIVE_CATEGORICAL_MODELS else args.encoder
+        groups.setdefault(encoder, []).append(name)
 
     best_model = None
+    best_name = None
     best_f1 = 0.0
+    best_valid_scores = None
+    best_valid_t = None
+    params: dict[str, dict[str, Any]] = {}
+    comparison = []
 
-    if args.model in ("logreg", "both"):
-        logger.info("=" * 50)
-        logger.info("Training Logistic Regression")
-        logger.info("=" * 50)
+    for encoder, names in groups.items():
+        with profiler.stage(f"preprocess/{encoder}", rows=len(X_train) + len(X_valid)):
+            preprocessor, num_cols, cat_cols = build_preprocessor(
+                X_train, encoder=encoder, sparse=args.sparse and encoder != "ordinal"
+            )
+            logger.info("Features: %d numeric, %d categorical", len(num_cols), len(cat_cols))
 
-        logreg = build_logreg_model(preprocessor)
-        logreg.fit(X_train, y_train)
+            # All candidates of a group share the fitted preprocessor: transform each split once.
+            X_train_t = fit_preprocessor(preprocessor, X_train, y_train)
+            X_valid_t = preprocessor.transform(X_valid)
 
-        logger.info("Evaluating on validation set:")
-        result = evaluate_model(logreg, X_valid, y_valid)
-        print(result)
+        params.update({name: {} for name in names})
+        searchable = [name for name in names if name in PARAM_SAMPLERS]
+        if args.search and searchable:
+            logger.info("=" * 50)
+            logger.info("Searching hyperparameters")
+            logger.info("=" * 50)
+            with profiler.stage(f"search/{encoder}"):
+                search = search_hyperparameters(
+                    X_train_t,
+                    y_train,
+                    X_valid_t,
+                    y_valid,
+                    models=searchable,
+                    n_candidates=args.search_candidates,
+                    budget_seconds=args.search_budget,
+                    n_jobs=args.search_jobs,
+                )
+            for name in searchable:
+                best_trial = search.best(name)
+                if best_trial is not None:
+                    params[name] = best_trial.params
 
-        if result.f1 > best_f1:
-            best_f1 = result.f1
-            best_model = logreg
+        if args.downsample is None:
+            candidates = {
+                name: MODEL_BUILDERS[name](preprocessor, **params[name]) for name in names
+            }
+        else:
+            # The sample rebalances the classes: class weights would skew the correction.
+            candidates = {
+                name: downsample_pipeline(
+                    MODEL_BUILDERS[name](preprocessor, class_weight=None, **params[name]),
+                    ratio=args.downsample,
+                    sampler=args.sampler,
+                )
+                for name in names
+            }
 
-    if args.model in ("forest", "both"):
         logger.info("=" * 50)
-        logger.info("Training Random Forest")
+        logger.info("Training %s", ", ".join(MODEL_TITLES[name] for name in candidates))
         logger.info("=" * 50)
+        with profiler.stage(f"fit/{encoder}", rows=len(X_train)):
+            fit_times = fit_pipelines(
+                candidates, X_train, y_train, Xt=X_train_t, validation=(X_valid_t, y_valid)
+            )
+
+        for name, model in candidates.items():
+            logger.info("Evaluating %s on validation set:", MODEL_TITLES[name])
+            clf = model.named_steps["clf"]
+            start = time.perf_counter()
+            with profiler.stage(f"predict/{name}", rows=len(X_valid)):
+                valid_scores = clf.predict_proba(X_valid_t)[:, 1]
+            predict_seconds = time.perf_counter() - start
+            with profiler.stage(f"evaluate/{name}", rows=len(X_valid)):
+                result = evaluate_scores(y_valid, valid_scores)
+            print(result)
 
-        preprocessor_rf, _, _ = build_preprocessor(X_train)
-        forest = build_forest_model(preprocessor_rf)
-        forest.fit(X_train, y_train)
+            size_mb = len(pickle.dumps(clf, protocol=pickle.HIGHEST_PROTOCOL)) / 1024**2
+            comparison.append((name, fit_times[name], predict_seconds, size_mb, result))
 
-        logger.info("Evaluating on validation set:")
-        result = evaluate_model(forest, X_valid, y_valid)
-        print(result)
+            if result.f1 > best_f1:
+                best_f1 = result.f1
+                best_model = model
+                best_name = name
+                best_valid_scores = valid_scores
+                best_valid_t = X_valid_t
 
-        if result.f1 > best_f1:
-            best_f1 = result.f1
-            best_model = forest
+    print(format_comparison(comparison, n_valid=len(y_valid)))
+
+    pruning = None
+    if args.prune and best_name == "forest":
+        logger.info("=" * 50)
+        logger.info("Pruning %s", MODEL_TITLES[best_name])
+        logger.info("=" * 50)
+        with profiler.stage("prune", rows=len(X_valid)):
+            pruning = prune_forest(
+                best_model, X_valid, y_valid, tolerance=args.prune_tolerance, Xt=best_valid_t
+            )
+        print(pruning)
+        best_model = pruning.model
+        best_valid_scores = best_model.named_steps["clf"].predict_proba(best_valid_t)[:, 1]
+    elif args.prune and best_model is not None:
+        logger.warning("Pruning only applies to %s, keeping %s", MODEL_TITLES["forest"], best_name)
 
     if best_model is not None:
+        logger.info("=" * 50)
+        logger.info("Choosing operating threshold on validation set")
+        logger.info("=" * 50)
+        costs = cost_matrix(args)
+        with profiler.stage("threshold", rows=len(y_valid)):
+            operating_point = optimize_threshold(
+                y_valid, best_valid_scores, costs=costs, max_alert_rate=args.max_alert_rate
+            )
+
         logger.info("=" * 50)
         logger.info("Final evaluation on TEST set")
         logger.info("=" * 50)
-        test_result = evaluate_model(best_model, X_test, y_test)
+        with profiler.stage("test", rows=len(X_test)):
+            test_result = evaluate_model(
+                best_model, X_test, y_test, threshold=operating_point.threshold
+            )
         print(test_result)
 
-        MODELS_DIR.mkdir(exist_ok=True)
-        model_path = MODELS_DIR / args.output
-        joblib.dump(best_model, model_path)
-        logger.info("Model saved to %s", model_path)
+        metadata = {
+            "model": best_name,
+            "hyperparameters": params[best_name],
+            "split": args.split,
+            "threshold": operating_point.threshold,
+            "operating_point": operating_point.to_dict(),
+            "costs": None if costs is None else vars(costs),
+            "max_alert_rate": args.max_alert_rate,
+        }
+        if args.velocity:
+            # Scoring rebuilds the same features from this account column's history.
+            metadata["velocity"] = {"account_col": args.account_col}
+        if args.downsample is not None:
+            metadata["downsample"] = {
+                "ratio": args.downsample,
+                "sampler": args.sampler,
+                "negative_rate": best_model.named_steps["clf"].negative_rate_,
+            }
+        if pruning is not None:
+            metadata["pruning"] = {
+                "baseline": pruning.to_dict()["baseline"],
+                "selected": pruning.to_dict()["selected"],
+            }
+        with profiler.stage("save"):
+            save_best_model(best_model, best_name, metadata, args)
 
+    report_profile(profiler, args)
     logger.info("Training complete!")
     return 0
 
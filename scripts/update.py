@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from fraudguard.artifact import ArtifactModel
+from fraudguard.evaluate import evaluate_scores
+from fraudguard.features import add_basic_features
+from fraudguard.persistence import load_model, resolve_threshold, save_model
+from fraudguard.scoring import iter_chunks, load_velocity_store, uses_velocity_features
+from fraudguard.update import (
+    DEFAULT_EPOCHS,
+    DEFAULT_LOGREG_ETA0,
+    DEFAULT_NEW_TREES,
+    update_model,
+)
+
+MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Update a trained fraud model with new labeled transactions",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--data",
+        type=str,
+        required=True,
+        help="CSV/Parquet file with the new labeled transactions",
+    )
+    parser.add_argument(
+        "--target",
+        type=str,
+        default="isFraud",
+        help="Name of the target column",
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="fraud_model.joblib",
+        help="Model filename in models/ directory (joblib; artifacts are read-only)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Output filename for the updated model (default: overwrite --model)",
+    )
+    parser.add_argument(
+        "--history",
+        type=str,
+        default=None,
+        help="CSV/Parquet file with the transactions preceding --data (required by models "
+        "trained with --velocity)",
+    )
+    parser.add_argument(
+        "--trees",
+        type=int,
+        default=DEFAULT_NEW_TREES,
+        help="Random forest: trees grown on the new data",
+    )
+    parser.add_argument(
+        "--max-trees",
+        type=int,
+        default=None,
+        help="Random forest: keep at most this many trees, retiring the oldest",
+    )
+    parser.add_argument(
+        "--epochs",
+        type=int,
+        default=DEFAULT_EPOCHS,
+        help="Linear models: SGD passes over the new data",
+    )
+    parser.add_argument(
+        "--logreg-eta0",
+        type=float,
+        default=DEFAULT_LOGREG_ETA0,
+        help="Logistic regression: step size of the SGD updates from the current coefficients",
+    )
+    parser.add_argument(
+        "--holdout",
+        type=float,
+        default=0.2,
+        help="Share of the new data held out to compare the model before and after the update "
+        "(0 to update on all rows)",
+    )
+    return parser.parse_args()
+
+
+def holdout_split(X: pd.DataFrame, y: pd.Series, holdout: float) -> list:
+    try:
+        return train_test_split(X, y, test_size=holdout, stratify=y, random_state=42)
+    except ValueError as e:
+        # A batch with fewer than two frauds cannot be stratified.
+        logger.warning("Cannot stratify the hold-out split (%s), splitting at random", e)
+        return train_test_split(X, y, test_size=holdout, random_state=42)
+
+
+def format_metric(value: float | None) -> str:
+    return "n/a" if value is None else f"{value:.4f}"
+
+
+def main() -> int:
+    args = parse_args()
+    model_path = MODELS_DIR / args.model
+    if not model_path.exists():
+        logger.error("Model not found: %s", model_path)
+        logger.error("Please run 'python -m scripts.train' first")
+        return 1
+
+    model, metadata = load_model(model_path)
+    if isinstance(model, ArtifactModel):
+        logger.error("Artifacts are read-only: update the joblib model and export it again")
+        return 1
+    # Velocity features of a new batch alone, without the account history, would not
+    # match the ones the model was trained on.
+    if uses_velocity_features(model) and args.history is None:
+        logger.error("Model uses per-account velocity features: pass --history")
+        return 1
+    threshold = resolve_threshold(metadata)
+
+    try:
+        velocity = load_velocity_store(model, metadata, args.history)
+        df = pd.concat(iter_chunks(args.data), ignore_index=True)
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        logger.error(str(e))
+        return 1
+    if args.target not in df.columns:
+        logger.error("Target column '%s' not found in %s", args.target, args.data)
+        return 1
+    logger.info("Loaded %d new transactions from %s", len(df), args.data)
+
+    if velocity is not None:
+        try:
+            df = velocity.process_frame(df)
+        except (ValueError, KeyError) as e:
+            logger.error(str(e))
+            return 1
+    df = add_basic_features(df, inplace=True)
+    X = df.drop(columns=[args.target])
+    y = df[args.target]
+
+    X_fit, y_fit = X, y
+    X_hold = y_hold = None
+    if args.holdout > 0:
+        try:
+            X_fit, X_hold, y_fit, y_hold = holdout_split(X, y, args.holdout)
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+        before = evaluate_scores(y_hold, model.predict_proba(X_hold)[:, 1], threshold)
+
+    try:
+        result = update_model(
+            model,
+            X_fit,
+            y_fit,
+            n_trees=args.trees,
+            max_trees=args.max_trees,
+            epochs=args.epochs,
+            logreg_eta0=args.logreg_eta0,
+        )
+    except (TypeError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+
+    update = {"updated_at": datetime.now(timezone.utc).isoformat(), **result.to_dict()}
+    if X_hold is not None:
+        after = evaluate_scores(y_hold, model.predict_proba(X_hold)[:, 1], threshold)
+        print(after)
+        print(f"Hold-out PR-AUC: {format_metric(before.pr_auc)} -> {format_metric(after.pr_auc)}")
+        print(f"Hold-out F1:     {before.f1:.4f} -> {after.f1:.4f}")
+        update["holdout"] = {
+            "rows": len(y_hold),
+            "pr_auc_before": before.pr_auc,
+            "pr_auc_after": after.pr_auc,
+            "f1_before": before.f1,
+            "f1_after": after.f1,
+        }
+
+    # The operating threshold is kept: re-tune it with a full retrain on enough data.
+    metadata["updates"] = [*metadata.get("updates", []), update]
+    save_model(model, MODELS_DIR / (args.output or args.model), metadata=metadata)
+    logger.info("Update complete!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,14 @@
 """Общие фикстуры для тестов."""
 
+import numpy as np
 import pandas as pd
 import pytest
 
+from fraudguard.features import add_basic_features, build_preprocessor
+from fraudguard.models import build_logreg_model
+from fraudguard.synthetic import generate_transactions
+from fraudguard.velocity import add_velocity_features
+
 
 @pytest.fixture
 def sample_transactions():
@@ -45,3 +51,48 @@ def legit_df():
             "isFraud": [0, 0, 0],
         }
     )
+
+
+@pytest.fixture
+def account_transactions():
+    """Транзакции четырёх клиентов за два дня в произвольном порядке строк."""
+    rng = np.random.default_rng(0)
+    n = 200
+    seconds = rng.integers(0, 2 * 86400, n) // 300 * 300  # есть совпадения времени
+    return pd.DataFrame(
+        {
+            "nameOrig": rng.choice(["A", "B", "C", "D"], n),
+            "amount": rng.lognormal(5, 1, n).round(2),
+            "transaction_type": rng.choice(["PAYMENT", "CASH_OUT", "TRANSFER"], n),
+            "device_type": rng.choice(["mobile", "web"], n),
+            "transaction_time": pd.to_datetime(seconds, unit="s").strftime("%Y-%m-%d %H:%M:%S"),
+        }
+    )
+
+
+@pytest.fixture
+def velocity_model(account_transactions):
+    """Логистическая регрессия на скоростных признаках и её скоры на пакетных признаках."""
+    X = add_velocity_features(add_basic_features(account_transactions))
+    X = X.drop(columns=["nameOrig"])
+    y = (X["txn_count_1h"] > 0) & (X["amount"] > 150)
+    preprocessor, _, _ = build_preprocessor(X)
+    model = build_logreg_model(preprocessor).fit(X, y)
+    return model, model.predict_proba(X)[:, 1]
+
+
+@pytest.fixture(scope="session")
+def synthetic_features():
+    """Синтетические транзакции с базовыми признаками, общие для тестов моделей."""
+    return add_basic_features(generate_transactions(n_rows=3_000, fraud_rate=0.05, n_accounts=50))
+
+
+@pytest.fixture(scope="session")
+def fit_pipeline():
+    """Обучает пайплайн builder на препроцессоре, построенном по X."""
+
+    def fit(builder, X, y, encoder="onehot", **params):
+        preprocessor, _, _ = build_preprocessor(X, encoder=encoder)
+        return builder(preprocessor, **params).fit(X, y)
+
+    return fit
@@ -0,0 +1,155 @@
+"""Тесты для модуля artifact."""
+
+import json
+
+import numpy as np
+import pytest
+import sklearn
+
+from fraudguard.artifact import (
+    MANIFEST_NAME,
+    ArtifactModel,
+    export_artifact,
+    load_artifact,
+)
+from fraudguard.models import build_forest_model, build_hgb_model, build_logreg_model
+from fraudguard.persistence import load_model
+
+
+@pytest.fixture(scope="module")
+def dataset(synthetic_features):
+    """Синтетические транзакции с пропусками и неизвестными категориями в тесте."""
+    X = synthetic_features.drop(columns=["isFraud"])
+    y = synthetic_features["isFraud"]
+    X_test = X.iloc[2_500:].copy()
+    X_test["transaction_type"] = X_test["transaction_type"].astype(object)
+    X_test.iloc[:20, X_test.columns.get_loc("transaction_type")] = "UNSEEN"
+    return X.iloc[:2_500], y.iloc[:2_500], X_test
+
+
+class TestExportArtifact:
+    """Тесты для экспорта и загрузки артефакта."""
+
+    @pytest.mark.parametrize(
+        "builder, encoder, params",
+        [
+            (build_logreg_model, "onehot", {}),
+            (build_forest_model, "onehot", {"n_estimators": 20}),
+            (build_forest_model, "ordinal", {"n_estimators": 20, "max_depth": 6}),
+            (build_hgb_model, "ordinal", {"max_iter": 30}),
+            (build_hgb_model, "onehot", {"max_iter": 30}),
+        ],
+    )
+    def test_matches_pipeline(self, tmp_path, dataset, builder, encoder, params, fit_pipeline):
+        """Вероятности артефакта должны совпадать с исходным пайплайном."""
+        X, y, X_test = dataset
+        model = fit_pipeline(builder, X, y, encoder=encoder, **params)
+
+        artifact = load_artifact(export_artifact(model, tmp_path / "model.artifact"))
+
+        np.testing.assert_allclose(
+            artifact.predict_proba(X_test), model.predict_proba(X_test), atol=1e-12
+        )
+
+    def test_missing_values(self, tmp_path, dataset, fit_pipeline):
+        """Пропуски должны обрабатываться как в деревьях sklearn."""
+        X, y, X_test = dataset
+        X = X.copy()
+        X.iloc[::7, X.columns.get_loc("amount")] = np.nan
+        X_test = X_test.copy()
+        X_test.iloc[::3, X_test.columns.get_loc("amount")] = np.nan
+
+        for builder in (build_forest_model, build_hgb_model):
+            model = fit_pipeline(builder, X, y, encoder="ordinal")
+            artifact = load_artifact(export_artifact(model, tmp_path / builder.__name__))
+
+            np.testing.assert_allclose(
+                artifact.predict_proba(X_test), model.predict_proba(X_test), atol=1e-12
+            )
+
+    def test_memory_mapped(self, tmp_path, dataset, fit_pipeline):
+        """Массивы должны загружаться через memory map, а при сжатии — в память."""
+        X, y, _ = dataset
+        model = fit_pipeline(build_forest_model, X, y, n_estimators=5)
+
+        mapped = load_artifact(export_artifact(model, tmp_path / "mapped"))
+        compressed = load_artifact(export_artifact(model, tmp_path / "npz", compress=True))
+
+        assert isinstance(mapped.arrays["threshold"], np.memmap)
+        assert not isinstance(compressed.arrays["threshold"], np.memmap)
+        assert compressed.manifest["storage"] == "npz"
+
+    def test_manifest(self, tmp_path, dataset, fit_pipeline):
+        """Манифест должен содержать версию, признаки, порог и метаданные."""
+        X, y, _ = dataset
+        model = fit_pipeline(build_logreg_model, X, y)
+
+        path = export_artifact(model, tmp_path / "model", metadata={"threshold": 0.3})
+        manifest = json.loads((path / MANIFEST_NAME).read_text())
+
+        assert manifest["format_version"] == 1
+        assert manifest["model_type"] == "logreg"
+        assert manifest["threshold"] == 0.3
+        assert "amount" in manifest["input_columns"]
+        assert len(manifest["feature_names"]) == manifest["params"]["n_features"]
+
+    def test_single_row(self, tmp_path, dataset, fit_pipeline):
+        """Словарь с одной транзакцией должен оцениваться без DataFrame."""
+        X, y, X_test = dataset
+        model = fit_pipeline(build_logreg_model, X, y)
+        artifact = load_artifact(export_artifact(model, tmp_path / "model"))
+
+        row = X_test.iloc[25].to_dict()
+
+        assert artifact.predict_proba(row)[0, 1] == pytest.approx(
+            model.predict_proba(X_test.iloc[[25]])[0, 1]
+        )
+
+    def test_missing_column(self, tmp_path, dataset, fit_pipeline):
+        """Отсутствие входной колонки должно вызывать ValueError."""
+        X, y, X_test = dataset
+        model = fit_pipeline(build_logreg_model, X, y)
+        artifact = load_artifact(export_artifact(model, tmp_path / "model"))
+
+        with pytest.raises(ValueError, match="amount"):
+            artifact.predict_proba(X_test.drop(columns=["amount"]))
+
+    def test_unsupported_encoder(self, tmp_path, dataset, fit_pipeline):
+        """Неподдерживаемый кодировщик должен вызывать TypeError."""
+        X, y, _ = dataset
+        model = fit_pipeline(build_logreg_model, X, y, encoder="frequency")
+
+        with pytest.raises(TypeError):
+            export_artifact(model, tmp_path / "model")
+
+    def test_hgb_unverified_sklearn(self, tmp_path, dataset, monkeypatch, fit_pipeline):
+        """Экспорт HGB на непроверенной версии sklearn должен давать понятную ошибку."""
+        X, y, _ = dataset
+        model = fit_pipeline(build_hgb_model, X, y, encoder="ordinal", max_iter=5)
+        monkeypatch.setattr(sklearn, "__version__", "1.3.2")
+
+        with pytest.raises(ValueError, match="scikit-learn"):
+            export_artifact(model, tmp_path / "model")
+
+    def test_unknown_version(self, tmp_path, dataset, fit_pipeline):
+        """Артефакт другой версии формата не должен загружаться."""
+        X, y, _ = dataset
+        path = export_artifact(fit_pipeline(build_logreg_model, X, y), tmp_path / "model")
+        manifest = json.loads((path / MANIFEST_NAME).read_text())
+        manifest["format_version"] = 99
+        (path / MANIFEST_NAME).write_text(json.dumps(manifest))
+
+        with pytest.raises(ValueError, match="version"):
+            load_artifact(path)
+
+    def test_load_model(self, tmp_path, dataset, fit_pipeline):
+        """persistence.load_model должен загружать артефакт вместе с метаданными."""
+        X, y, _ = dataset
+        path = export_artifact(
+            fit_pipeline(build_logreg_model, X, y), tmp_path / "model", metadata={"threshold": 0.2}
+        )
+
+        model, metadata = load_model(path)
+
+        assert isinstance(model, ArtifactModel)
+        assert metadata["threshold"] == 0.2
@@ -0,0 +1,131 @@
+"""Тесты для модуля compiled."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fraudguard.compiled import CompiledLogReg, compile_logreg, try_compile
+from fraudguard.features import TIME_FEATURES, add_basic_features, build_preprocessor
+from fraudguard.models import build_forest_model, build_logreg_model, build_sgd_model
+
+
+@pytest.fixture
+def training_data():
+    """Обучающие данные с числовыми, категориальными и временными признаками."""
+    df = pd.DataFrame(
+        {
+            "amount": [100.0, 5000.0, 50.0, 7000.0, 200.0, 4500.0, 80.0, 9000.0],
+            "transaction_type": ["PAYMENT", "CASH_OUT", "PAYMENT", "TRANSFER"] * 2,
+            "device_type": ["mobile", "web", "atm", "web"] * 2,
+            "transaction_time": [f"2025-01-0{day} {day + 8}:15:00" for day in range(1, 9)],
+        }
+    )
+    X = add_basic_features(df)
+    y = pd.Series([0, 1, 0, 1, 0, 1, 0, 1])
+    return X, y
+
+
+@pytest.fixture
+def logreg(training_data):
+    """Обученный пайплайн логистической регрессии."""
+    X, y = training_data
+    preprocessor, _, _ = build_preprocessor(X)
+    model = build_logreg_model(preprocessor)
+    model.fit(X, y)
+    return model
+
+
+class TestCompileLogReg:
+    """Тесты для compile_logreg."""
+
+    def test_uses_all_features(self, logreg):
+        """Скомпилированная модель должна включать все признаки пайплайна."""
+        compiled = compile_logreg(logreg)
+
+        assert compiled.numeric_cols == ["amount", *TIME_FEATURES]
+        assert compiled.categorical_cols == ["transaction_type", "device_type"]
+
+    def test_parity_with_pipeline(self, logreg):
+        """Вероятности должны совпадать с predict_proba пайплайна."""
+        rows = [
+            {
+                "amount": 1234.5,
+                "transaction_type": "TRANSFER",
+                "device_type": "mobile",
+                "transaction_time": "2025-02-03 04:05:06",
+            },
+            {
+                "amount": 10.0,
+                "transaction_type": "UNKNOWN_TYPE",
+                "device_type": "web",
+                "transaction_time": "2025-02-08 23:59:00",
+            },
+        ]
+        compiled = compile_logreg(logreg)
+
+        expected = logreg.predict_proba(add_basic_features(pd.DataFrame(rows)))
+
+        np.testing.assert_allclose(compiled.predict_proba(rows), expected)
+        np.testing.assert_allclose(
+            [compiled.predict_proba_one(row) for row in rows], expected[:, 1]
+        )
+
+    def test_rejects_missing_amount(self, logreg):
+        """Пропущенная сумма должна вызывать ошибку, как в пайплайне."""
+        compiled = compile_logreg(logreg)
+        row = {
+            "transaction_type": "PAYMENT",
+            "device_type": "web",
+            "transaction_time": "2025-02-03 04:05:06",
+        }
+
+        with pytest.raises(ValueError, match="amount"):
+            compiled.predict_proba_one(row)
+        with pytest.raises(ValueError, match="amount"):
+            compiled.predict_proba([{**row, "amount": np.nan}])
+
+    def test_rejects_garbage_timestamp(self, logreg):
+        """Нераспознаваемое время должно вызывать ошибку, а не давать NaN."""
+        compiled = compile_logreg(logreg)
+        row = {
+            "amount": 100.0,
+            "transaction_type": "PAYMENT",
+            "device_type": "web",
+            "transaction_time": "not a date",
+        }
+
+        with pytest.raises(ValueError, match="transaction_time"):
+            compiled.predict_proba_one(row)
+
+    def test_accepts_dataframe(self, logreg, training_data):
+        """predict_proba должен принимать и DataFrame."""
+        X, _ = training_data
+        compiled = compile_logreg(logreg)
+
+        np.testing.assert_allclose(compiled.predict_proba(X), logreg.predict_proba(X))
+
+    def test_rejects_forest(self, training_data):
+        """Случайный лес не компилируется."""
+        X, y = training_data
+        preprocessor, _, _ = build_preprocessor(X)
+        forest = build_forest_model(preprocessor, n_estimators=5)
+        forest.fit(X, y)
+
+        with pytest.raises(TypeError, match="LogisticRegression"):
+            compile_logreg(forest)
+
+        assert try_compile(forest) is forest
+
+    def test_try_compile_logreg(self, logreg):
+        """try_compile должен компилировать логистическую регрессию."""
+        assert isinstance(try_compile(logreg), CompiledLogReg)
+
+    def test_sgd_log_loss(self, training_data):
+        """Логистическая регрессия на SGD должна компилироваться с тем же результатом."""
+        X, y = training_data
+        preprocessor, _, _ = build_preprocessor(X)
+        model = build_sgd_model(preprocessor).fit(X, y)
+
+        compiled = compile_logreg(model)
+
+        np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X))
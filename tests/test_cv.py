@@ -0,0 +1,122 @@
+"""Тесты для модуля cv."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from fraudguard.cv import (
+    CV_METRICS,
+    cross_validate,
+    read_columns,
+    summarize,
+    time_series_folds,
+    write_columns,
+)
+
+
+@pytest.fixture(scope="module")
+def dataset(synthetic_features):
+    """Синтетические транзакции, перемешанные во времени."""
+    return synthetic_features.sample(frac=1.0, random_state=0)
+
+
+class TestSummarize:
+    """Тесты для агрегации метрик по фолдам."""
+
+    def test_t_interval(self):
+        """Интервал должен строиться по распределению Стьюдента."""
+        values = [0.3, 0.4, 0.5, 0.6]
+        summary = summarize(values, confidence=0.9)
+
+        half = stats.t.ppf(0.95, 3) * np.std(values, ddof=1) / 2
+        assert summary.mean == pytest.approx(0.45)
+        assert summary.ci_low == pytest.approx(0.45 - half)
+        assert summary.ci_high == pytest.approx(0.45 + half)
+        assert summary.n_folds == 4
+
+    def test_skips_missing(self):
+        """Фолды без AUC не должны учитываться."""
+        summary = summarize([0.5, None, 0.7])
+        assert summary.n_folds == 2
+        assert summary.mean == pytest.approx(0.6)
+
+    def test_single_fold(self):
+        """Для одного фолда интервал не определён."""
+        summary = summarize([0.5])
+        assert summary.mean == 0.5
+        assert np.isnan(summary.ci_low)
+
+
+class TestTimeSeriesFolds:
+    """Тесты для построения фолдов."""
+
+    def test_expanding(self):
+        """Обучающее окно должно расти, тест — идти сразу после него."""
+        folds = time_series_folds(100, n_splits=4)
+
+        assert [f.train_start for f in folds] == [0, 0, 0, 0]
+        assert [f.n_train for f in folds] == [20, 40, 60, 80]
+        assert all(f.test_start == f.train_stop and f.n_test == 20 for f in folds)
+
+    def test_rolling_with_gap(self):
+        """Скользящее окно должно иметь фиксированный размер и отступ до теста."""
+        folds = time_series_folds(100, n_splits=3, window="rolling", train_size=30, gap=5)
+
+        assert all(f.n_train <= 30 for f in folds)
+        assert folds[-1].n_train == 30
+        assert all(f.test_start == f.train_stop + 5 for f in folds)
+
+    def test_rolling_requires_size(self):
+        """Скользящее окно без размера должно вызывать ошибку."""
+        with pytest.raises(ValueError, match="train_size"):
+            time_series_folds(100, window="rolling")
+
+
+class TestColumns:
+    """Тесты для хранения колонок в memory-mapped файлах."""
+
+    def test_roundtrip(self, tmp_path):
+        """Срез колонок должен совпадать со срезом исходного DataFrame."""
+        df = pd.DataFrame(
+            {
+                "amount": [1.5, 2.5, np.nan, 4.0],
+                "kind": ["a", None, "b", "a"],
+                "count": [1, 2, 3, 4],
+            }
+        )
+        columns = write_columns(df, tmp_path)
+        part = read_columns(columns, 1, 4)
+
+        np.testing.assert_array_equal(part["amount"], df["amount"].iloc[1:4])
+        assert part["kind"].tolist()[1:] == ["b", "a"]
+        assert pd.isna(part["kind"].iloc[0])
+        assert part["count"].tolist() == [2, 3, 4]
+
+
+class TestCrossValidate:
+    """Тесты для cross_validate."""
+
+    def test_folds_and_summary(self, dataset):
+        """Каждая модель должна оцениваться на каждом фолде."""
+        result = cross_validate(
+            dataset,
+            models=["logreg", "hgb"],
+            encoders={"hgb": "ordinal"},
+            params={"hgb": {"max_iter": 20}},
+            n_splits=3,
+            n_jobs=2,
+        )
+
+        assert len(result.folds) == 6
+        assert result.models == ["logreg", "hgb"]
+        summary = result.summary("logreg")
+        assert set(summary) == set(CV_METRICS)
+        assert summary["roc_auc"].ci_low <= summary["roc_auc"].mean <= summary["roc_auc"].ci_high
+        assert "Time-series CV" in str(result)
+        assert len(result.to_dict()["folds"]) == 6
+
+    def test_unknown_model(self, dataset):
+        """Неизвестная модель должна вызывать ошибку."""
+        with pytest.raises(ValueError, match="Unknown models"):
+            cross_validate(dataset, models=["svm"])
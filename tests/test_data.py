@@ -1,9 +1,177 @@
 """Тесты для модуля data."""
 
+import numpy as np
 import pandas as pd
 import pytest
+from sklearn.model_selection import train_test_split
 
-from fraudguard.data import train_valid_test_split
+import fraudguard.data as data_module
+from fraudguard.data import (
+    infer_compact_dtypes,
+    iter_raw_data,
+    load_raw_data,
+    split_indices,
+    time_split_indices,
+    train_valid_test_split,
+)
+
+
+@pytest.fixture
+def raw_csv(tmp_path, monkeypatch):
+    """Сохраняет CSV в data/raw/ временной директории."""
+    monkeypatch.setattr(data_module, "DATA_DIR", tmp_path)
+    (tmp_path / "raw").mkdir()
+    df = pd.DataFrame(
+        {
+            "amount": [100.5, 200.25, 300.0, 400.75] * 5,
+            "type": ["PAYMENT", "CASH_OUT"] * 10,
+            "nameOrig": [f"C{i}" for i in range(20)],
+            "isFraud": [0, 0, 0, 1] * 5,
+        }
+    )
+    df.to_csv(tmp_path / "raw" / "transactions.csv", index=False)
+    return df
+
+
+class TestLoadRawData:
+    """Тесты для load_raw_data и iter_raw_data."""
+
+    def test_loads_csv(self, raw_csv):
+        """Без опций файл должен читаться целиком с исходными типами."""
+        df = load_raw_data()
+
+        pd.testing.assert_frame_equal(df, raw_csv)
+
+    def test_raises_on_missing_file(self, raw_csv):
+        """Отсутствующий файл должен приводить к FileNotFoundError."""
+        with pytest.raises(FileNotFoundError, match="not found"):
+            load_raw_data("missing.csv")
+
+    def test_optimize_dtypes(self, raw_csv):
+        """Оптимизация должна выбирать компактные типы."""
+        df = load_raw_data(optimize_dtypes=True)
+
+        assert df["amount"].dtype == "float64"
+        assert df["type"].dtype == "category"
+        assert df["nameOrig"].dtype == object
+        assert df["isFraud"].dtype == "int8"
+        assert df["isFraud"].tolist() == raw_csv["isFraud"].tolist()
+
+    def test_missing_target_after_sample(self, raw_csv, tmp_path, monkeypatch):
+        """Пропуск в метке за пределами выборки не должен ломать загрузку."""
+        monkeypatch.setattr(data_module, "DTYPE_SAMPLE_ROWS", 5)
+        df = raw_csv.astype({"isFraud": "Int64"})
+        df.loc[15, "isFraud"] = pd.NA
+        df.to_csv(tmp_path / "raw" / "transactions.csv", index=False)
+
+        loaded = load_raw_data(optimize_dtypes=True)
+
+        assert loaded["isFraud"].isna().sum() == 1
+        assert loaded["isFraud"].sum() == df["isFraud"].sum()
+
+    def test_usecols_and_explicit_dtype(self, raw_csv):
+        """usecols и явные dtype должны применяться при чтении."""
+        df = load_raw_data(usecols=["amount", "type"], dtype={"amount": "float64"})
+
+        assert list(df.columns) == ["amount", "type"]
+        assert df["amount"].dtype == "float64"
+
+    def test_iter_raw_data_chunks(self, raw_csv):
+        """Итератор должен отдавать файл кусками заданного размера."""
+        chunks = list(iter_raw_data(chunksize=8, optimize_dtypes=True))
+
+        assert [len(chunk) for chunk in chunks] == [8, 8, 4]
+        assert all(chunk["amount"].dtype == "float64" for chunk in chunks)
+        # Per-chunk categories would not match between chunks.
+        assert all(chunk["type"].dtype == object for chunk in chunks)
+        assert sum(chunk["isFraud"].sum() for chunk in chunks) == raw_csv["isFraud"].sum()
+
+
+class TestRawDataCache:
+    """Тесты для кэша сырых данных."""
+
+    @pytest.fixture(autouse=True)
+    def _require_pyarrow(self):
+        pytest.importorskip("pyarrow")
+
+    def test_creates_and_reuses_cache(self, raw_csv, tmp_path):
+        """Первый запуск создаёт кэш, повторный читает из него."""
+        first = load_raw_data(cache=True, optimize_dtypes=True)
+        cache_files = list((tmp_path / "cache").glob("*.feather"))
+
+        second = load_raw_data(cache=True, optimize_dtypes=True, memory_map=True)
+
+        assert len(cache_files) == 1
+        pd.testing.assert_frame_equal(first, second)
+        assert second["type"].dtype == "category"
+
+    def test_invalidates_on_source_change(self, raw_csv, tmp_path):
+        """Изменение исходного файла должно инвалидировать кэш."""
+        load_raw_data(cache=True)
+        old_cache = next((tmp_path / "cache").glob("*.feather"))
+
+        raw_csv.head(3).to_csv(tmp_path / "raw" / "transactions.csv", index=False)
+        df = load_raw_data(cache=True)
+
+        assert len(df) == 3
+        assert not old_cache.exists()
+        assert len(list((tmp_path / "cache").glob("*.feather"))) == 1
+
+    def test_keeps_caches_with_other_options(self, raw_csv, tmp_path):
+        """Кэши того же файла с другими параметрами чтения должны сохраняться."""
+        load_raw_data(cache=True)
+        load_raw_data(cache=True, optimize_dtypes=True)
+
+        assert len(list((tmp_path / "cache").glob("*.feather"))) == 2
+
+    def test_same_name_in_other_directory(self, raw_csv, tmp_path):
+        """Кэши одноимённых файлов из разных директорий не должны удалять друг друга."""
+        (tmp_path / "raw" / "archive").mkdir()
+        raw_csv.head(3).to_csv(tmp_path / "raw" / "archive" / "transactions.csv", index=False)
+
+        load_raw_data(cache=True)
+        archived = load_raw_data("archive/transactions.csv", cache=True)
+        cache_files = set((tmp_path / "cache").glob("*.feather"))
+        current = load_raw_data(cache=True)
+
+        assert len(archived) == 3
+        assert len(current) == len(raw_csv)
+        assert len(cache_files) == 2
+        assert set((tmp_path / "cache").glob("*.feather")) == cache_files
+
+    def test_memory_map_without_copy(self, raw_csv, tmp_path):
+        """При memory_map числовые колонки должны ссылаться на файл, а не копироваться."""
+        load_raw_data(cache=True)
+        df = load_raw_data(cache=True, memory_map=True)
+
+        copied = load_raw_data(cache=True)
+
+        assert not df["amount"].to_numpy().flags.writeable
+        assert copied["amount"].to_numpy().flags.writeable
+        pd.testing.assert_frame_equal(df, copied)
+
+
+class TestInferCompactDtypes:
+    """Тесты для infer_compact_dtypes."""
+
+    def test_high_cardinality_stays_object(self):
+        """Колонки с почти уникальными значениями не должны становиться category."""
+        sample = pd.DataFrame({"id": ["a", "b", "c", "d"], "kind": ["x", "x", "x", "y"]})
+
+        dtypes = infer_compact_dtypes(sample)
+
+        assert "id" not in dtypes
+        assert dtypes["kind"] == "category"
+
+    def test_monetary_columns_keep_precision(self):
+        """Денежные колонки должны оставаться float64, остальные float сжиматься."""
+        sample = pd.DataFrame({"amount": [16_777_217.01], "score": [0.5], "isFraud": [0]})
+
+        dtypes = infer_compact_dtypes(sample)
+
+        assert "amount" not in dtypes
+        assert dtypes["score"] == "float32"
+        assert "isFraud" not in dtypes
 
 
 class TestTrainValidTestSplit:
@@ -74,3 +242,83 @@ class TestTrainValidTestSplit:
         X_train2, _, _, _, _, _ = result2
 
         pd.testing.assert_frame_equal(X_train1, X_train2)
+
+    def test_matches_frame_split(self, sample_df):
+        """Разбиение по индексам должно совпадать с разбиением самого DataFrame."""
+        X = sample_df.drop(columns=["is_fraud"])
+        y = sample_df["is_fraud"]
+        X_temp, X_test, y_temp, _ = train_test_split(
+            X, y, test_size=0.2, stratify=y, random_state=42
+        )
+        X_train, X_valid, _, _ = train_test_split(
+            X_temp, y_temp, test_size=0.25 / 0.8, stratify=y_temp, random_state=42
+        )
+
+        result = train_valid_test_split(sample_df, target_col="is_fraud")
+
+        pd.testing.assert_frame_equal(result[0], X_train)
+        pd.testing.assert_frame_equal(result[1], X_valid)
+        pd.testing.assert_frame_equal(result[2], X_test)
+
+    def test_unknown_method(self, sample_df):
+        """Неизвестный способ разбиения должен вызывать ошибку."""
+        with pytest.raises(ValueError, match="Unknown split method"):
+            train_valid_test_split(sample_df, target_col="is_fraud", method="kfold")
+
+
+class TestSplitIndices:
+    """Тесты для split_indices."""
+
+    def test_partition(self):
+        """Индексы выборок не должны пересекаться и должны покрывать все строки."""
+        y = np.array([0] * 90 + [1] * 10)
+        train, valid, test = split_indices(y)
+
+        rows = np.concatenate([train, valid, test])
+        assert len(rows) == len(y)
+        assert set(rows) == set(range(len(y)))
+        assert y[test].sum() == 2
+
+
+class TestTimeSplit:
+    """Тесты для разбиения по времени."""
+
+    @pytest.fixture
+    def timed_df(self):
+        """DataFrame с перемешанными по времени транзакциями."""
+        rng = np.random.default_rng(0)
+        times = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.permutation(100), unit="h")
+        return pd.DataFrame(
+            {
+                "transaction_time": times.astype(str),
+                "amount": rng.random(100),
+                "is_fraud": [0] * 90 + [1] * 10,
+            }
+        )
+
+    def test_past_before_future(self, timed_df):
+        """Обучение должно идти на прошлом, тест — на самых поздних транзакциях."""
+        X_train, X_valid, X_test, y_train, _, _ = train_valid_test_split(
+            timed_df, target_col="is_fraud", method="time"
+        )
+
+        assert (len(X_train), len(X_valid), len(X_test)) == (55, 25, 20)
+        assert X_train["transaction_time"].max() < X_valid["transaction_time"].min()
+        assert X_valid["transaction_time"].max() < X_test["transaction_time"].min()
+        assert y_train.index.equals(X_train.index)
+
+    def test_missing_timestamps_in_train(self):
+        """Строки без времени должны попадать в обучающую выборку."""
+        times = pd.Series(["2025-01-03", None, "2025-01-01", "2025-01-02", "bad"])
+        train, valid, test = time_split_indices(times, test_size=0.2, valid_size=0.2)
+
+        assert set(train) == {1, 4, 2}
+        assert list(valid) == [3]
+        assert list(test) == [0]
+
+    def test_missing_time_column(self, timed_df):
+        """Отсутствие колонки времени должно вызывать KeyError."""
+        with pytest.raises(KeyError, match="Time column"):
+            train_valid_test_split(
+                timed_df.drop(columns=["transaction_time"]), target_col="is_fraud", method="time"
+            )
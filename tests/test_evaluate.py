@@ -2,8 +2,24 @@
 
 import numpy as np
 import pandas as pd
+import pytest
+from sklearn.metrics import (
+    average_precision_score,
+    classification_report,
+    confusion_matrix,
+    f1_score,
+    precision_score,
+    recall_score,
+    roc_auc_score,
+)
 
-from fraudguard.evaluate import EvaluationResult, evaluate_model
+from fraudguard.evaluate import (
+    EvaluationResult,
+    StreamingEvaluator,
+    evaluate_model,
+    format_classification_report,
+    score_curve,
+)
 
 
 class MockModel:
@@ -78,6 +94,188 @@ class TestEvaluateModel:
         assert 0 <= result.roc_auc <= 1
         assert 0 <= result.pr_auc <= 1
 
+    def test_predicts_once(self):
+        """Модель с predict_proba должна вызываться за один проход без predict."""
+
+        class CountingModel(MockModel):
+            calls = 0
+
+            def predict(self, X):
+                raise AssertionError("predict не должен вызываться")
+
+            def predict_proba(self, X):
+                CountingModel.calls += 1
+                return super().predict_proba(X)
+
+        model = CountingModel(None, np.array([0.1, 0.7, 0.4, 0.9]))
+        evaluate_model(model, pd.DataFrame({"x": range(4)}), pd.Series([0, 1, 0, 1]))
+
+        assert CountingModel.calls == 1
+
+    def test_threshold_applied(self):
+        """Жёсткие метки должны определяться порогом по вероятностям."""
+        y_true = pd.Series([0, 0, 1, 1])
+        model = MockModel(None, np.array([0.1, 0.35, 0.3, 0.9]))
+
+        strict = evaluate_model(model, pd.DataFrame({"x": range(4)}), y_true, threshold=0.5)
+        loose = evaluate_model(model, pd.DataFrame({"x": range(4)}), y_true, threshold=0.3)
+
+        assert strict.recall == 0.5
+        assert loose.recall == 1.0
+        assert loose.confusion_matrix.tolist() == [[1, 1], [0, 2]]
+
+    @pytest.mark.parametrize("threshold", [0.05, 0.3, 0.5, 0.9])
+    def test_matches_sklearn(self, threshold):
+        """Метрики должны совпадать с sklearn на случайных данных с совпадающими оценками."""
+        rng = np.random.default_rng(0)
+        y_true = pd.Series(rng.random(5_000) < 0.05).astype(int)
+        proba = np.round(np.clip(rng.normal(0.2 + 0.4 * y_true, 0.2), 0, 1), 2)
+        y_pred = (proba >= threshold).astype(int)
+
+        result = evaluate_model(
+            MockModel(None, proba), pd.DataFrame({"x": range(5_000)}), y_true, threshold
+        )
+
+        np.testing.assert_array_equal(result.confusion_matrix, confusion_matrix(y_true, y_pred))
+        assert result.precision == pytest.approx(precision_score(y_true, y_pred, zero_division=0))
+        assert result.recall == pytest.approx(recall_score(y_true, y_pred))
+        assert result.f1 == pytest.approx(f1_score(y_true, y_pred))
+        assert result.roc_auc == pytest.approx(roc_auc_score(y_true, proba))
+        assert result.pr_auc == pytest.approx(average_precision_score(y_true, proba))
+        assert result.classification_report == classification_report(
+            y_true, y_pred, digits=4, zero_division=0
+        )
+
+    def test_single_class(self):
+        """Для одного класса в y_true AUC должны быть None, а отчёт совпадать со sklearn."""
+        y_true = pd.Series([0, 0, 0])
+        model = MockModel(None, np.array([0.1, 0.2, 0.3]))
+
+        result = evaluate_model(model, pd.DataFrame({"x": range(3)}), y_true)
+
+        assert result.roc_auc is None
+        assert result.confusion_matrix.tolist() == [[3]]
+        assert result.classification_report == classification_report(
+            y_true, [0, 0, 0], digits=4, zero_division=0
+        )
+
+    def test_model_without_proba(self):
+        """Модель без predict_proba должна оцениваться по predict и decision_function."""
+
+        class MarginModel:
+            def predict(self, X):
+                return np.array([0, 1, 0, 1])
+
+            def decision_function(self, X):
+                return np.array([-2.0, 1.0, -0.5, 3.0])
+
+        result = evaluate_model(MarginModel(), pd.DataFrame({"x": range(4)}), [0, 1, 0, 1])
+
+        assert result.f1 == 1.0
+        assert result.roc_auc == 1.0
+
+
+class TestScoreCurve:
+    """Тесты для score_curve."""
+
+    def test_counts_at_threshold(self):
+        """Счётчики на пороге должны соответствовать правилу score >= threshold."""
+        curve = score_curve([0, 1, 1, 0, 1], [0.1, 0.4, 0.8, 0.4, 0.9])
+
+        assert curve.counts_at(0.4) == (3, 1, 0, 1)
+        assert curve.counts_at(0.85) == (1, 0, 2, 2)
+        assert curve.counts_at(0.95) == (0, 0, 3, 2)
+        assert curve.counts_at(0.0) == (3, 2, 0, 0)
+
+    def test_ties_collapsed(self):
+        """Одинаковые оценки должны давать одну точку кривой."""
+        curve = score_curve([0, 1, 1, 0], [0.5, 0.5, 0.5, 0.2])
+
+        np.testing.assert_array_equal(curve.thresholds, [0.5, 0.2])
+        np.testing.assert_array_equal(curve.tps, [2, 2])
+        np.testing.assert_array_equal(curve.fps, [1, 2])
+
+    def test_length_mismatch(self):
+        """Разная длина меток и оценок должна вызывать ошибку."""
+        with pytest.raises(ValueError):
+            score_curve([0, 1], [0.5])
+
+
+class TestStreamingEvaluator:
+    """Тесты для StreamingEvaluator."""
+
+    @pytest.fixture
+    def scores(self):
+        """Метки и вероятности для потоковой оценки."""
+        rng = np.random.default_rng(1)
+        y_true = (rng.random(20_000) < 0.05).astype(int)
+        y_score = np.clip(rng.normal(0.3 + 0.3 * y_true, 0.15), 0, 1)
+        return y_true, y_score
+
+    def test_matches_in_memory_evaluation(self, scores):
+        """Потоковая оценка по кускам должна совпадать с оценкой в памяти."""
+        y_true, y_score = scores
+        evaluator = StreamingEvaluator(threshold=0.4)
+        for start in range(0, len(y_true), 3_000):
+            evaluator.update(y_true[start : start + 3_000], y_score[start : start + 3_000])
+
+        streamed = evaluator.result()
+        exact = evaluate_model(
+            MockModel(None, y_score), pd.DataFrame({"x": y_score}), y_true, threshold=0.4
+        )
+
+        np.testing.assert_array_equal(streamed.confusion_matrix, exact.confusion_matrix)
+        assert streamed.f1 == exact.f1
+        assert streamed.classification_report == exact.classification_report
+        assert streamed.roc_auc == pytest.approx(exact.roc_auc, abs=1e-3)
+        assert streamed.pr_auc == pytest.approx(exact.pr_auc, abs=1e-3)
+        assert evaluator.n_rows == len(y_true)
+
+    def test_merge(self, scores):
+        """Слияние частичных результатов должно давать тот же результат, что и один проход."""
+        y_true, y_score = scores
+        whole = StreamingEvaluator().update(y_true, y_score)
+        left = StreamingEvaluator().update(y_true[:7_000], y_score[:7_000])
+        right = StreamingEvaluator().update(y_true[7_000:], y_score[7_000:])
+
+        merged = left.merge(right).result()
+
+        np.testing.assert_array_equal(merged.confusion_matrix, whole.result().confusion_matrix)
+        assert merged.roc_auc == whole.result().roc_auc
+
+    def test_merge_incompatible(self):
+        """Нельзя сливать оценщики с разными настройками."""
+        with pytest.raises(ValueError):
+            StreamingEvaluator(threshold=0.5).merge(StreamingEvaluator(threshold=0.3))
+
+    def test_bounded_memory(self, scores):
+        """Размер гистограмм не должен зависеть от числа строк."""
+        y_true, y_score = scores
+        evaluator = StreamingEvaluator(n_bins=100).update(y_true, y_score)
+
+        assert evaluator.pos_hist.shape == (100,)
+        assert evaluator.pos_hist.sum() + evaluator.neg_hist.sum() == len(y_true)
+
+    def test_empty(self):
+        """Пустой оценщик не должен падать при построении результата."""
+        result = StreamingEvaluator().result()
+
+        assert result.roc_auc is None
+        assert result.f1 == 0.0
+
+
+class TestFormatClassificationReport:
+    """Тесты для format_classification_report."""
+
+    def test_zero_predictions(self):
+        """Отчёт без положительных предсказаний должен совпадать со sklearn."""
+        y_true = [0, 0, 1, 1, 0]
+        y_pred = [0, 0, 0, 0, 0]
+
+        assert format_classification_report(0, 0, 2, 3) == classification_report(
+            y_true, y_pred, digits=4, zero_division=0
+        )
+
 
 class TestEvaluationResult:
     """Тесты для EvaluationResult."""
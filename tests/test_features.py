@@ -1,10 +1,22 @@
 """Тесты для модуля features."""
 
+import numpy as np
 import pandas as pd
 import pytest
+import scipy.sparse as sp
 from sklearn.compose import ColumnTransformer
 
-from fraudguard.features import add_basic_features, build_preprocessor
+from fraudguard.features import (
+    ENCODERS,
+    MAX_ORDINAL_CATEGORIES,
+    TIME_FEATURES,
+    FrequencyEncoder,
+    HashingEncoder,
+    add_basic_features,
+    build_preprocessor,
+    extract_time_features,
+    parse_timestamps,
+)
 
 
 class TestAddBasicFeatures:
@@ -41,6 +53,45 @@ class TestAddBasicFeatures:
         assert result["hour"].iloc[0] == 14
         assert result["dayofweek"].iloc[0] == 2  # Среда
 
+    def test_adds_rich_time_features(self):
+        """Должны добавляться is_weekend и циклические кодировки времени."""
+        df = pd.DataFrame({"transaction_time": ["2025-01-18 06:00:00", "2025-01-15 18:00:00"]})
+
+        result = add_basic_features(df)
+
+        assert set(TIME_FEATURES).issubset(result.columns)
+        assert result["is_weekend"].tolist() == [1, 0]  # суббота, среда
+        assert result["hour_sin"].iloc[0] == pytest.approx(1.0)
+        assert result["hour_cos"].iloc[1] == pytest.approx(0.0, abs=1e-12)
+
+    def test_inplace_mode(self):
+        """В режиме inplace DataFrame должен изменяться без копирования."""
+        df = pd.DataFrame({"transaction_time": ["2025-01-15 14:30:00"]})
+
+        result = add_basic_features(df, inplace=True)
+
+        assert result is df
+        assert "hour" in df.columns
+
+    def test_unparseable_time_gives_nan(self):
+        """Некорректное время должно давать NaN, а не ошибку."""
+        df = pd.DataFrame({"transaction_time": ["not a date", "2025-01-15 14:30:00", None]})
+
+        result = add_basic_features(df)
+
+        assert result["hour"].isna().tolist() == [True, False, True]
+        assert result["is_weekend"].isna().tolist() == [True, False, True]
+
+    def test_matches_row_level_features(self):
+        """Векторные признаки должны совпадать с extract_time_features."""
+        values = ["2025-01-18 06:00:00", "2025-03-02T23:15:00"]
+        result = add_basic_features(pd.DataFrame({"transaction_time": values}))
+
+        for i, value in enumerate(values):
+            expected = extract_time_features(value)
+            for name in TIME_FEATURES:
+                assert result[name].iloc[i] == pytest.approx(expected[name])
+
     def test_handles_missing_transaction_time(self):
         """Без transaction_time функция должна работать без ошибок."""
         df = pd.DataFrame(
@@ -56,6 +107,35 @@ class TestAddBasicFeatures:
         assert "dayofweek" not in result.columns
 
 
+class TestParseTimestamps:
+    """Тесты для parse_timestamps."""
+
+    def test_repeated_values(self):
+        """Повторяющиеся значения должны разбираться корректно и сохранять индекс."""
+        values = pd.Series(["2025-01-15 14:30:00", "2025-01-16 08:00:00"] * 3, index=range(10, 16))
+
+        parsed = parse_timestamps(values)
+
+        assert parsed.index.tolist() == list(range(10, 16))
+        assert parsed.dt.hour.tolist() == [14, 8] * 3
+
+    def test_mixed_formats_fall_back(self):
+        """Значения не в ISO-формате должны разбираться запасным путём."""
+        values = pd.Series(["2025-01-15 14:30:00", "01/16/2025 08:00"])
+
+        parsed = parse_timestamps(values)
+
+        assert parsed.dt.day.tolist() == [15, 16]
+
+    def test_explicit_format(self):
+        """Явный формат должен использоваться для разбора."""
+        values = pd.Series(["15.01.2025 14:30"])
+
+        parsed = parse_timestamps(values, time_format="%d.%m.%Y %H:%M")
+
+        assert parsed.iloc[0] == pd.Timestamp("2025-01-15 14:30")
+
+
 class TestBuildPreprocessor:
     """Тесты для build_preprocessor."""
 
@@ -111,3 +191,84 @@ class TestBuildPreprocessor:
 
         assert result is not None
         assert result.shape[0] == len(sample_df)
+
+
+class TestEncoders:
+    """Тесты для альтернативных кодировщиков категорий."""
+
+    @pytest.fixture
+    def sample_df(self):
+        """DataFrame с категориальными признаками."""
+        return pd.DataFrame(
+            {
+                "amount": [100.0, 250.5, 300.0, 50.0],
+                "type": ["PAYMENT", "PAYMENT", "TRANSFER", "PAYMENT"],
+                "device": ["web", "mobile", "web", "atm"],
+            }
+        )
+
+    @pytest.mark.parametrize("encoder", ENCODERS)
+    def test_every_encoder_transforms(self, sample_df, encoder):
+        """Каждый кодировщик должен работать внутри препроцессора."""
+        df = pd.concat([sample_df] * 3, ignore_index=True)  # TargetEncoder нужна кросс-валидация
+        preprocessor, _, _ = build_preprocessor(df, encoder=encoder)
+
+        result = preprocessor.fit_transform(df, [0, 1] * 6)
+
+        assert result.shape[0] == len(df)
+
+    def test_sparse_onehot_output(self, sample_df):
+        """В sparse-режиме препроцессор должен возвращать разреженную матрицу."""
+        preprocessor, _, _ = build_preprocessor(sample_df, sparse=True)
+
+        result = preprocessor.fit_transform(sample_df)
+
+        assert sp.issparse(result)
+        assert result.shape == (4, 1 + 2 + 3)
+
+    def test_unknown_encoder_raises(self, sample_df):
+        """Неизвестный кодировщик должен приводить к ValueError."""
+        with pytest.raises(ValueError, match="Unknown encoder"):
+            build_preprocessor(sample_df, encoder="magic")
+
+    def test_frequency_encoder(self, sample_df):
+        """Частотный кодировщик возвращает долю категории, 0 для неизвестных."""
+        encoder = FrequencyEncoder().fit(sample_df[["type"]])
+
+        result = encoder.transform(pd.DataFrame({"type": ["PAYMENT", "TRANSFER", "DEBIT"]}))
+
+        np.testing.assert_allclose(result[:, 0], [0.75, 0.25, 0.0])
+
+    def test_hashing_encoder(self, sample_df):
+        """Хэширующий кодировщик даёт разреженную матрицу фиксированной ширины."""
+        encoder = HashingEncoder(n_features=32).fit(sample_df[["type", "device"]])
+
+        result = encoder.transform(sample_df[["type", "device"]])
+
+        assert sp.issparse(result)
+        assert result.shape == (4, 32)
+        assert (abs(result).sum(axis=1) == 2).all()
+
+    def test_ordinal_encoder(self, sample_df):
+        """Порядковый кодировщик даёт один столбец на признак и NaN для неизвестных."""
+        preprocessor, _, _ = build_preprocessor(
+            sample_df, numeric_cols=["amount"], categorical_cols=["type"], encoder="ordinal"
+        )
+        preprocessor.fit(sample_df)
+
+        result = preprocessor.transform(
+            pd.DataFrame({"amount": [1.0, 2.0], "type": ["TRANSFER", "DEBIT"]})
+        )
+
+        assert result.shape == (2, 2)
+        assert result[0, 1] == 1.0
+        assert np.isnan(result[1, 1])
+
+    def test_ordinal_encoder_limits_cardinality(self):
+        """Число порядковых кодов должно ограничиваться MAX_ORDINAL_CATEGORIES."""
+        df = pd.DataFrame({"account": [f"C{i}" for i in range(400)] * 2})
+        preprocessor, _, _ = build_preprocessor(df, numeric_cols=[], encoder="ordinal")
+
+        result = preprocessor.fit_transform(df)
+
+        assert np.nanmax(result) < MAX_ORDINAL_CATEGORIES
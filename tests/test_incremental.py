@@ -0,0 +1,118 @@
+"""Тесты для модуля incremental."""
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from fraudguard.artifact import export_artifact, load_artifact
+from fraudguard.features import add_basic_features
+from fraudguard.incremental import (
+    SPLIT_TEST,
+    SPLIT_TRAIN,
+    SPLIT_VALID,
+    StreamingPreprocessor,
+    balanced_class_weight,
+    split_rows,
+    train_incremental,
+)
+from fraudguard.synthetic import generate_transactions
+
+CHUNKSIZE = 1_000
+
+
+@pytest.fixture(scope="module")
+def transactions():
+    """Синтетические транзакции."""
+    return generate_transactions(n_rows=4_000, fraud_rate=0.05, n_accounts=50)
+
+
+def _chunks(df):
+    return lambda: (df.iloc[i : i + CHUNKSIZE] for i in range(0, len(df), CHUNKSIZE))
+
+
+class TestStreamingPreprocessor:
+    """Тесты для StreamingPreprocessor."""
+
+    def test_matches_full_fit(self, transactions):
+        """Статистики, накопленные по чанкам, должны совпадать с обучением на всём наборе."""
+        X = add_basic_features(transactions.drop(columns=["isFraud"]))
+        streaming = StreamingPreprocessor()
+        for start in range(0, len(X), CHUNKSIZE):
+            streaming.partial_fit(X.iloc[start : start + CHUNKSIZE])
+
+        preprocessor = streaming.to_preprocessor()
+
+        scaler = StandardScaler().fit(X[streaming.numeric_cols])
+        fitted = preprocessor.named_transformers_["num"]
+        np.testing.assert_allclose(fitted.mean_, scaler.mean_)
+        np.testing.assert_allclose(fitted.scale_, scaler.scale_)
+        categories = preprocessor.named_transformers_["cat"].categories_
+        for col, values in zip(streaming.categorical_cols, categories, strict=True):
+            assert set(values) == set(X[col].dropna())
+        assert preprocessor.transform(X).shape[0] == len(X)
+
+    def test_empty(self):
+        """Без данных препроцессор не должен собираться."""
+        with pytest.raises(ValueError):
+            StreamingPreprocessor().to_preprocessor()
+
+
+class TestSplitRows:
+    """Тесты для split_rows."""
+
+    def test_deterministic(self):
+        """Разбиение чанка должно повторяться между проходами по файлу."""
+        first = split_rows(10_000, chunk_index=3)
+        second = split_rows(10_000, chunk_index=3)
+
+        np.testing.assert_array_equal(first, second)
+        assert np.mean(first == SPLIT_TEST) == pytest.approx(0.2, abs=0.02)
+        assert np.mean(first == SPLIT_VALID) == pytest.approx(0.25, abs=0.02)
+        assert np.mean(first == SPLIT_TRAIN) == pytest.approx(0.55, abs=0.02)
+
+
+class TestTrainIncremental:
+    """Тесты для train_incremental."""
+
+    def test_trains_and_holds_out(self, transactions):
+        """Модель должна обучаться по чанкам и оцениваться на отложенных строках."""
+        result = train_incremental(_chunks(transactions), epochs=2)
+
+        assert result.n_train + len(result.y_valid) + len(result.y_test) == len(transactions)
+        assert len(result.valid_scores) == len(result.y_valid)
+        assert len(result.epoch_log_loss) == 2
+        X = add_basic_features(transactions.drop(columns=["isFraud"]))
+        proba = result.model.predict_proba(X)
+        assert np.all((proba >= 0) & (proba <= 1))
+
+    def test_exports_artifact(self, tmp_path, transactions):
+        """Модель на SGD должна экспортироваться в артефакт с теми же вероятностями."""
+        result = train_incremental(_chunks(transactions), epochs=1)
+        X = add_basic_features(transactions.drop(columns=["isFraud"]))
+
+        artifact = load_artifact(export_artifact(result.model, tmp_path / "model"))
+
+        np.testing.assert_allclose(artifact.predict_proba(X), result.model.predict_proba(X))
+
+    def test_missing_target(self, transactions):
+        """Отсутствие целевой колонки должно вызывать KeyError."""
+        with pytest.raises(KeyError, match="label"):
+            train_incremental(_chunks(transactions), target_col="label")
+
+    def test_invalid_epochs(self, transactions):
+        """Число эпох меньше 1 должно вызывать ValueError."""
+        with pytest.raises(ValueError):
+            train_incremental(_chunks(transactions), epochs=0)
+
+
+class TestBalancedClassWeight:
+    """Тесты для balanced_class_weight."""
+
+    def test_matches_sklearn(self):
+        """Веса должны совпадать с class_weight='balanced'."""
+        assert balanced_class_weight(np.array([90, 10])) == pytest.approx({0: 100 / 180, 1: 5.0})
+
+    def test_single_class(self):
+        """Поток без мошенничества должен вызывать ValueError."""
+        with pytest.raises(ValueError):
+            balanced_class_weight(np.array([100, 0]))
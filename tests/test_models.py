@@ -6,7 +6,14 @@ import pytest
 from sklearn.pipeline import Pipeline
 
 from fraudguard.features import build_preprocessor
-from fraudguard.models import build_forest_model, build_logreg_model
+from fraudguard.models import (
+    build_forest_model,
+    build_hgb_model,
+    build_logreg_model,
+    build_sgd_model,
+    fit_pipelines,
+    fit_preprocessor,
+)
 
 
 @pytest.fixture
@@ -70,6 +77,33 @@ class TestLogRegModel:
         assert np.allclose(proba.sum(axis=1), 1.0)
 
 
+class TestSgdModel:
+    """Тесты для логистической регрессии на SGD."""
+
+    def test_trains_and_predicts_proba(self, dummy_dataset):
+        """Модель должна обучаться и выдавать вероятности."""
+        X, y = dummy_dataset
+        preprocessor, _, _ = build_preprocessor(X)
+
+        model = build_sgd_model(preprocessor)
+        model.fit(X, y)
+        proba = model.predict_proba(X)
+
+        assert proba.shape == (len(X), 2)
+        assert np.allclose(proba.sum(axis=1), 1.0)
+
+    def test_supports_partial_fit(self, dummy_dataset):
+        """Классификатор должен дообучаться через partial_fit с явными весами классов."""
+        X, y = dummy_dataset
+        preprocessor, _, _ = build_preprocessor(X)
+        model = build_sgd_model(preprocessor, class_weight={0: 1.0, 1: 2.0})
+        Xt = preprocessor.fit_transform(X, y)
+
+        model.named_steps["clf"].partial_fit(Xt, y, classes=[0, 1])
+
+        assert model.predict_proba(X).shape == (len(X), 2)
+
+
 class TestForestModel:
     """Тесты для Random Forest."""
 
@@ -112,3 +146,110 @@ class TestForestModel:
         assert clf.n_estimators == 50
         assert clf.max_depth == 5
         assert clf.min_samples_leaf == 2
+
+
+class TestHgbModel:
+    """Тесты для HistGradientBoosting."""
+
+    @pytest.fixture
+    def larger_dataset(self):
+        """Датасет, достаточный для ранней остановки бустинга."""
+        rng = np.random.default_rng(0)
+        n = 600
+        y = pd.Series((rng.random(n) < 0.2).astype(int))
+        X = pd.DataFrame(
+            {
+                "amount": rng.lognormal(4 + 2 * y, 1.0),
+                "type": np.where(y == 1, "TRANSFER", rng.choice(["PAYMENT", "CASH_IN"], n)),
+                "device": rng.choice(["web", "mobile", "atm"], n),
+            }
+        )
+        return X, y
+
+    def test_native_categoricals(self, larger_dataset):
+        """С порядковым кодированием категориальные столбцы должны обрабатываться нативно."""
+        X, _ = larger_dataset
+        preprocessor, _, cat_cols = build_preprocessor(X, encoder="ordinal")
+
+        model = build_hgb_model(preprocessor)
+
+        mask = model.named_steps["clf"].categorical_features
+        assert sum(mask) == len(cat_cols) == 2
+        assert mask[-2:] == [True, True]
+
+    def test_no_native_categoricals_with_onehot(self, larger_dataset):
+        """С one-hot кодированием маска категорий не задаётся."""
+        X, _ = larger_dataset
+        preprocessor, _, _ = build_preprocessor(X)
+
+        model = build_hgb_model(preprocessor)
+
+        assert model.named_steps["clf"].categorical_features is None
+
+    def test_early_stopping_on_validation(self, larger_dataset):
+        """Ранняя остановка должна использовать переданную валидационную выборку."""
+        X, y = larger_dataset
+        X_train, X_valid, y_train, y_valid = X[:400], X[400:], y[:400], y[400:]
+        preprocessor, _, _ = build_preprocessor(X_train, encoder="ordinal")
+        model = build_hgb_model(preprocessor, max_iter=300, n_iter_no_change=5)
+
+        X_train_t = fit_preprocessor(preprocessor, X_train, y_train)
+        fit_pipelines(
+            {"hgb": model},
+            X_train,
+            y_train,
+            Xt=X_train_t,
+            validation=(preprocessor.transform(X_valid), y_valid),
+        )
+
+        clf = model.named_steps["clf"]
+        assert clf.n_iter_ < 300
+        assert len(clf.validation_score_) == clf.n_iter_ + 1
+        assert model.predict_proba(X_valid).shape == (len(X_valid), 2)
+
+
+class TestFitPipelines:
+    """Тесты для fit_pipelines."""
+
+    def test_fits_all_models_with_shared_preprocessor(self, dummy_dataset):
+        """Все модели должны обучаться на одном проходе препроцессинга."""
+        X, y = dummy_dataset
+        preprocessor, _, _ = build_preprocessor(X)
+        models = {
+            "logreg": build_logreg_model(preprocessor),
+            "forest": build_forest_model(preprocessor, n_estimators=10),
+        }
+
+        fit_times = fit_pipelines(models, X, y)
+
+        assert set(fit_times) == {"logreg", "forest"}
+        assert all(seconds >= 0 for seconds in fit_times.values())
+        for model in models.values():
+            assert model.named_steps["preprocess"] is preprocessor
+            assert model.predict_proba(X).shape == (len(X), 2)
+
+    def test_matches_regular_fit(self, dummy_dataset):
+        """Результат должен совпадать с обычным Pipeline.fit."""
+        X, y = dummy_dataset
+        shared, _, _ = build_preprocessor(X)
+        separate, _, _ = build_preprocessor(X)
+        model_shared = build_logreg_model(shared)
+        model_separate = build_logreg_model(separate)
+
+        fit_pipelines({"logreg": model_shared}, X, y)
+        model_separate.fit(X, y)
+
+        np.testing.assert_allclose(model_shared.predict_proba(X), model_separate.predict_proba(X))
+
+    def test_rejects_different_preprocessors(self, dummy_dataset):
+        """Пайплайны с разными препроцессорами не принимаются."""
+        X, y = dummy_dataset
+        first, _, _ = build_preprocessor(X)
+        second, _, _ = build_preprocessor(X)
+        models = {
+            "logreg": build_logreg_model(first),
+            "forest": build_forest_model(second, n_estimators=10),
+        }
+
+        with pytest.raises(ValueError, match="same preprocessor"):
+            fit_pipelines(models, X, y)
@@ -0,0 +1,57 @@
+"""Тесты для модуля persistence."""
+
+import pytest
+
+from fraudguard.persistence import (
+    DEFAULT_THRESHOLD,
+    load_model,
+    metadata_path,
+    model_version,
+    resolve_threshold,
+    save_model,
+)
+
+
+class TestModelPersistence:
+    """Тесты для сохранения модели с метаданными."""
+
+    def test_roundtrip(self, tmp_path):
+        """Модель и метаданные должны сохраняться и загружаться вместе."""
+        path = tmp_path / "model.joblib"
+        save_model({"weights": [1, 2]}, path, metadata={"threshold": 0.27})
+
+        model, metadata = load_model(path)
+
+        assert model == {"weights": [1, 2]}
+        assert metadata["threshold"] == 0.27
+        assert metadata_path(path) == tmp_path / "model.meta.json"
+
+    def test_missing_metadata(self, tmp_path):
+        """Модель без файла метаданных должна загружаться с пустыми метаданными."""
+        path = tmp_path / "model.joblib"
+        save_model("model", path)
+        metadata_path(path).unlink()
+
+        _, metadata = load_model(path)
+
+        assert metadata == {}
+        assert resolve_threshold(metadata) == DEFAULT_THRESHOLD
+
+    def test_missing_model(self, tmp_path):
+        """Отсутствующая модель должна вызывать FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            load_model(tmp_path / "missing.joblib")
+
+    def test_override_threshold(self):
+        """Явно заданный порог должен иметь приоритет над сохранённым."""
+        assert resolve_threshold({"threshold": 0.2}) == 0.2
+        assert resolve_threshold({"threshold": 0.2}, override=0.7) == 0.7
+
+    def test_model_version_changes_on_save(self, tmp_path):
+        """Версия модели должна меняться после перезаписи файла."""
+        path = tmp_path / "model.joblib"
+        save_model({"weights": [1]}, path)
+        before = model_version(path)
+        save_model({"weights": [1, 2, 3]}, path)
+
+        assert model_version(path) != before
@@ -0,0 +1,114 @@
+"""Тесты для модуля profiling."""
+
+import json
+import pstats
+import time
+
+import pytest
+
+from fraudguard.profiling import StageProfiler, peak_rss_mb
+
+
+class TestStageProfiler:
+    """Тесты для StageProfiler."""
+
+    def test_aggregates_calls(self):
+        """Повторные вызовы этапа должны суммироваться по имени."""
+        profiler = StageProfiler()
+
+        for _ in range(3):
+            with profiler.stage("predict", rows=100):
+                time.sleep(0.01)
+
+        stage = profiler.stages["predict"]
+        assert stage.calls == 3
+        assert stage.rows == 300
+        assert stage.seconds >= 0.03
+        assert stage.rows_per_sec == pytest.approx(300 / stage.seconds)
+
+    def test_rows_set_inside_stage(self):
+        """Число строк может задаваться внутри этапа."""
+        profiler = StageProfiler()
+
+        with profiler.stage("load") as call:
+            call.rows = 42
+
+        assert profiler.stages["load"].rows == 42
+
+    def test_disabled(self):
+        """Выключенный профилировщик не должен ничего записывать."""
+        profiler = StageProfiler(enabled=False)
+
+        with profiler.stage("fit", rows=10):
+            pass
+
+        assert profiler.stages == {}
+
+    def test_nested_stages(self):
+        """Родительский этап должен идти в отчёте раньше вложенного и включать его время."""
+        profiler = StageProfiler()
+
+        with profiler.stage("train"), profiler.stage("train/fit"):
+            time.sleep(0.01)
+
+        assert list(profiler.stages) == ["train", "train/fit"]
+        assert profiler.stages["train"].seconds >= profiler.stages["train/fit"].seconds
+
+    def test_peak_rss(self):
+        """Пиковая память должна измеряться для этапа и для всего запуска."""
+        if peak_rss_mb() is None:
+            pytest.skip("peak RSS is not available on this platform")
+        profiler = StageProfiler()
+
+        with profiler.stage("alloc"):
+            block = bytearray(32 * 1024**2)
+            del block
+
+        assert profiler.stages["alloc"].peak_rss_mb > 0
+        assert profiler.report()["peak_rss_mb"] >= profiler.stages["alloc"].peak_rss_mb
+
+    def test_decorator(self):
+        """Декоратор должен оборачивать функцию в этап и считать строки результата."""
+        profiler = StageProfiler()
+
+        @profiler.profiled("load")
+        def load():
+            return list(range(5))
+
+        assert load() == [0, 1, 2, 3, 4]
+        assert profiler.stages["load"].rows == 5
+
+    def test_stage_records_on_error(self):
+        """Этап должен записываться, даже если внутри возникло исключение."""
+        profiler = StageProfiler()
+
+        with pytest.raises(ValueError), profiler.stage("fail"):
+            raise ValueError("boom")
+
+        assert profiler.stages["fail"].calls == 1
+
+    def test_write_report(self, tmp_path):
+        """Отчёт должен сохраняться в JSON со всеми этапами."""
+        profiler = StageProfiler()
+        with profiler.stage("load", rows=10):
+            pass
+
+        path = profiler.write(tmp_path / "reports" / "profile.json")
+        report = json.loads(path.read_text())
+
+        assert [s["name"] for s in report["stages"]] == ["load"]
+        assert report["stages"][0]["rows"] == 10
+        assert "rows_per_sec" in report["stages"][0]
+        assert "load" in str(profiler)
+
+    def test_cprofile_dump(self, tmp_path):
+        """При заданной папке должен сохраняться .prof-файл для каждого внешнего этапа."""
+        profiler = StageProfiler(profile_dir=tmp_path)
+
+        with profiler.stage("fit/onehot"), profiler.stage("fit/inner"):
+            sum(range(1000))
+        profiler.dump_profiles()
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["fit_onehot.prof"]
+        assert profiler.stages["fit/onehot"].profile_path == str(tmp_path / "fit_onehot.prof")
+        assert pstats.Stats(profiler.stages["fit/onehot"].profile_path).total_calls > 0
@@ -0,0 +1,109 @@
+"""Тесты для модуля pruning."""
+
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from fraudguard.models import build_forest_model, build_logreg_model
+from fraudguard.pruning import node_depths, prune_forest, truncate_tree
+
+
+@pytest.fixture(scope="module")
+def forest_data(synthetic_features, fit_pipeline):
+    """Обученный лес и валидационная выборка."""
+    X = synthetic_features.drop(columns=["isFraud"])
+    y = synthetic_features["isFraud"]
+    model = fit_pipeline(build_forest_model, X.iloc[:2_000], y.iloc[:2_000], n_estimators=20)
+    return model, X.iloc[2_000:], y.iloc[2_000:]
+
+
+class TestTruncateTree:
+    """Тесты для truncate_tree."""
+
+    def test_matches_decision_path(self):
+        """Усечённое дерево должно предсказывать распределение узла на глубине среза."""
+        rng = np.random.default_rng(0)
+        X = rng.random((500, 4))
+        y = (X[:, 0] + 0.3 * rng.random(500) > 0.7).astype(int)
+        estimator = DecisionTreeClassifier(random_state=0).fit(X, y)
+        tree = estimator.tree_
+        depth = node_depths(tree)
+
+        truncated = truncate_tree(tree, max_depth=3)
+
+        path = estimator.decision_path(X).toarray().astype(bool)
+        cut_nodes = [np.flatnonzero(row & (depth <= 3))[-1] for row in path]
+        expected = tree.value[cut_nodes, 0, :]
+        expected = expected / expected.sum(axis=1, keepdims=True)
+        actual = truncated.predict(X.astype(np.float32))
+        np.testing.assert_allclose(actual / actual.sum(axis=1, keepdims=True), expected)
+        assert truncated.max_depth == 3
+        assert truncated.node_count == int((depth <= 3).sum())
+
+
+class TestPruneForest:
+    """Тесты для prune_forest."""
+
+    def test_selected_within_tolerance(self, forest_data):
+        """Выбранный вариант не должен терять больше допуска PR-AUC."""
+        model, X_valid, y_valid = forest_data
+
+        result = prune_forest(model, X_valid, y_valid, tolerance=0.01)
+
+        assert result.selected.pr_auc >= result.baseline.pr_auc - 0.01
+        assert result.selected.n_nodes <= result.baseline.n_nodes
+        assert result.baseline.n_trees == 20 and result.baseline.max_depth is None
+        assert len(result.model.named_steps["clf"].estimators_) == result.selected.n_trees
+
+    def test_pruned_model_predicts(self, forest_data):
+        """Урезанный пайплайн должен выдавать вероятности для сырых данных."""
+        model, X_valid, y_valid = forest_data
+
+        result = prune_forest(model, X_valid, y_valid, tolerance=1.0)
+        proba = result.model.predict_proba(X_valid)
+
+        assert proba.shape == (len(X_valid), 2)
+        assert result.selected == min(result.candidates, key=lambda c: (c.n_nodes, -c.pr_auc))
+
+    def test_report(self, forest_data):
+        """Отчёт должен содержать все варианты и отмечать выбранный."""
+        model, X_valid, y_valid = forest_data
+
+        result = prune_forest(model, X_valid, y_valid, tree_counts=[5, 20], depths=[None, 4])
+
+        assert len(result.candidates) == 4
+        assert "selected" in str(result)
+        assert all(c.size_mb > 0 for c in result.candidates)
+
+    @pytest.mark.parametrize(
+        "options", [{"tree_counts": [5, 10]}, {"depths": (8, 6)}], ids=["tree_counts", "depths"]
+    )
+    def test_baseline_always_evaluated(self, forest_data, options):
+        """Полный лес без ограничения глубины должен оцениваться при любых параметрах."""
+        model, X_valid, y_valid = forest_data
+
+        result = prune_forest(model, X_valid, y_valid, **options)
+
+        assert result.baseline.n_trees == 20
+        assert result.baseline.max_depth is None
+        assert result.baseline in result.candidates
+
+    def test_single_fraud_keeps_forest(self, forest_data):
+        """С одним фродом в валидации лес должен остаться без изменений."""
+        model, X_valid, y_valid = forest_data
+        keep = (y_valid == 0) | (y_valid.cumsum() == 1)
+
+        result = prune_forest(model, X_valid[keep], y_valid[keep])
+
+        assert result.selected is result.baseline
+        assert result.model is model
+        assert result.baseline.n_trees == 20
+        assert 0 <= result.baseline.pr_auc <= 1
+
+    def test_not_a_forest(self, forest_data, fit_pipeline):
+        """Для моделей, отличных от леса, должна возникать ошибка TypeError."""
+        _, X_valid, y_valid = forest_data
+        model = fit_pipeline(build_logreg_model, X_valid, y_valid)
+
+        with pytest.raises(TypeError):
+            prune_forest(model, X_valid, y_valid)
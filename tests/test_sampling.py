@@ -0,0 +1,143 @@
+"""Тесты для модуля sampling."""
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from fraudguard.artifact import export_artifact, load_artifact
+from fraudguard.features import build_preprocessor
+from fraudguard.models import build_hgb_model, build_logreg_model
+from fraudguard.sampling import (
+    DownsampledClassifier,
+    correct_probabilities,
+    downsample_pipeline,
+    negative_rate_for_ratio,
+    sample_negatives,
+)
+
+
+@pytest.fixture(scope="module")
+def dataset(synthetic_features):
+    """Синтетические данные с редким мошенничеством."""
+    X = synthetic_features.drop(columns=["isFraud"])
+    y = synthetic_features["isFraud"]
+    return X.iloc[:2_000], y.iloc[:2_000], X.iloc[2_000:], y.iloc[2_000:]
+
+
+class TestCorrectProbabilities:
+    """Тесты для поправки вероятностей после сэмплирования."""
+
+    def test_identity_without_sampling(self):
+        """При доле негативов 1 вероятности не должны меняться."""
+        proba = np.array([0.0, 0.1, 0.5, 0.9, 1.0])
+        np.testing.assert_allclose(correct_probabilities(proba, 1.0), proba)
+
+    def test_odds_scaled(self):
+        """Шансы должны уменьшаться пропорционально доле негативов."""
+        proba = np.array([0.2, 0.5, 0.8])
+        corrected = correct_probabilities(proba, 0.1)
+        odds = corrected / (1 - corrected)
+        np.testing.assert_allclose(odds, 0.1 * proba / (1 - proba))
+
+
+class TestSampleNegatives:
+    """Тесты для случайного отбора негативов."""
+
+    def test_keeps_all_positives(self):
+        """Все мошеннические строки должны сохраняться."""
+        y = np.array([0] * 90 + [1] * 10)
+        rate = negative_rate_for_ratio(y, 3)
+        rows = sample_negatives(y, rate)
+
+        assert rate == pytest.approx(30 / 90)
+        assert (y[rows] == 1).sum() == 10
+        assert (y[rows] == 0).sum() == 30
+        assert np.all(np.diff(rows) > 0)
+
+    def test_rate_capped(self):
+        """Доля негативов не должна превышать 1."""
+        y = np.array([0] * 10 + [1] * 10)
+        assert negative_rate_for_ratio(y, 5) == 1.0
+
+    def test_single_class(self):
+        """Выборка из одного класса должна вызывать ошибку."""
+        with pytest.raises(ValueError, match="both classes"):
+            negative_rate_for_ratio(np.zeros(10), 5)
+
+
+class TestDownsampledClassifier:
+    """Тесты для классификатора на прореженных негативах."""
+
+    def test_fit_sample_size(self, dataset):
+        """Модель должна обучаться на всех фродах и ratio негативов на каждый."""
+        X, y, _, _ = dataset
+        Xt = np.random.default_rng(0).random((len(y), 3))
+        clf = DownsampledClassifier(LogisticRegression(), ratio=4).fit(Xt, y)
+
+        n_pos = int(y.sum())
+        assert clf.n_samples_fit_ == 5 * n_pos
+        assert clf.negative_rate_ == pytest.approx(4 * n_pos / (len(y) - n_pos))
+        np.testing.assert_array_equal(clf.classes_, [0, 1])
+
+    def test_calibration(self, dataset):
+        """Скорректированные вероятности должны соответствовать доле фрода."""
+        X, y, X_test, y_test = dataset
+        preprocessor, _, _ = build_preprocessor(X)
+        model = downsample_pipeline(
+            build_logreg_model(preprocessor, class_weight=None), ratio=3
+        ).fit(X, y)
+
+        clf = model.named_steps["clf"]
+        corrected = model.predict_proba(X_test)[:, 1]
+        raw = clf.estimator_.predict_proba(model.named_steps["preprocess"].transform(X_test))[:, 1]
+
+        assert abs(corrected.mean() - y_test.mean()) < abs(raw.mean() - y_test.mean())
+        assert corrected.mean() == pytest.approx(y_test.mean(), abs=0.02)
+        # The correction is monotonic: the ranking of transactions is unchanged.
+        np.testing.assert_array_equal(np.argsort(corrected), np.argsort(raw))
+
+    def test_nearmiss(self, dataset):
+        """Сэмплер imbalanced-learn должен оставлять ratio негативов на фрод."""
+        pytest.importorskip("imblearn")
+        X, y, X_test, _ = dataset
+        preprocessor, _, _ = build_preprocessor(X)
+        model = downsample_pipeline(
+            build_logreg_model(preprocessor, class_weight=None), ratio=2, sampler="nearmiss"
+        ).fit(X, y)
+
+        assert model.named_steps["clf"].n_samples_fit_ == 3 * int(y.sum())
+        assert model.predict_proba(X_test).shape == (len(X_test), 2)
+
+    def test_unknown_sampler(self, dataset):
+        """Неизвестный сэмплер должен вызывать ошибку."""
+        X, _, _, _ = dataset
+        preprocessor, _, _ = build_preprocessor(X)
+        with pytest.raises(ValueError, match="Unknown sampler"):
+            downsample_pipeline(build_logreg_model(preprocessor), ratio=2, sampler="smote")
+
+    def test_invalid_ratio(self, dataset):
+        """Неположительное соотношение должно вызывать ошибку."""
+        X, y, _, _ = dataset
+        with pytest.raises(ValueError, match="ratio"):
+            DownsampledClassifier(LogisticRegression(), ratio=0).fit(np.zeros((len(y), 1)), y)
+
+
+class TestDownsampledArtifact:
+    """Тесты для экспорта прореженной модели в артефакт."""
+
+    @pytest.mark.parametrize(
+        ("builder", "encoder"),
+        [(build_logreg_model, "onehot"), (build_hgb_model, "ordinal")],
+    )
+    def test_matches_pipeline(self, tmp_path, dataset, builder, encoder):
+        """Артефакт должен применять ту же поправку вероятностей."""
+        X, y, X_test, _ = dataset
+        preprocessor, _, _ = build_preprocessor(X, encoder=encoder)
+        model = downsample_pipeline(builder(preprocessor, class_weight=None), ratio=5).fit(X, y)
+
+        artifact = load_artifact(export_artifact(model, tmp_path / "model.artifact"))
+
+        assert artifact.params["negative_rate"] == model.named_steps["clf"].negative_rate_
+        np.testing.assert_allclose(
+            artifact.predict_proba(X_test), model.predict_proba(X_test), atol=1e-12
+        )
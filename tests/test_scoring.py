@@ -0,0 +1,369 @@
+"""Тесты для модуля scoring."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fraudguard.features import add_basic_features, build_preprocessor
+from fraudguard.models import build_logreg_model
+from fraudguard.profiling import StageProfiler
+from fraudguard.scoring import (
+    ScoreCache,
+    check_row_features,
+    iter_chunks,
+    load_velocity_store,
+    score_file,
+    score_frame,
+    score_transaction,
+    transaction_fingerprint,
+)
+from fraudguard.velocity import VelocityStore, add_velocity_features
+
+
+@pytest.fixture
+def transactions():
+    """Набор транзакций в формате входных данных predict.py."""
+    return pd.DataFrame(
+        {
+            "transaction_id": range(10),
+            "amount": [100.0, 5000.0, 50.0, 7000.0, 200.0, 4500.0, 80.0, 9000.0, 60.0, 300.0],
+            "transaction_type": ["PAYMENT", "CASH_OUT", "PAYMENT", "TRANSFER", "PAYMENT"] * 2,
+            "device_type": ["mobile", "web"] * 5,
+            "transaction_time": [f"2025-01-{day:02d} 12:00:00" for day in range(1, 11)],
+        }
+    )
+
+
+@pytest.fixture
+def fitted_model(transactions):
+    """Обученная логистическая регрессия."""
+    X = add_basic_features(transactions.drop(columns=["transaction_id"]))
+    y = pd.Series([0, 1, 0, 1, 0, 1, 0, 1, 0, 0])
+    preprocessor, _, _ = build_preprocessor(X)
+    model = build_logreg_model(preprocessor)
+    model.fit(X, y)
+    return model
+
+
+class TestIterChunks:
+    """Тесты для iter_chunks."""
+
+    def test_reads_csv_in_chunks(self, transactions, tmp_path):
+        """CSV должен читаться кусками заданного размера."""
+        path = tmp_path / "input.csv"
+        transactions.to_csv(path, index=False)
+
+        chunks = list(iter_chunks(path, chunksize=4))
+
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+
+    def test_raises_on_unknown_format(self, tmp_path):
+        """Неизвестный формат файла должен приводить к ValueError."""
+        path = tmp_path / "input.json"
+        path.write_text("{}")
+
+        with pytest.raises(ValueError, match="Unsupported file format"):
+            list(iter_chunks(path))
+
+    def test_raises_on_missing_file(self, tmp_path):
+        """Отсутствующий файл должен приводить к FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            list(iter_chunks(tmp_path / "missing.csv"))
+
+
+class TestScoreFile:
+    """Тесты для score_frame и score_file."""
+
+    def test_score_frame_matches_model(self, fitted_model, transactions):
+        """Вероятности должны совпадать с predict_proba модели."""
+        scored = score_frame(fitted_model, transactions, keep_columns=["transaction_id"])
+        expected = fitted_model.predict_proba(add_basic_features(transactions))[:, 1]
+
+        assert list(scored.columns) == ["transaction_id", "fraud_probability", "prediction"]
+        np.testing.assert_allclose(scored["fraud_probability"], expected)
+        assert set(scored["prediction"]).issubset({0, 1})
+
+    def test_score_file_csv(self, fitted_model, transactions, tmp_path):
+        """Пакетный скоринг CSV должен сохранять все строки."""
+        input_path = tmp_path / "input.csv"
+        output_path = tmp_path / "scores.csv"
+        transactions.to_csv(input_path, index=False)
+
+        stats = score_file(fitted_model, input_path, output_path, chunksize=3)
+        scores = pd.read_csv(output_path)
+
+        assert stats.rows == len(transactions)
+        assert stats.chunks == 4
+        assert stats.rows_per_sec > 0
+        assert len(scores) == len(transactions)
+        np.testing.assert_allclose(
+            scores["fraud_probability"],
+            score_frame(fitted_model, transactions)["fraud_probability"],
+        )
+
+    def test_score_file_parquet(self, fitted_model, transactions, tmp_path):
+        """Пакетный скоринг должен поддерживать Parquet на входе и выходе."""
+        pytest.importorskip("pyarrow")
+        input_path = tmp_path / "input.parquet"
+        output_path = tmp_path / "scores.parquet"
+        transactions.to_parquet(input_path, index=False)
+
+        stats = score_file(
+            fitted_model, input_path, output_path, chunksize=4, keep_columns=["transaction_id"]
+        )
+        scores = pd.read_parquet(output_path)
+
+        assert stats.rows == len(transactions)
+        assert scores["transaction_id"].tolist() == list(range(10))
+
+    def test_score_file_with_labels(self, fitted_model, transactions, tmp_path):
+        """При заданной колонке меток метрики должны считаться во время скоринга."""
+        input_path = tmp_path / "input.csv"
+        labels = [0, 1, 0, 1, 0, 1, 0, 1, 0, 0]
+        transactions.assign(isFraud=labels).to_csv(input_path, index=False)
+
+        stats = score_file(
+            fitted_model, input_path, tmp_path / "scores.csv", chunksize=3, label_col="isFraud"
+        )
+
+        predictions = score_frame(fitted_model, transactions)["prediction"]
+        assert stats.evaluation is not None
+        assert stats.evaluation.confusion_matrix.sum() == len(transactions)
+        assert stats.evaluation.recall == np.mean(predictions[np.array(labels) == 1])
+        assert "evaluation" in stats.to_dict()
+
+    def test_score_file_missing_label(self, fitted_model, transactions, tmp_path):
+        """Отсутствующая колонка меток должна вызывать KeyError."""
+        input_path = tmp_path / "input.csv"
+        transactions.to_csv(input_path, index=False)
+
+        with pytest.raises(KeyError):
+            score_file(fitted_model, input_path, tmp_path / "scores.csv", label_col="isFraud")
+
+    def test_score_file_profiled(self, fitted_model, transactions, tmp_path):
+        """Профилировщик должен собирать этапы чтения, скоринга и записи по чанкам."""
+        input_path = tmp_path / "input.csv"
+        transactions.to_csv(input_path, index=False)
+        profiler = StageProfiler()
+
+        score_file(
+            fitted_model, input_path, tmp_path / "scores.csv", chunksize=3, profiler=profiler
+        )
+
+        stages = profiler.stages
+        assert list(stages) == ["score_file/read", "score_file/predict", "score_file/write"]
+        assert stages["score_file/predict"].calls == 4
+        assert stages["score_file/predict"].rows == len(transactions)
+        assert stages["score_file/read"].calls == 5  # the last read hits end of file
+
+
+class TestCheckRowFeatures:
+    """Тесты для проверки признаков, доступных при скоринге."""
+
+    def test_accepts_row_model(self, fitted_model):
+        """Модель без скоростных признаков должна приниматься."""
+        check_row_features(fitted_model)
+
+    def test_rejects_velocity_model(self, transactions, tmp_path):
+        """Модель со скоростными признаками должна отклоняться с понятной ошибкой."""
+        df = transactions.drop(columns=["transaction_id"]).assign(nameOrig=["A", "B"] * 5)
+        X = add_velocity_features(add_basic_features(df)).drop(columns=["nameOrig"])
+        preprocessor, _, _ = build_preprocessor(X)
+        model = build_logreg_model(preprocessor).fit(X, [0, 1] * 5)
+
+        with pytest.raises(ValueError, match="velocity"):
+            check_row_features(model)
+        with pytest.raises(ValueError, match="velocity"):
+            transactions.to_csv(tmp_path / "input.csv", index=False)
+            score_file(model, tmp_path / "input.csv", tmp_path / "out.csv")
+
+
+class TestVelocityScoring:
+    """Тесты для скоринга моделей со скоростными признаками через VelocityStore."""
+
+    def test_online_matches_batch(self, account_transactions, velocity_model):
+        """Построчный онлайн-скоринг должен совпадать со скорами на пакетных признаках."""
+        model, expected = velocity_model
+        store = VelocityStore()
+        times = pd.to_datetime(account_transactions["transaction_time"])
+
+        scores = pd.Series(np.nan, index=account_transactions.index)
+        for i in times.sort_values(kind="stable").index:
+            row = account_transactions.loc[i].to_dict()
+            scores[i] = score_transaction(model, row, velocity=store)
+
+        np.testing.assert_allclose(scores, expected, atol=1e-9)
+
+    def test_frame_matches_batch(self, account_transactions, velocity_model):
+        """score_frame со хранилищем должен совпадать со скорами на пакетных признаках."""
+        model, expected = velocity_model
+
+        scored = score_frame(model, account_transactions, velocity=VelocityStore())
+
+        np.testing.assert_allclose(scored["fraud_probability"], expected, atol=1e-9)
+
+    def test_score_file_continues_history(self, account_transactions, velocity_model, tmp_path):
+        """score_file должен продолжать историю, на которой прогрето хранилище."""
+        model, expected = velocity_model
+        order = pd.to_datetime(account_transactions["transaction_time"]).argsort(kind="stable")
+        history, new = order[:100], order[100:]
+        account_transactions.iloc[history].to_csv(tmp_path / "history.csv", index=False)
+        account_transactions.iloc[new].to_csv(tmp_path / "input.csv", index=False)
+
+        store = load_velocity_store(model, {}, history=tmp_path / "history.csv")
+        score_file(model, tmp_path / "input.csv", tmp_path / "out.csv", velocity=store)
+
+        scored = pd.read_csv(tmp_path / "out.csv")
+        np.testing.assert_allclose(scored["fraud_probability"], expected[new], atol=1e-9)
+
+    def test_store_only_for_velocity_models(self, fitted_model, velocity_model):
+        """Хранилище создаётся только для моделей со скоростными признаками."""
+        model, _ = velocity_model
+        metadata = {"velocity": {"account_col": "account_id"}}
+
+        assert load_velocity_store(fitted_model, metadata) is None
+        assert load_velocity_store(model, metadata).account_col == "account_id"
+
+
+class _CountingModel:
+    """Модель-заглушка, считающая вызовы predict_proba."""
+
+    def __init__(self, model):
+        self.model = model
+        self.rows = 0
+
+    def predict_proba(self, X):
+        self.rows += len(X)
+        return self.model.predict_proba(X)
+
+
+class TestTransactionFingerprint:
+    """Тесты для transaction_fingerprint."""
+
+    def test_normalized(self):
+        """Эквивалентные записи транзакции должны давать один отпечаток."""
+        row = {"amount": 100, "transaction_type": "PAYMENT", "x": None}
+        same = {"x": np.nan, "transaction_type": "PAYMENT", "amount": np.float32(100.0)}
+
+        assert transaction_fingerprint(row) == transaction_fingerprint(same)
+
+    def test_strings_kept_verbatim(self):
+        """Строки с пробелами модель считает другой категорией, отпечатки должны различаться."""
+        row = {"transaction_type": "CASH_OUT"}
+
+        assert transaction_fingerprint(row) != transaction_fingerprint(
+            {"transaction_type": " CASH_OUT"}
+        )
+
+    def test_only_given_columns(self):
+        """При заданных колонках остальные поля не должны влиять на отпечаток."""
+        row = {"amount": 100.0, "transaction_type": "PAYMENT"}
+        columns = ["amount", "transaction_type"]
+
+        assert transaction_fingerprint(row, columns=columns) == transaction_fingerprint(
+            {**row, "transaction_id": 7, "isFraud": 1}, columns=columns
+        )
+
+    def test_depends_on_values_and_model(self):
+        """Отпечаток должен меняться вместе с данными и версией модели."""
+        row = {"amount": 100.0, "transaction_type": "PAYMENT"}
+
+        assert transaction_fingerprint(row) != transaction_fingerprint({**row, "amount": 101.0})
+        assert transaction_fingerprint(row, "v1") != transaction_fingerprint(row, "v2")
+
+
+class TestScoreCache:
+    """Тесты для ScoreCache."""
+
+    def test_lru_eviction(self):
+        """При переполнении должна вытесняться давно не использованная запись."""
+        cache = ScoreCache(maxsize=2)
+        cache.put("a", 0.1)
+        cache.put("b", 0.2)
+        assert cache.get("a") == 0.1
+        cache.put("c", 0.3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 0.1
+        assert cache.stats.to_dict() == {
+            "hits": 2,
+            "misses": 1,
+            "evictions": 1,
+            "expirations": 0,
+            "size": 2,
+            "hit_rate": pytest.approx(2 / 3, abs=1e-4),
+        }
+
+    def test_ttl(self):
+        """Устаревшие записи не должны возвращаться."""
+        now = [0.0]
+        cache = ScoreCache(ttl=10, clock=lambda: now[0])
+        cache.put("a", 0.5)
+
+        now[0] = 9.0
+        assert cache.get("a") == 0.5
+        now[0] = 10.0
+        assert cache.get("a") is None
+        assert cache.stats.expirations == 1
+        assert len(cache) == 0
+
+    def test_invalid_parameters(self):
+        """Некорректные размер и TTL должны вызывать ошибку."""
+        with pytest.raises(ValueError, match="maxsize"):
+            ScoreCache(maxsize=0)
+        with pytest.raises(ValueError, match="ttl"):
+            ScoreCache(ttl=0)
+
+
+class TestCachedScoring:
+    """Тесты для скоринга с кэшем."""
+
+    def test_score_transaction_hit(self, fitted_model, transactions):
+        """Повторная транзакция не должна передаваться модели."""
+        model = _CountingModel(fitted_model)
+        cache = ScoreCache()
+        row = transactions.drop(columns=["transaction_id"]).iloc[0].to_dict()
+
+        first = score_transaction(model, row, cache=cache)
+        second = score_transaction(model, dict(row), cache=cache)
+
+        assert first == second
+        assert model.rows == 1
+        assert cache.stats.hits == 1
+
+    def test_score_frame_duplicates(self, fitted_model, transactions):
+        """Дубликаты в пакете должны оцениваться один раз с тем же результатом."""
+        df = pd.concat([transactions] * 3, ignore_index=True).drop(columns=["transaction_id"])
+        model = _CountingModel(fitted_model)
+        cache = ScoreCache(maxsize=5)
+
+        scored = score_frame(model, df, cache=cache)
+
+        pd.testing.assert_frame_equal(scored, score_frame(fitted_model, df))
+        assert model.rows == 10
+        assert cache.stats.hits + cache.stats.misses == 30
+
+    def test_ignores_columns_outside_model(self, fitted_model, transactions):
+        """Идентификаторы и метки не должны мешать попаданиям в кэш."""
+        df = pd.concat([transactions] * 2, ignore_index=True)
+        df["transaction_id"] = range(len(df))
+        df["isFraud"] = [0, 1] * 10
+        cache = ScoreCache()
+
+        scored = score_frame(fitted_model, df, cache=cache)
+        score_transaction(fitted_model, df.iloc[0].to_dict(), cache=cache)
+
+        pd.testing.assert_frame_equal(scored, score_frame(fitted_model, df))
+        assert cache.stats.misses == 10
+        assert cache.stats.hits == 11
+
+    def test_score_file_with_cache(self, fitted_model, transactions, tmp_path):
+        """Кэш должен переиспользоваться между чанками файла."""
+        input_path = tmp_path / "input.csv"
+        pd.concat([transactions] * 2).to_csv(input_path, index=False)
+        cache = ScoreCache()
+
+        score_file(fitted_model, input_path, tmp_path / "out.csv", chunksize=10, cache=cache)
+
+        assert cache.stats.hits == 10
+        assert cache.stats.misses == 10
@@ -0,0 +1,97 @@
+"""Тесты для модуля search."""
+
+import numpy as np
+import pytest
+
+from fraudguard.search import _stratified_order, search_hyperparameters
+
+
+@pytest.fixture
+def matrices():
+    """Предобработанные матрицы признаков для обучения и валидации."""
+    rng = np.random.default_rng(0)
+
+    def make(n):
+        y = (rng.random(n) < 0.1).astype(int)
+        X = rng.normal(size=(n, 4)) + y[:, None]
+        return X, y
+
+    X_train, y_train = make(2_000)
+    X_valid, y_valid = make(500)
+    return X_train, y_train, X_valid, y_valid
+
+
+class TestSearchHyperparameters:
+    """Тесты для search_hyperparameters."""
+
+    def test_successive_halving(self, matrices):
+        """Число кандидатов должно сокращаться, а объём данных расти от ранга к рангу."""
+        result = search_hyperparameters(
+            *matrices, models=["logreg"], n_candidates=9, eta=3, min_rows=100, n_jobs=2
+        )
+
+        per_rung = [[t for t in result.trials if t.rung == rung] for rung in range(3)]
+        assert [len(trials) for trials in per_rung] == [9, 3, 1]
+        assert [trials[0].n_rows for trials in per_rung] == [223, 667, 2000]
+        assert not result.budget_exhausted
+
+    def test_best_by_pr_auc(self, matrices):
+        """Лучшей должна быть конфигурация с максимальным PR-AUC на последнем ранге."""
+        result = search_hyperparameters(
+            *matrices, models=["logreg", "forest"], n_candidates=1, min_rows=100, n_jobs=2
+        )
+
+        best = result.best()
+        last_rung = [t for t in result.trials if t.rung == best.rung]
+        assert best.pr_auc == max(t.pr_auc for t in last_rung)
+        assert 0 <= best.pr_auc <= 1
+        assert result.best("forest").model == "forest"
+        assert set(result.best("logreg").params) == {"C", "max_iter"}
+
+    def test_budget(self, matrices):
+        """Поиск должен останавливаться по исчерпании бюджета времени."""
+        result = search_hyperparameters(
+            *matrices, models=["forest"], n_candidates=27, budget_seconds=0.5, n_jobs=1
+        )
+
+        assert result.budget_exhausted
+        assert result.seconds < 10
+        assert len(result.trials) < 27
+
+    def test_single_class_validation(self, matrices):
+        """Валидация только из фрода не должна ломать испытания: ROC-AUC не определён."""
+        X_train, y_train, X_valid, y_valid = matrices
+        positive = y_valid == 1
+
+        result = search_hyperparameters(
+            X_train,
+            y_train,
+            X_valid[positive],
+            y_valid[positive],
+            models=["logreg"],
+            n_candidates=1,
+            min_rows=100,
+            n_jobs=1,
+        )
+
+        assert len(result.trials) == 1
+        assert result.best().roc_auc is None
+        assert result.best().pr_auc == pytest.approx(1.0)
+
+    def test_unknown_model(self, matrices):
+        """Неизвестная модель должна вызывать ошибку."""
+        with pytest.raises(ValueError):
+            search_hyperparameters(*matrices, models=["svm"])
+
+
+class TestStratifiedOrder:
+    """Тесты для _stratified_order."""
+
+    def test_prefix_keeps_class_ratio(self):
+        """Любой префикс порядка должен сохранять долю классов."""
+        y = np.array([1] * 10 + [0] * 90)
+        order = _stratified_order(y, np.random.default_rng(0))
+
+        assert sorted(order) == list(range(100))
+        assert y[order[:10]].sum() == 1
+        assert y[order[:50]].sum() == 5
@@ -0,0 +1,325 @@
+"""Тесты для модуля serving."""
+
+import asyncio
+import contextlib
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fraudguard.serving import AsyncScorer, LatencyStats, MicroBatcher, ScoringServer
+from fraudguard.velocity import VelocityStore
+
+
+def amount_score(df):
+    """Скоринг-функция для тестов: вероятность растёт с суммой."""
+    return np.clip(df["amount"].to_numpy(dtype=float) / 1000, 0, 1)
+
+
+class TestLatencyStats:
+    """Тесты для LatencyStats."""
+
+    def test_percentiles_and_counters(self):
+        """Перцентили и счётчики должны считаться по записанным запросам."""
+        stats = LatencyStats()
+        for ms in range(1, 101):
+            stats.record_request(ms / 1000, rows=2)
+        stats.record_batch()
+
+        snapshot = stats.snapshot()
+
+        assert snapshot["requests"] == 100
+        assert snapshot["rows"] == 200
+        assert snapshot["latency_p50_ms"] == pytest.approx(50.5, abs=0.01)
+        assert snapshot["latency_p99_ms"] == pytest.approx(99.01, abs=0.01)
+
+    def test_empty_snapshot(self):
+        """Без запросов метрики должны быть нулевыми."""
+        snapshot = LatencyStats().snapshot()
+
+        assert snapshot["requests"] == 0
+        assert snapshot["latency_p99_ms"] == 0.0
+
+
+class TestMicroBatcher:
+    """Тесты для MicroBatcher."""
+
+    def test_scores_single_request(self):
+        """Одиночный запрос должен получить свой скор."""
+        with MicroBatcher(amount_score) as batcher:
+            scores = batcher.score([{"amount": 500.0}], timeout=5)
+
+        np.testing.assert_allclose(scores, [0.5])
+
+    def test_coalesces_concurrent_requests(self):
+        """Одновременные запросы должны объединяться в микробатчи."""
+        results = {}
+        batcher = MicroBatcher(amount_score, max_batch_size=64, max_wait_ms=50)
+
+        def worker(i):
+            results[i] = batcher.score([{"amount": float(i)}], timeout=5)
+
+        with batcher:
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(32)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert all(results[i][0] == pytest.approx(i / 1000) for i in range(32))
+        assert batcher.stats.batches < 32
+        assert batcher.stats.requests == 32
+
+    def test_bad_request_does_not_fail_batch(self):
+        """Ошибочный запрос не должен ломать остальные запросы батча."""
+        batcher = MicroBatcher(amount_score, max_wait_ms=50)
+
+        with batcher:
+            good = batcher.submit([{"amount": 100.0}])
+            bad = batcher.submit([{"amount": "not-a-number"}])
+
+            np.testing.assert_allclose(good.result(timeout=5), [0.1])
+            with pytest.raises(ValueError):
+                bad.result(timeout=5)
+
+        assert batcher.stats.errors == 1
+
+    def test_prepares_each_request_once(self):
+        """Повторный скоринг по одному не должен заново подготавливать строки."""
+        prepared = []
+
+        def prepare(rows):
+            prepared.extend(rows)
+            return rows
+
+        batcher = MicroBatcher(amount_score, max_wait_ms=50, prepare_fn=prepare)
+
+        with batcher:
+            good = batcher.submit([{"amount": 100.0}])
+            bad = batcher.submit([{"amount": "not-a-number"}])
+
+            np.testing.assert_allclose(good.result(timeout=5), [0.1])
+            with pytest.raises(ValueError):
+                bad.result(timeout=5)
+
+        assert len(prepared) == 2
+
+    def test_scores_velocity_model(self, account_transactions, velocity_model):
+        """Онлайн-скоры модели со скоростными признаками должны совпадать с пакетными."""
+        model, expected = velocity_model
+        times = pd.to_datetime(account_transactions["transaction_time"])
+        scores = pd.Series(np.nan, index=account_transactions.index)
+
+        with MicroBatcher.from_model(model, velocity=VelocityStore()) as batcher:
+            for i in times.sort_values(kind="stable").index:
+                row = account_transactions.loc[i].to_dict()
+                scores[i] = batcher.score([row], timeout=5)[0]
+
+        np.testing.assert_allclose(scores, expected, atol=1e-9)
+
+    def test_rejects_invalid_batch_size(self):
+        """max_batch_size меньше 1 недопустим."""
+        with pytest.raises(ValueError, match="max_batch_size"):
+            MicroBatcher(amount_score, max_batch_size=0)
+
+
+class TestAsyncScorer:
+    """Тесты для AsyncScorer."""
+
+    def test_scores_single_request(self):
+        """Одиночный запрос должен получить свой скор."""
+
+        async def run():
+            async with AsyncScorer(amount_score) as scorer:
+                return await scorer.score_one({"amount": 500.0})
+
+        assert asyncio.run(run()) == pytest.approx(0.5)
+
+    def test_coalesces_concurrent_requests(self):
+        """Одновременные запросы должны объединяться в батчи."""
+
+        async def run():
+            async with AsyncScorer(amount_score, max_batch_size=64, max_wait_ms=50) as scorer:
+                scores = await asyncio.gather(
+                    *(scorer.score([{"amount": float(i)}]) for i in range(100))
+                )
+                return scores, scorer.stats.snapshot()
+
+        scores, snapshot = asyncio.run(run())
+
+        np.testing.assert_allclose(np.concatenate(scores), np.arange(100) / 1000)
+        assert snapshot["requests"] == 100
+        assert snapshot["batches"] < 100
+
+    def test_does_not_block_event_loop(self):
+        """Медленная модель не должна блокировать цикл событий."""
+
+        def slow_score(df):
+            time.sleep(0.2)
+            return amount_score(df)
+
+        async def run():
+            async with AsyncScorer(slow_score) as scorer:
+                task = asyncio.create_task(scorer.score_one({"amount": 100.0}))
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                waited = time.perf_counter() - start
+                return waited, await task
+
+        waited, score = asyncio.run(run())
+
+        assert waited < 0.15
+        assert score == pytest.approx(0.1)
+
+    def test_bad_request_does_not_fail_batch(self):
+        """Некорректный запрос не должен ломать остальные запросы батча."""
+
+        async def run():
+            async with AsyncScorer(amount_score, max_wait_ms=50) as scorer:
+                return await asyncio.gather(
+                    scorer.score([{"amount": 100.0}]),
+                    scorer.score([{"amount": "not a number"}]),
+                    scorer.score([{"amount": 300.0}]),
+                    return_exceptions=True,
+                )
+
+        good, bad, other = asyncio.run(run())
+
+        np.testing.assert_allclose(good, [0.1])
+        assert isinstance(bad, ValueError)
+        np.testing.assert_allclose(other, [0.3])
+
+    def test_backpressure(self):
+        """Переполненная очередь должна отклонять запросы или заставлять их ждать."""
+
+        def slow_score(df):
+            time.sleep(0.05)
+            return amount_score(df)
+
+        async def run(block_when_full):
+            scorer = AsyncScorer(
+                slow_score,
+                max_batch_size=1,
+                max_queue=2,
+                max_workers=1,
+                block_when_full=block_when_full,
+            )
+            async with scorer:
+                return await asyncio.gather(
+                    *(scorer.score_one({"amount": 1.0}) for _ in range(8)),
+                    return_exceptions=True,
+                )
+
+        rejected = asyncio.run(run(block_when_full=False))
+        waited = asyncio.run(run(block_when_full=True))
+
+        assert any(isinstance(r, asyncio.QueueFull) for r in rejected)
+        assert waited == pytest.approx([0.001] * 8)
+
+    def test_requires_start(self):
+        """Запрос до запуска должен вызывать ошибку."""
+        with pytest.raises(RuntimeError, match="not running"):
+            asyncio.run(AsyncScorer(amount_score).score([{"amount": 1.0}]))
+
+    def test_rejects_invalid_queue(self):
+        """Некорректный размер очереди должен вызывать ошибку."""
+        with pytest.raises(ValueError, match="max_queue"):
+            AsyncScorer(amount_score, max_queue=0)
+
+    @pytest.mark.parametrize("scorer", [AsyncScorer, MicroBatcher])
+    def test_rejects_velocity_model(self, scorer):
+        """Модель со скоростными признаками не обслуживается без истории счетов."""
+
+        class VelocityModel:
+            feature_names_in_ = np.array(["amount", "txn_count_1h"])
+
+        with pytest.raises(ValueError, match="velocity"):
+            scorer.from_model(VelocityModel())
+
+
+@contextlib.contextmanager
+def running_server(score_fn):
+    """Запускает сервер со скоринг-функцией score_fn на свободном порту."""
+    with MicroBatcher(score_fn) as batcher:
+        server = ScoringServer(("127.0.0.1", 0), batcher, threshold=0.5)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+
+class TestScoringServer:
+    """Тесты для HTTP-сервера скоринга."""
+
+    @pytest.fixture
+    def server_url(self):
+        """Запускает сервер на свободном порту."""
+        with running_server(amount_score) as url:
+            yield url
+
+    def _post(self, url, payload):
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+
+    def test_score_single_transaction(self, server_url):
+        """POST /score с объектом должен возвращать вероятность и решение."""
+        result = self._post(f"{server_url}/score", {"amount": 800.0})
+
+        assert result["fraud_probability"] == pytest.approx(0.8)
+        assert result["prediction"] == 1
+        assert result["threshold"] == 0.5
+
+    def test_score_list_of_transactions(self, server_url):
+        """POST /score со списком должен возвращать результат для каждой транзакции."""
+        result = self._post(f"{server_url}/score", [{"amount": 100.0}, {"amount": 900.0}])
+
+        assert [r["prediction"] for r in result["results"]] == [0, 1]
+
+    def test_invalid_payload_returns_400(self, server_url):
+        """Некорректное тело запроса должно возвращать 400."""
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            self._post(f"{server_url}/score", [1, 2, 3])
+
+        assert exc_info.value.code == 400
+
+    def test_malformed_transaction_returns_400(self, server_url):
+        """Ошибка проверки входных данных транзакции должна возвращать 400."""
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            self._post(f"{server_url}/score", {"amount": "not-a-number"})
+
+        assert exc_info.value.code == 400
+
+    def test_internal_error_returns_500(self, caplog):
+        """Внутренняя ошибка скоринга должна возвращать 500 и попадать в лог."""
+
+        def broken_score(df):
+            raise RuntimeError("model crashed")
+
+        with running_server(broken_score) as url, pytest.raises(urllib.error.HTTPError) as exc_info:
+            self._post(f"{url}/score", {"amount": 100.0})
+
+        assert exc_info.value.code == 500
+        assert "model crashed" not in exc_info.value.read().decode()
+        assert any(record.exc_info for record in caplog.records)
+
+    def test_metrics_endpoint(self, server_url):
+        """GET /metrics должен отдавать счётчики и перцентили задержки."""
+        self._post(f"{server_url}/score", {"amount": 10.0})
+
+        with urllib.request.urlopen(f"{server_url}/metrics", timeout=5) as response:
+            metrics = json.loads(response.read())
+
+        assert metrics["requests"] >= 1
+        assert "latency_p50_ms" in metrics
+        assert "latency_p99_ms" in metrics
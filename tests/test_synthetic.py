@@ -0,0 +1,93 @@
+"""Тесты для модуля synthetic."""
+
+import pandas as pd
+import pytest
+
+from fraudguard import add_basic_features, build_preprocessor, train_valid_test_split
+from fraudguard.synthetic import BASE_TRANSACTION_TYPES, generate_transactions
+
+
+class TestGenerateTransactions:
+    """Тесты для generate_transactions."""
+
+    def test_shape_and_columns(self):
+        """Генератор должен возвращать заданное число строк и ожидаемые колонки."""
+        df = generate_transactions(1_000)
+
+        assert len(df) == 1_000
+        assert {
+            "transaction_time",
+            "amount",
+            "transaction_type",
+            "device_type",
+            "nameOrig",
+            "nameDest",
+            "isFraud",
+        } == set(df.columns)
+
+    def test_deterministic(self):
+        """Одинаковый random_state должен давать одинаковые данные."""
+        pd.testing.assert_frame_equal(
+            generate_transactions(500, random_state=7),
+            generate_transactions(500, random_state=7),
+        )
+        assert not generate_transactions(500, random_state=1).equals(
+            generate_transactions(500, random_state=2)
+        )
+
+    def test_fraud_rate(self):
+        """Доля мошенничества должна точно соответствовать fraud_rate."""
+        df = generate_transactions(2_000, fraud_rate=0.05)
+
+        assert df["isFraud"].sum() == 100
+
+    def test_cardinalities(self):
+        """Число уникальных категорий должно ограничиваться параметрами."""
+        df = generate_transactions(
+            5_000, n_accounts=50, n_merchants=10, n_transaction_types=8, n_device_types=2
+        )
+
+        assert df["nameOrig"].nunique() <= 50
+        assert df["nameDest"].nunique() <= 10
+        assert df["transaction_type"].nunique() == 8
+        assert set(BASE_TRANSACTION_TYPES) <= set(df["transaction_type"].cat.categories)
+        assert df["device_type"].nunique() == 2
+
+    def test_time_is_sorted(self):
+        """Время транзакций должно быть упорядочено и лежать в заданном диапазоне дней."""
+        df = generate_transactions(1_000, start="2025-03-01", days=7)
+
+        assert df["transaction_time"].is_monotonic_increasing
+        assert df["transaction_time"].min() >= pd.Timestamp("2025-03-01")
+        assert df["transaction_time"].max() < pd.Timestamp("2025-03-08")
+
+    def test_fraud_has_signal(self):
+        """Мошеннические транзакции должны в среднем быть крупнее легитимных."""
+        df = generate_transactions(5_000, fraud_rate=0.1)
+
+        means = df.groupby("isFraud")["amount"].mean()
+        assert means[1] > means[0]
+
+    def test_fraud_at_night(self):
+        """Ночью доля мошенничества должна быть выше, чем днём."""
+        df = generate_transactions(20_000, fraud_rate=0.05)
+
+        night = df["transaction_time"].dt.hour < 6
+        assert df.loc[night, "isFraud"].mean() > 3 * df.loc[~night, "isFraud"].mean()
+
+    def test_invalid_fraud_rate(self):
+        """Недопустимая доля мошенничества должна вызывать ошибку."""
+        with pytest.raises(ValueError):
+            generate_transactions(100, fraud_rate=1.5)
+
+    def test_fits_pipeline(self):
+        """Синтетические данные должны проходить через стандартный пайплайн."""
+        df = add_basic_features(generate_transactions(2_000, fraud_rate=0.05))
+        X_train, *_ = train_valid_test_split(df, target_col="isFraud")
+
+        preprocessor, num_cols, cat_cols = build_preprocessor(
+            X_train, categorical_cols=["transaction_type", "device_type"]
+        )
+
+        assert "amount" in num_cols
+        assert preprocessor.fit_transform(X_train).shape[0] == len(X_train)
@@ -0,0 +1,96 @@
+"""Тесты для модуля thresholds."""
+
+import json
+
+import numpy as np
+import pytest
+from sklearn.metrics import f1_score, precision_score, recall_score
+
+from fraudguard.thresholds import CostMatrix, optimize_threshold, sweep_thresholds
+
+
+@pytest.fixture
+def scores():
+    """Метки и оценки модели с совпадающими значениями."""
+    rng = np.random.default_rng(0)
+    y_true = (rng.random(2_000) < 0.1).astype(int)
+    y_score = np.round(np.clip(rng.normal(0.3 + 0.3 * y_true, 0.15), 0, 1), 2)
+    return y_true, y_score
+
+
+class TestSweepThresholds:
+    """Тесты для sweep_thresholds."""
+
+    def test_matches_sklearn_at_every_threshold(self, scores):
+        """Метрики на каждом пороге должны совпадать с sklearn."""
+        y_true, y_score = scores
+        sweep = sweep_thresholds(y_true, y_score)
+
+        for i in range(1, len(sweep.thresholds), 7):
+            y_pred = (y_score >= sweep.thresholds[i]).astype(int)
+            assert sweep.precision[i] == pytest.approx(precision_score(y_true, y_pred))
+            assert sweep.recall[i] == pytest.approx(recall_score(y_true, y_pred))
+            assert sweep.f1[i] == pytest.approx(f1_score(y_true, y_pred))
+
+    def test_includes_no_alert_point(self, scores):
+        """Первая точка должна соответствовать отсутствию алертов."""
+        y_true, y_score = scores
+        sweep = sweep_thresholds(y_true, y_score)
+
+        assert np.isfinite(sweep.thresholds[0])
+        assert sweep.thresholds[0] > max(1.0, y_score.max())
+        assert sweep.alert_rate[0] == 0
+        assert sweep.fn[0] == y_true.sum()
+
+    def test_cost(self):
+        """Стоимость должна считаться по матрице затрат."""
+        sweep = sweep_thresholds(
+            [0, 1, 0, 1], [0.1, 0.9, 0.6, 0.4], CostMatrix(false_positive=1, false_negative=5)
+        )
+
+        # thresholds: never, 0.9, 0.6, 0.4, 0.1
+        np.testing.assert_array_equal(sweep.cost, [10, 5, 6, 1, 2])
+
+
+class TestOptimizeThreshold:
+    """Тесты для optimize_threshold."""
+
+    def test_max_f1(self, scores):
+        """Без матрицы затрат порог должен максимизировать F1."""
+        y_true, y_score = scores
+        point = optimize_threshold(y_true, y_score)
+
+        best_f1 = max(f1_score(y_true, (y_score >= t).astype(int)) for t in np.unique(y_score))
+        assert point.f1 == pytest.approx(best_f1)
+        assert point.cost is None
+
+    def test_min_cost(self):
+        """С матрицей затрат порог должен минимизировать ожидаемую стоимость."""
+        point = optimize_threshold(
+            [0, 1, 0, 1], [0.1, 0.9, 0.6, 0.4], CostMatrix(false_positive=1, false_negative=5)
+        )
+
+        assert point.threshold == 0.4
+        assert point.cost == 1
+
+    def test_no_alert_point_is_valid_json(self):
+        """Порог «без алертов» должен сохраняться в корректный JSON."""
+        point = optimize_threshold(
+            [0, 1, 0, 0], [0.9, 0.1, 0.8, 0.7], CostMatrix(false_positive=10, false_negative=1)
+        )
+
+        assert point.alert_rate == 0
+        assert json.loads(json.dumps(point.to_dict(), allow_nan=False)) == point.to_dict()
+
+    def test_alert_budget(self, scores):
+        """Доля алертов не должна превышать бюджет."""
+        y_true, y_score = scores
+        point = optimize_threshold(y_true, y_score, max_alert_rate=0.02)
+
+        assert point.alert_rate <= 0.02
+        assert np.mean(y_score >= point.threshold) == pytest.approx(point.alert_rate)
+
+    def test_invalid_budget(self, scores):
+        """Бюджет вне [0, 1] должен вызывать ошибку."""
+        with pytest.raises(ValueError):
+            optimize_threshold(*scores, max_alert_rate=1.5)
@@ -0,0 +1,112 @@
+"""Тесты для модуля update."""
+
+import numpy as np
+import pytest
+from sklearn.base import clone
+
+from fraudguard.models import (
+    build_forest_model,
+    build_hgb_model,
+    build_logreg_model,
+    build_sgd_model,
+)
+from fraudguard.update import update_model
+
+
+@pytest.fixture(scope="module")
+def dataset(synthetic_features):
+    """Исторические данные и новая порция размеченных транзакций."""
+    X = synthetic_features.drop(columns=["isFraud"])
+    y = synthetic_features["isFraud"]
+    return X.iloc[:2_000], y.iloc[:2_000], X.iloc[2_000:], y.iloc[2_000:]
+
+
+class TestUpdateForest:
+    """Тесты для дообучения случайного леса."""
+
+    def test_adds_trees(self, dataset, fit_pipeline):
+        """Старые деревья должны сохраняться, новые — добавляться."""
+        X, y, X_new, y_new = dataset
+        model = fit_pipeline(build_forest_model, X, y, n_estimators=10)
+        old_trees = list(model.named_steps["clf"].estimators_)
+
+        result = update_model(model, X_new, y_new, n_trees=5)
+
+        clf = model.named_steps["clf"]
+        assert len(clf.estimators_) == 15
+        assert clf.estimators_[:10] == old_trees
+        assert not clf.warm_start
+        assert result.before == {"n_estimators": 10}
+        assert result.after == {"n_estimators": 15}
+
+    def test_max_trees_retires_oldest(self, dataset, fit_pipeline):
+        """При ограничении числа деревьев должны удаляться самые старые."""
+        X, y, X_new, y_new = dataset
+        model = fit_pipeline(build_forest_model, X, y, n_estimators=10)
+        old_trees = list(model.named_steps["clf"].estimators_)
+
+        update_model(model, X_new, y_new, n_trees=5, max_trees=12)
+
+        clf = model.named_steps["clf"]
+        assert len(clf.estimators_) == clf.n_estimators == 12
+        assert clf.estimators_[:7] == old_trees[3:]
+        assert model.predict_proba(X_new).shape == (len(X_new), 2)
+
+
+class TestUpdateLinear:
+    """Тесты для дообучения линейных моделей."""
+
+    def test_sgd_partial_fit(self, dataset, fit_pipeline):
+        """SGD должен продолжать обучение через partial_fit с сохранением параметров."""
+        X, y, X_new, y_new = dataset
+        model = fit_pipeline(build_sgd_model, X, y)
+        clf = model.named_steps["clf"]
+        coef = clf.coef_.copy()
+
+        result = update_model(model, X_new, y_new, epochs=2)
+
+        assert not np.allclose(clf.coef_, coef)
+        assert clf.class_weight == "balanced"
+        assert result.after["updates"] == result.before["updates"] + 2 * len(y_new)
+
+    def test_logreg_starts_from_current_coefficients(self, dataset, fit_pipeline):
+        """Логистическая регрессия должна сдвигаться от текущих коэффициентов малыми шагами."""
+        X, y, X_new, y_new = dataset
+        model = fit_pipeline(build_logreg_model, X, y)
+        clf = model.named_steps["clf"]
+        coef = clf.coef_.copy()
+        refit = clone(clf).fit(model.named_steps["preprocess"].transform(X_new), y_new)
+
+        update_model(model, X_new, y_new)
+
+        assert not np.allclose(clf.coef_, coef)
+        # Closer to the current model than to a model trained on the new data alone.
+        assert np.linalg.norm(clf.coef_ - coef) < np.linalg.norm(refit.coef_ - coef)
+
+
+class TestUpdateModelErrors:
+    """Тесты для ошибок update_model."""
+
+    def test_single_class(self, dataset, fit_pipeline):
+        """Новые данные без мошенничества должны вызывать ValueError."""
+        X, y, X_new, y_new = dataset
+        model = fit_pipeline(build_sgd_model, X, y)
+        legit = (y_new == 0).to_numpy()
+
+        with pytest.raises(ValueError, match="both classes"):
+            update_model(model, X_new[legit], y_new[legit])
+
+    def test_hgb_not_supported(self, dataset, fit_pipeline):
+        """HistGradientBoosting не дообучается и должен вызывать TypeError."""
+        X, y, X_new, y_new = dataset
+        model = fit_pipeline(build_hgb_model, X, y, encoder="ordinal", max_iter=10)
+
+        with pytest.raises(TypeError, match="HistGradientBoosting"):
+            update_model(model, X_new, y_new)
+
+    def test_not_a_pipeline(self, dataset):
+        """Объект без шагов preprocess/clf должен вызывать TypeError."""
+        _, _, X_new, y_new = dataset
+
+        with pytest.raises(TypeError, match="Pipeline"):
+            update_model(object(), X_new, y_new)
@@ -0,0 +1,161 @@
+"""Тесты для модуля velocity."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fraudguard.velocity import (
+    NO_HISTORY,
+    VelocityStore,
+    add_velocity_features,
+    velocity_feature_names,
+)
+
+
+@pytest.fixture
+def history():
+    """История транзакций двух клиентов."""
+    return pd.DataFrame(
+        {
+            "nameOrig": ["A", "B", "A", "A", "B", "A"],
+            "transaction_time": [
+                "2025-01-01 10:00:00",
+                "2025-01-01 10:10:00",
+                "2025-01-01 10:30:00",
+                "2025-01-01 11:15:00",
+                "2025-01-02 12:00:00",
+                "2025-01-02 10:40:00",
+            ],
+            "amount": [100.0, 50.0, 200.0, 300.0, 70.0, 1000.0],
+        }
+    )
+
+
+class TestAddVelocityFeatures:
+    """Тесты для add_velocity_features."""
+
+    def test_window_counts_and_sums(self, history):
+        """Счётчики и суммы должны учитывать только предыдущие транзакции в окне."""
+        result = add_velocity_features(history)
+
+        # Транзакция A в 11:15: в последний час была только транзакция в 10:30
+        assert result["txn_count_1h"].tolist() == [0, 0, 1, 1, 0, 0]
+        assert result["amount_sum_1h"].tolist() == [0, 0, 100, 200, 0, 0]
+        # За сутки до 2025-01-02 10:40 у A была только транзакция в 11:15
+        assert result["txn_count_24h"].tolist() == [0, 0, 1, 2, 0, 1]
+        assert result["amount_sum_24h"].tolist() == [0, 0, 100, 300, 0, 300]
+
+    def test_time_since_previous(self, history):
+        """Время с предыдущей транзакции клиента в секундах."""
+        result = add_velocity_features(history)
+
+        assert result["secs_since_prev"].tolist() == [
+            NO_HISTORY,
+            NO_HISTORY,
+            1800.0,
+            2700.0,
+            93000.0,
+            84300.0,
+        ]
+
+    def test_zscore_against_history(self, history):
+        """z-score суммы относительно истории клиента."""
+        result = add_velocity_features(history)
+
+        previous = np.array([100.0, 200.0, 300.0])
+        expected = (1000.0 - previous.mean()) / previous.std(ddof=1)
+        assert result["amount_zscore"].iloc[5] == pytest.approx(expected)
+        assert result["amount_zscore"].iloc[0] == 0.0
+
+    def test_keeps_row_order_and_input(self, history):
+        """Исходный DataFrame не меняется, порядок строк сохраняется."""
+        result = add_velocity_features(history)
+
+        assert list(history.columns) == ["nameOrig", "transaction_time", "amount"]
+        pd.testing.assert_frame_equal(result[history.columns], history)
+        assert set(velocity_feature_names()).issubset(result.columns)
+
+    def test_unparseable_time_gives_nan(self, history):
+        """Строки без времени получают NaN и не попадают в историю."""
+        history.loc[2, "transaction_time"] = "not a date"
+
+        result = add_velocity_features(history)
+
+        assert result.loc[2, velocity_feature_names()].isna().all()
+        assert result["txn_count_1h"].iloc[3] == 0
+
+    def test_raises_on_missing_column(self, history):
+        """Отсутствие колонки клиента должно приводить к KeyError."""
+        with pytest.raises(KeyError, match="not found"):
+            add_velocity_features(history, account_col="account_id")
+
+
+class TestVelocityStore:
+    """Тесты для онлайн-хранилища VelocityStore."""
+
+    def test_matches_batch_features(self):
+        """Онлайн-признаки должны совпадать с пакетными."""
+        rng = np.random.default_rng(0)
+        n = 500
+        seconds = np.sort(rng.integers(0, 5 * 86400, n)) // 600 * 600  # есть совпадения времени
+        df = pd.DataFrame(
+            {
+                "nameOrig": rng.choice(["A", "B", "C", "D"], n),
+                "transaction_time": pd.to_datetime(seconds, unit="s").strftime("%Y-%m-%d %H:%M:%S"),
+                "amount": rng.lognormal(5, 1, n).round(2),
+            }
+        )
+
+        batch = add_velocity_features(df)
+        store = VelocityStore()
+        online = pd.DataFrame([store.process(*row) for row in df.itertuples(index=False)])
+
+        names = velocity_feature_names()
+        np.testing.assert_allclose(online[names], batch[names], rtol=1e-6, atol=1e-6)
+
+    def test_warm_up_then_score(self, history):
+        """После прогрева хранилище продолжает историю клиента."""
+        store = VelocityStore().warm_up(history)
+
+        features = store.features("A", "2025-01-02 11:00:00", 500.0)
+
+        assert len(store) == 2
+        assert features["txn_count_1h"] == 1
+        assert features["amount_sum_1h"] == 1000.0
+        assert features["secs_since_prev"] == 1200.0
+
+    def test_missing_amount_counts_as_zero(self, history):
+        """Пропущенная сумма должна считаться нулём, как в пакетном расчёте."""
+        df = history.copy()
+        df.loc[5, "amount"] = np.nan
+        store = VelocityStore().warm_up(df.iloc[:5])
+
+        features = store.features("A", df.loc[5, "transaction_time"], np.nan)
+        batch = add_velocity_features(df).iloc[5]
+
+        assert features["amount_zscore"] == pytest.approx(batch["amount_zscore"])
+        assert not np.isnan(features["amount_zscore"])
+
+    def test_process_frame_replays_in_time_order(self, history):
+        """process_frame должен давать пакетные признаки и записывать события."""
+        store = VelocityStore()
+        shuffled = history.sample(frac=1, random_state=0)
+
+        result = store.process_frame(shuffled)
+
+        names = velocity_feature_names()
+        batch = add_velocity_features(shuffled)
+        np.testing.assert_allclose(result[names], batch[names])
+        assert store.features("A", "2025-01-02 11:00:00", 1.0)["txn_count_1h"] == 1
+
+    def test_rejected_frame_records_nothing(self, history):
+        """Батч с некорректной строкой отклоняется целиком, ничего не записав."""
+        df = history.copy()
+        df.loc[3, "transaction_time"] = "not a date"
+        store = VelocityStore()
+
+        with pytest.raises(ValueError, match="timestamp"):
+            store.process_frame(df)
+        with pytest.raises(ValueError, match="account"):
+            store.process_frame(history.assign(nameOrig=["A", None] * 3))
+        assert len(store) == 0